@@ -0,0 +1,88 @@
+"""
+Benchmark: detección de DeepFace en cada frame (camino actual) vs detector de OpenCV
+con seguimiento del rostro y emociones sobre el recorte.
+
+Usa como referencia el camino actual (frame completo) e informa, para cada detector,
+frames/s y la precisión respecto de esa referencia: igualdad de emocion_facial y
+diferencia media/máxima de las 7 probabilidades.
+
+Uso (desde la raíz del repo):
+    python -m benchmarks.bench_face_tracking --video data/raw_videos/dia3/grupo_video1.mp4
+    python -m benchmarks.bench_face_tracking --frames-folder data/processed_frames/dia1/1 --detectors haar
+    python -m benchmarks.bench_face_tracking --video entrevista.mp4 --output tracking.json
+"""
+import json
+import time
+import argparse
+
+import numpy as np
+
+from src import vision_module, face_tracking
+from benchmarks.bench_vision_batch import load_frames
+
+
+def run(frames, batch_size, face_detector=None):
+    # similarity_threshold > 1 y hash_cache_size=0 desactivan la reutilización: se analizan todos los frames
+    start = time.perf_counter()
+    df = vision_module.analyze_faces_full_vector(frames, similarity_threshold=2.0, batch_size=batch_size,
+                                                 hash_cache_size=0, face_detector=face_detector)
+    return df, time.perf_counter() - start
+
+
+def accuracy(df, reference):
+    """Coincidencia con la referencia (camino de frame completo)."""
+    labels = vision_module.EMOTION_LABELS
+    diff = np.abs(df[labels].to_numpy(dtype=float) - reference[labels].to_numpy(dtype=float))
+    return {
+        "label_agreement": round(float((df['emocion_facial'] == reference['emocion_facial']).mean()), 4),
+        "mean_abs_prob_diff": round(float(diff.mean()), 4),
+        "max_abs_prob_diff": round(float(diff.max()), 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--video", help="Video de entrada")
+    source.add_argument("--frames-folder", help="Carpeta con frame_N.jpg")
+    parser.add_argument("--frame-step", type=int, default=None)
+    parser.add_argument("--limit", type=int, default=120, help="Máximo de frames a analizar")
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--detectors", default=",".join(face_tracking.DETECTORS))
+    parser.add_argument("--output", help="Guardar los resultados en JSON")
+    args = parser.parse_args()
+
+    frames = load_frames(args)
+    print(f"Frames cargados: {len(frames)}")
+
+    # Calentamiento: construir detector y modelo fuera de la medición
+    run(frames[:2], args.batch_size)
+
+    reference, elapsed = run(frames, args.batch_size)
+    results = {"frames": len(frames), "full_frame": {"seconds": round(elapsed, 3),
+                                                     "fps": round(len(frames) / elapsed, 2)}}
+    print(f"{'deepface (frame completo)':<26} {elapsed:8.2f} s  {len(frames) / elapsed:8.2f} frames/s")
+
+    for backend in [d for d in args.detectors.split(",") if d]:
+        try:
+            tracker = face_tracking.FaceTracker(backend)
+        except (ImportError, FileNotFoundError) as e:
+            print(f"{backend:<26} omitido ({e})")
+            continue
+        df, elapsed = run(frames, args.batch_size, face_detector=tracker)
+        result = {"seconds": round(elapsed, 3), "fps": round(len(frames) / elapsed, 2),
+                  **accuracy(df, reference), "tracking": tracker.stats()}
+        results[backend] = result
+        print(f"{backend + ' + seguimiento':<26} {elapsed:8.2f} s  {result['fps']:8.2f} frames/s"
+              f"  | igualdad emocion_facial: {result['label_agreement'] * 100:.1f}%"
+              f"  media |Δprob|: {result['mean_abs_prob_diff']:.2f}  max: {result['max_abs_prob_diff']:.2f}"
+              f"  | detecciones completas: {tracker.full_detections}, en ventana: {tracker.roi_detections}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"Resultados: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
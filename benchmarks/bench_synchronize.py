@@ -0,0 +1,93 @@
+"""
+Micro-benchmark de analysis_core.synchronize_data sobre entrevistas sintéticas
+de 1 h y 3 h, comparado con la implementación anterior (iterrows + filtro booleano).
+
+Uso (desde la raíz del repo):
+    python -m benchmarks.bench_synchronize
+    python -m benchmarks.bench_synchronize --hours 1,3,6 --skip-reference
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src import analysis_core
+
+EMOTIONS = ['angry', 'disgust', 'fear', 'happy', 'sad', 'surprise', 'neutral']
+TEXT_EMOTIONS = ['anger', 'disgust', 'fear', 'joy', 'neutral', 'sadness', 'surprise']
+
+
+def synthetic_inputs(seconds, seed=0):
+    """df_video de 1 fila por segundo y df_audio con segmentos de 2-8 s y pausas."""
+    rng = np.random.default_rng(seed)
+
+    probs = rng.dirichlet(np.ones(len(EMOTIONS)), size=seconds) * 100
+    df_video = pd.DataFrame(probs, columns=EMOTIONS)
+    df_video.insert(0, 'segundo', np.arange(seconds))
+    df_video['emocion_facial'] = np.array(EMOTIONS)[probs.argmax(axis=1)]
+
+    segments = []
+    t = 0.0
+    while t < seconds:
+        t += rng.uniform(0.0, 1.5)  # pausa entre frases
+        duration = rng.uniform(2.0, 8.0)
+        segments.append({
+            'inicio': round(t, 2),
+            'fin': round(t + duration, 2),
+            'texto': f"frase {len(segments)}",
+            'emocion_texto': TEXT_EMOTIONS[len(segments) % len(TEXT_EMOTIONS)],
+            'confianza_texto': 0.9,
+        })
+        t += duration
+    return df_video, pd.DataFrame(segments)
+
+
+def synchronize_reference(df_video, df_audio):
+    """Implementación anterior, O(frames x segmentos)."""
+    merged_data = []
+    for _, row_vid in df_video.iterrows():
+        current_sec = row_vid['segundo']
+        row_data = row_vid.to_dict()
+        match = df_audio[(df_audio['inicio'] <= current_sec) & (df_audio['fin'] >= current_sec)]
+        if not match.empty:
+            row_data['texto'] = match.iloc[0]['texto']
+            row_data['emocion_texto'] = match.iloc[0]['emocion_texto']
+        else:
+            row_data['texto'] = "[Silencio]"
+            row_data['emocion_texto'] = "neutral"
+        merged_data.append(row_data)
+    return pd.DataFrame(merged_data)
+
+
+def timed(func, *args, repeat=3):
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hours", default="1,3", help="Duraciones sintéticas en horas (separadas por coma)")
+    parser.add_argument("--skip-reference", action="store_true", help="No medir la versión con iterrows")
+    args = parser.parse_args()
+
+    for hours in [float(h) for h in args.hours.split(",")]:
+        df_video, df_audio = synthetic_inputs(int(hours * 3600))
+        fast_time, fast = timed(analysis_core.synchronize_data, df_video, df_audio)
+        line = (f"{hours:g} h ({len(df_video)} s, {len(df_audio)} segmentos): "
+                f"vectorizado {fast_time * 1000:9.2f} ms")
+
+        if not args.skip_reference:
+            ref_time, ref = timed(synchronize_reference, df_video, df_audio, repeat=1)
+            pd.testing.assert_frame_equal(fast, ref)
+            line += f" | iterrows {ref_time * 1000:10.2f} ms | x{ref_time / fast_time:,.0f} (salida idéntica)"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Benchmark: inferencia de emociones frame a frame (DeepFace.analyze) vs por lotes.
+
+Uso (desde la raíz del repo):
+    python -m benchmarks.bench_vision_batch --video data/raw_videos/dia3/grupo_video1.mp4
+    python -m benchmarks.bench_vision_batch --frames-folder data/processed_frames/dia1/1 --batch-sizes 1,8,32
+"""
+import argparse
+import time
+
+import numpy as np
+
+from src import media_processor, vision_module
+
+
+def load_frames(args):
+    """Carga los frames en memoria para no medir la decodificación."""
+    if args.video:
+        frames = media_processor.iter_frames(args.video, frame_step=args.frame_step)
+    else:
+        frames = vision_module.iter_folder_frames(args.frames_folder)
+
+    loaded = []
+    for second, frame in frames:
+        loaded.append((second, frame))
+        if args.limit and len(loaded) >= args.limit:
+            break
+    return loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--video", help="Video de entrada")
+    source.add_argument("--frames-folder", help="Carpeta con frame_N.jpg")
+    parser.add_argument("--frame-step", type=int, default=None)
+    parser.add_argument("--limit", type=int, default=120, help="Máximo de frames a analizar")
+    parser.add_argument("--batch-sizes", default="1,8,16,32")
+    args = parser.parse_args()
+
+    frames = load_frames(args)
+    print(f"Frames cargados: {len(frames)}")
+
+    # Calentamiento: construir detector y modelo fuera de la medición
+    vision_module.analyze_faces_full_vector(frames[:2], similarity_threshold=2.0, hash_cache_size=0)
+    vision_module.analyze_faces_full_vector(frames[:2], similarity_threshold=2.0, batch_size=2,
+                                            hash_cache_size=0)
+
+    reference = None
+    for batch_size in [int(b) for b in args.batch_sizes.split(",")]:
+        # similarity_threshold > 1 y hash_cache_size=0 desactivan la reutilización: inferencia pura
+        start = time.perf_counter()
+        df = vision_module.analyze_faces_full_vector(frames, similarity_threshold=2.0, batch_size=batch_size,
+                                                     hash_cache_size=0)
+        elapsed = time.perf_counter() - start
+
+        line = f"batch_size={batch_size:>3}  {elapsed:8.2f} s  {len(frames) / elapsed:8.2f} frames/s"
+        if reference is None:
+            reference = df
+        else:
+            same_labels = (df['emocion_facial'] == reference['emocion_facial']).mean() * 100
+            max_diff = np.abs(df[vision_module.EMOTION_LABELS].values - reference[vision_module.EMOTION_LABELS].values).max()
+            line += f"  | igualdad emocion_facial: {same_labels:.1f}%  max |Δprob|: {max_diff:.4f}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Presupuesto de tiempo de arranque de los módulos livianos.
+
+Importa cada módulo en un proceso nuevo con `python -X importtime` y verifica que:
+  1. no cargue ninguna dependencia pesada (TensorFlow, torch, Whisper, transformers,
+     DeepFace, matplotlib): esas se importan recién en la etapa que las usa;
+  2. el import (tiempo acumulado que informa -X importtime) quede dentro del presupuesto.
+
+Uso (desde la raíz del repo):
+    python -m benchmarks.check_startup
+    python -m benchmarks.check_startup --budget 0.5 --verbose
+
+Termina con código 1 si algún módulo no cumple.
+"""
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_BUDGET = 1.0  # segundos por import
+
+HEAVY_MODULES = ("tensorflow", "keras", "tf_keras", "torch", "whisper", "transformers",
+                 "deepface", "matplotlib")
+
+# Módulo -> para qué comando liviano se usa
+TARGETS = {
+    "src.analysis_core": "congruencia y re-puntuación de reportes existentes",
+    "src.report_store": "lectura de reportes y consultas al almacén",
+    "src.rescoring": "re-puntuar reportes sin cargar los modelos (rescore.py)",
+    "src.plotting": "regenerar gráficos (matplotlib se importa al dibujar)",
+    "src.pipeline": "orquestación de etapas (los modelos se cargan al usarse)",
+    "main": "arranque de la CLI (python main.py --help)",
+}
+
+PROBE = ("import json, sys; import {module}; "
+         "print(json.dumps(sorted({{m.split('.')[0] for m in sys.modules}} & set({heavy!r}))))")
+
+
+def parse_importtime(stderr, module):
+    """Tiempo acumulado (s) del import de `module` según la salida de -X importtime."""
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) == 3 and parts[2].strip() == module and parts[1].strip().isdigit():
+            return int(parts[1]) / 1e6
+    return None
+
+
+def measure_import(module, env=None):
+    """
+    (segundos, dependencias pesadas cargadas) de importar module en un proceso nuevo.
+    env: entorno del proceso (p.ej. un PYTHONPATH con paquetes vacíos en lugar de los
+    pesados que no están instalados, para detectar igual un import anticipado).
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE.format(module=module, heavy=HEAVY_MODULES)],
+        cwd=ROOT, capture_output=True, text=True, env=env
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"No se pudo importar {module}:\n{result.stderr.strip().splitlines()[-1]}")
+    return parse_importtime(result.stderr, module), json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET, help="Segundos máximos por import")
+    parser.add_argument("--modules", help="Módulos separados por coma (por defecto todos los livianos)")
+    parser.add_argument("--verbose", action="store_true", help="Mostrar para qué se usa cada módulo")
+    args = parser.parse_args(argv)
+
+    modules = args.modules.split(",") if args.modules else list(TARGETS)
+    failures = 0
+    for module in modules:
+        try:
+            seconds, heavy = measure_import(module)
+        except RuntimeError as e:
+            print(f"ERROR  {e}")
+            failures += 1
+            continue
+
+        problems = []
+        if heavy:
+            problems.append(f"carga {', '.join(heavy)}")
+        if seconds is None or seconds > args.budget:
+            problems.append(f"supera el presupuesto de {args.budget:.2f} s")
+        failures += bool(problems)
+
+        status = "FALLA" if problems else "OK"
+        elapsed = f"{seconds:6.3f} s" if seconds is not None else "   ?   "
+        line = f"{status:<6} {module:<20} {elapsed}"
+        if problems:
+            line += "  (" + "; ".join(problems) + ")"
+        elif args.verbose:
+            line += f"  {TARGETS.get(module, '')}"
+        print(line)
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+"""
+Entrevistas sintéticas para los benchmarks: videos con un "rostro" dibujado,
+audio con tramos de habla y silencio, y tablas de video/audio de cualquier duración.
+Todo se genera localmente y es determinista para una misma semilla.
+"""
+import os
+import shutil
+import subprocess
+
+import cv2
+import numpy as np
+
+from src import media_processor
+from benchmarks.bench_synchronize import synthetic_inputs  # tablas df_video / df_audio
+
+
+def draw_face(frame, center, size, mouth_open):
+    """Óvalo con ojos y boca: suficiente para que el detector encuentre un rostro."""
+    cx, cy = center
+    cv2.ellipse(frame, (cx, cy), (size, int(size * 1.3)), 0, 0, 360, (150, 180, 220), -1)
+    for dx in (-size // 3, size // 3):
+        cv2.circle(frame, (cx + dx, cy - size // 4), max(size // 8, 2), (40, 40, 40), -1)
+    cv2.ellipse(frame, (cx, cy + size // 2), (size // 3, max(int(size * 0.2 * mouth_open), 1)),
+                0, 0, 360, (60, 40, 120), -1)
+
+
+def synthetic_frames(seconds=30, width=640, height=360, fps=25, static_ratio=0.5, seed=0):
+    """
+    Genera (índice, frame) BGR. Alterna escenas quietas (mismo frame) y de movimiento
+    en bloques de 5 s para que la reutilización de resultados se comporte como en
+    una entrevista real; static_ratio es la fracción aproximada de escenas quietas.
+    """
+    rng = np.random.default_rng(seed)
+    background = rng.integers(60, 120, size=(height, width, 3), dtype=np.uint8)
+    size = max(min(width, height) // 6, 8)
+
+    frame = None
+    for i in range(int(seconds * fps)):
+        second = i / fps
+        scene = int(second // 5)
+        static = np.random.default_rng(seed + scene).random() < static_ratio
+        if frame is None or not static or i % int(5 * fps) == 0:
+            frame = background.copy()
+            cx = int(width / 2 + width / 6 * np.sin(second))
+            cy = int(height / 2 + height / 10 * np.cos(second / 2))
+            draw_face(frame, (cx, cy), size, mouth_open=abs(np.sin(second * 3)))
+        yield i, frame
+
+
+def synthetic_audio(seconds=30, speech_ratio=0.7, seed=0):
+    """Audio float32 mono 16 kHz: tramos de "habla" (tonos modulados) y silencios."""
+    rng = np.random.default_rng(seed)
+    sr = media_processor.SAMPLE_RATE
+    t = np.arange(int(seconds * sr), dtype=np.float32) / sr
+    speech = np.repeat(rng.random(int(np.ceil(seconds / 2))) < speech_ratio, 2 * sr)[:len(t)]
+    voice = 0.3 * np.sin(2 * np.pi * 180 * t) * (0.5 + 0.5 * np.sin(2 * np.pi * 4 * t))
+    noise = rng.normal(0, 0.01, size=len(t))
+    return (voice * speech + noise).astype(np.float32)
+
+
+def make_video(path, seconds=30, width=640, height=360, fps=25, static_ratio=0.5,
+               with_audio=True, seed=0):
+    """
+    Escribe un video sintético (MJPG en contenedor AVI) en path. Si hay ffmpeg, le
+    agrega la pista de audio de synthetic_audio(). Devuelve True si el video quedó con audio.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    silent_path = path + ".video.avi"
+    writer = cv2.VideoWriter(silent_path, cv2.VideoWriter_fourcc(*"MJPG"), fps, (width, height))
+    for _, frame in synthetic_frames(seconds, width, height, fps, static_ratio, seed):
+        writer.write(frame)
+    writer.release()
+
+    has_audio = with_audio and shutil.which("ffmpeg") is not None
+    if has_audio:
+        wav_path = path + ".audio.wav"
+        media_processor.write_wav(synthetic_audio(seconds, seed=seed), wav_path)
+        subprocess.run(["ffmpeg", "-y", "-loglevel", "error", "-i", silent_path, "-i", wav_path,
+                        "-c:v", "copy", "-c:a", "pcm_s16le", "-shortest", path], check=True)
+        os.remove(wav_path)
+        os.remove(silent_path)
+    else:
+        os.replace(silent_path, path)
+    return has_audio
@@ -0,0 +1,136 @@
+"""
+Backends de prueba para los modelos pesados (Whisper, RoBERTa, DeepFace, LSTM).
+Devuelven salidas deterministas con la misma forma que los modelos reales, de modo
+que el resto del pipeline (pandas / numpy / OpenCV) se puede medir por separado.
+
+    with stub_backends():
+        vision_module.analyze_faces_full_vector(frames, batch_size=16)
+"""
+import zlib
+from contextlib import contextmanager
+
+import cv2
+import numpy as np
+
+from src import media_processor, model_registry
+
+TEXT_LABELS = ['anger', 'disgust', 'fear', 'joy', 'neutral', 'sadness', 'surprise']
+FACE_LABELS = ['angry', 'disgust', 'fear', 'happy', 'sad', 'surprise', 'neutral']
+WORDS = "yes no maybe really think work team project always never good bad".split()
+
+
+def _softmax(x):
+    e = np.exp(x - x.max(axis=-1, keepdims=True))
+    return e / e.sum(axis=-1, keepdims=True)
+
+
+class StubWhisper:
+    """transcribe() con un segmento de 2-6 s cada tanto, proporcional a la duración."""
+
+    def transcribe(self, audio, fp16=False, **kwargs):
+        if isinstance(audio, str):
+            audio = media_processor.load_audio(audio)
+        duration = len(audio) / media_processor.SAMPLE_RATE
+        rng = np.random.default_rng(len(audio))
+        segments, t = [], 0.0
+        while t < duration:
+            end = min(t + rng.uniform(2.0, 6.0), duration)
+            words = rng.choice(WORDS, size=rng.integers(3, 10))
+            segments.append({'start': round(t, 2), 'end': round(end, 2), 'text': " " + " ".join(words)})
+            t = end + rng.uniform(0.0, 1.5)
+        return {'text': "".join(s['text'] for s in segments), 'segments': segments}
+
+
+def stub_text_classifier(texts, batch_size=16, truncation=True, top_k=None):
+    """Misma salida que el pipeline de transformers con top_k=None: 7 clases por texto."""
+    outputs = []
+    for text in ([texts] if isinstance(texts, str) else texts):
+        scores = _softmax(np.random.default_rng(zlib.crc32(text.encode())).normal(size=len(TEXT_LABELS)))
+        ranked = sorted(zip(TEXT_LABELS, scores), key=lambda p: -p[1])
+        outputs.append([{'label': label, 'score': float(score)} for label, score in ranked])
+    return outputs
+
+
+class StubFaceEmotion:
+    """Reemplazo del modelo Emotion de DeepFace: (n, 48, 48, 1) -> (n, 7) probabilidades."""
+
+    def __init__(self, seed=0):
+        self.weights = np.random.default_rng(seed).normal(size=(48 * 48, len(FACE_LABELS))).astype(np.float32)
+
+    def __call__(self, batch, training=False):
+        batch = np.asarray(batch, dtype=np.float32).reshape(len(batch), -1)
+        return _softmax(batch @ self.weights / 48)
+
+
+class StubDeepFace:
+    """Sustituto de la clase DeepFace para extract_faces y analyze."""
+
+    def __init__(self, face_model):
+        self.face_model = face_model
+
+    def extract_faces(self, img_path, **kwargs):
+        h, w = img_path.shape[:2]
+        face = img_path[h // 4:3 * h // 4, w // 4:3 * w // 4, ::-1].astype(np.float32) / 255
+        return [{'face': face, 'confidence': 1.0}]
+
+    def analyze(self, img_path, **kwargs):
+        face = self.extract_faces(img_path)[0]['face']
+        gray = cv2.resize(cv2.cvtColor(face, cv2.COLOR_RGB2GRAY), (48, 48))
+        pred = self.face_model(gray[np.newaxis, ..., np.newaxis])[0]
+        emotions = {label: float(100 * p) for label, p in zip(FACE_LABELS, pred)}
+        return [{'emotion': emotions, 'dominant_emotion': FACE_LABELS[int(np.argmax(pred))]}]
+
+
+class _Output:
+    """Imita al tensor devuelto por el predictor compilado (.numpy())."""
+
+    def __init__(self, values):
+        self.values = values
+
+    def numpy(self):
+        return self.values
+
+
+class StubLSTM:
+    """Promedio de la ventana en lugar de la LSTM: (n, w, 7) -> (n, 7)."""
+
+    def __call__(self, x, training=False):
+        return _Output(_softmax(np.asarray(x, dtype=np.float32).mean(axis=1)))
+
+
+@contextmanager
+def stub_backends(seed=0):
+    """
+    Registra los backends de prueba en model_registry (y reemplaza DeepFace en
+    vision_module) durante el bloque; al salir se restauran los originales.
+    Los módulos que no se pueden importar en este entorno simplemente no se tocan.
+    """
+    face_model = StubFaceEmotion(seed)
+    model_registry.clear()
+    model_registry.register("whisper", StubWhisper())
+    model_registry.register("text_classifier", stub_text_classifier)
+    model_registry.register("face_emotion", face_model)
+
+    patched = []
+    try:
+        from src import vision_module
+        patched.append((vision_module, "DeepFace", vision_module.DeepFace))
+        vision_module.DeepFace = StubDeepFace(face_model)
+    except ImportError:
+        pass
+
+    try:
+        from src import lstm_model
+        lstm = StubLSTM()
+        model_registry.register("lstm", lstm)
+        patched.append((lstm_model, "_predictors", lstm_model._predictors))
+        lstm_model._predictors = {id(lstm): lstm}
+    except ImportError:
+        pass
+
+    try:
+        yield
+    finally:
+        for module, name, original in patched:
+            setattr(module, name, original)
+        model_registry.clear()
@@ -0,0 +1,282 @@
+"""
+Suite de benchmarks reproducible sobre entrevistas sintéticas.
+
+Genera localmente un video (y su audio) de la duración, resolución y FPS indicados,
+mide cada función pública del pipeline y guarda los resultados en JSON. Por defecto
+los modelos pesados se reemplazan por backends de prueba (benchmarks/stubs.py), así
+que lo que se mide es el código propio (decodificación, pandas, numpy, OpenCV);
+con --real se usan los modelos de verdad.
+
+Uso (desde la raíz del repo):
+    python -m benchmarks.suite
+    python -m benchmarks.suite --seconds 120 --width 1280 --height 720 --fps 30
+    python -m benchmarks.suite --save-baseline               # guarda benchmarks/results/baseline.json
+    python -m benchmarks.suite --baseline benchmarks/results/baseline.json --threshold 0.2
+
+Con --baseline termina con código 1 si algún caso es más lento que la línea base
+en más del umbral (0.2 = 20 %). Un caso que falla queda registrado con status "error"
+y el resto se sigue midiendo; en ese caso el código de salida también es 1.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import statistics
+import traceback
+import subprocess
+from contextlib import nullcontext
+from datetime import datetime
+
+from src import media_processor
+from src.instrumentation import measure
+from benchmarks import fixtures
+from benchmarks.stubs import stub_backends
+
+RESULTS_DIR = os.path.join("benchmarks", "results")
+BASELINE_PATH = os.path.join(RESULTS_DIR, "baseline.json")
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Fixture:
+    """Entradas compartidas por los casos; cada una se construye una sola vez."""
+
+    def __init__(self, args, workdir):
+        self.args = args
+        self.workdir = workdir
+        self.video_path = os.path.join(workdir, "entrevista.avi")
+        self.has_audio = fixtures.make_video(self.video_path, args.seconds, args.width, args.height,
+                                             args.fps, seed=args.seed)
+        self._frames = None
+        self._tables = None
+        self._integrated = None
+
+    def frames(self):
+        """Un frame por segundo ya decodificado (sin medir la decodificación)."""
+        if self._frames is None:
+            self._frames = list(media_processor.iter_frames(self.video_path))
+        return self._frames
+
+    def audio(self):
+        if self.has_audio:
+            return media_processor.load_audio(self.video_path)
+        return fixtures.synthetic_audio(self.args.seconds, seed=self.args.seed)
+
+    def tables(self):
+        """df_video / df_audio de --table-seconds (etapas de pandas a escala de horas)."""
+        if self._tables is None:
+            self._tables = fixtures.synthetic_inputs(self.args.table_seconds, seed=self.args.seed)
+        return self._tables
+
+    def integrated(self):
+        if self._integrated is None:
+            from src import analysis_core
+            self._integrated = analysis_core.synchronize_data(*self.tables())
+        return self._integrated.copy()
+
+
+class SkipCase(Exception):
+    """El caso no se puede medir en este entorno (se registra como omitido)."""
+
+
+# ---------------- CASOS ----------------
+# Cada caso recibe el Fixture y devuelve (función a medir, frames procesados o None)
+
+def case_extract_media(fx):
+    if not fx.has_audio:
+        # extract_media decodifica la pista de audio con ffmpeg
+        raise SkipCase("el video sintético no tiene audio (falta ffmpeg en el PATH)")
+
+    def run():
+        _, frames = media_processor.extract_media(fx.video_path, fx.workdir, "bench")
+        for _ in frames:
+            pass
+    return run, fx.args.seconds
+
+
+def case_analyze_faces(fx):
+    from src import vision_module
+    frames = fx.frames()
+    return (lambda: vision_module.analyze_faces_full_vector(frames, batch_size=16)), len(frames)
+
+
+def case_analyze_audio(fx):
+    from src import audio_module
+    samples = fx.audio()
+    return (lambda: audio_module.analyze_audio(samples)), None
+
+
+def case_synchronize_data(fx):
+    from src import analysis_core
+    df_video, df_audio = fx.tables()
+    return (lambda: analysis_core.synchronize_data(df_video, df_audio)), len(df_video)
+
+
+def case_apply_lstm_smoothing(fx):
+    from src import analysis_core
+    df = fx.integrated()
+    return (lambda: analysis_core.apply_lstm_smoothing(df.copy())), len(df)
+
+
+def case_calculate_congruence(fx):
+    from src import analysis_core
+    df = fx.integrated()
+    return (lambda: analysis_core.calculate_congruence(df.copy())), len(df)
+
+
+def case_generar_grafica(fx):
+    from src import analysis_core
+    from src.plotting import generar_grafica_avanzada
+    report = analysis_core.calculate_congruence(fx.integrated())
+    return (lambda: generar_grafica_avanzada(report.copy(), "bench", fx.workdir)), len(report)
+
+
+CASES = {
+    "extract_media": case_extract_media,
+    "analyze_faces_full_vector": case_analyze_faces,
+    "analyze_audio": case_analyze_audio,
+    "synchronize_data": case_synchronize_data,
+    "apply_lstm_smoothing": case_apply_lstm_smoothing,
+    "calculate_congruence": case_calculate_congruence,
+    "generar_grafica_avanzada": case_generar_grafica,
+}
+
+
+def run_case(name, fx, repeat):
+    """
+    Corre un caso `repeat` veces (más una de calentamiento) y resume los tiempos.
+    Si el caso falla devuelve status "error" con el motivo en lugar de cortar la suite.
+    """
+    try:
+        run, frames = CASES[name](fx)
+    except (ImportError, SkipCase) as e:
+        return {"status": "skipped", "reason": f"{type(e).__name__}: {e}"}
+    except Exception as e:
+        return {"status": "error", "reason": f"{type(e).__name__}: {e}", "traceback": traceback.format_exc()}
+
+    times, metrics = [], {}
+    try:
+        run()  # calentamiento: cachés de OpenCV / pandas, trazado de funciones, etc.
+        for _ in range(repeat):
+            start = time.perf_counter()
+            with measure(metrics, name, frames=frames):
+                run()
+            times.append(time.perf_counter() - start)
+    except Exception as e:
+        return {"status": "error", "reason": f"{type(e).__name__}: {e}", "traceback": traceback.format_exc()}
+
+    median = statistics.median(times)
+    result = {"status": "ok", "median_s": round(median, 4), "min_s": round(min(times), 4),
+              "runs": repeat, "cpu_s": metrics[name]["cpu_s"], "process_peak_rss_mb": metrics[name]["process_peak_rss_mb"]}
+    if frames:
+        result["frames"] = frames
+        result["fps"] = round(frames / median, 2) if median > 0 else None
+    return result
+
+
+def compare(results, baseline, threshold):
+    """Casos más lentos que la línea base en más de threshold (fracción)."""
+    if baseline.get("params") != results["params"]:
+        print("   [BENCH] Aviso: la línea base se midió con otros parámetros "
+              f"({baseline.get('params')}); la comparación es orientativa.")
+
+    regressions = []
+    for name, current in results["cases"].items():
+        previous = baseline.get("cases", {}).get(name, {})
+        if current.get("status") != "ok" or previous.get("status") != "ok":
+            continue
+        ratio = current["median_s"] / previous["median_s"] if previous["median_s"] else 1.0
+        current["vs_baseline"] = round(ratio, 3)
+        if ratio > 1 + threshold:
+            regressions.append((name, previous["median_s"], current["median_s"], ratio))
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=int, default=30, help="Duración del video sintético")
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=360)
+    parser.add_argument("--fps", type=int, default=25)
+    parser.add_argument("--table-seconds", type=int, default=3600,
+                        help="Duración de las tablas sintéticas para sync / LSTM / congruencia / gráfico")
+    parser.add_argument("--repeat", type=int, default=3, help="Mediciones por caso (se reporta la mediana)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--only", help="Casos separados por coma (por defecto todos)")
+    parser.add_argument("--real", action="store_true", help="Usar los modelos reales en lugar de los de prueba")
+    parser.add_argument("--output", help="Archivo de resultados (por defecto benchmarks/results/<fecha>.json)")
+    parser.add_argument("--save-baseline", action="store_true", help="Guardar también como línea base")
+    parser.add_argument("--baseline", help="Línea base contra la cual comparar")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Regresión tolerada respecto de la línea base (0.2 = 20 %%)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    names = args.only.split(",") if args.only else list(CASES)
+    unknown = set(names) - set(CASES)
+    if unknown:
+        raise SystemExit(f"Casos desconocidos: {sorted(unknown)}. Disponibles: {list(CASES)}")
+
+    results = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "git": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "backends": "real" if args.real else "stub",
+        "params": {"seconds": args.seconds, "width": args.width, "height": args.height, "fps": args.fps,
+                   "table_seconds": args.table_seconds, "seed": args.seed, "backends": "real" if args.real else "stub"},
+        "cases": {},
+    }
+
+    with tempfile.TemporaryDirectory(prefix="bench_") as workdir, \
+            (nullcontext() if args.real else stub_backends(args.seed)):
+        fx = Fixture(args, workdir)
+        print(f"Video sintético: {args.seconds} s {args.width}x{args.height} @ {args.fps} fps "
+              f"({'con' if fx.has_audio else 'sin'} audio), backends: {results['backends']}")
+        for name in names:
+            result = run_case(name, fx, args.repeat)
+            results["cases"][name] = result
+            if result["status"] == "ok":
+                extra = f"  {result['fps']:>10.1f} frames/s" if result.get("fps") else ""
+                print(f"{name:<28} {result['median_s']:>9.4f} s{extra}")
+            elif result["status"] == "error":
+                print(f"{name:<28} ERROR ({result['reason']})")
+            else:
+                print(f"{name:<28} omitido ({result['reason']})")
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for name, before, after, ratio in regressions:
+            print(f"REGRESIÓN {name}: {before:.4f} s -> {after:.4f} s (x{ratio:.2f})")
+        if not regressions:
+            print(f"Sin regresiones respecto de {args.baseline} (umbral {args.threshold:.0%})")
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    output = args.output or os.path.join(RESULTS_DIR, f"bench_{datetime.now():%Y%m%d_%H%M%S}.json")
+    paths = [output] + ([BASELINE_PATH] if args.save_baseline else [])
+    for path in paths:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+    print(f"Resultados: {', '.join(paths)}")
+
+    errors = [name for name, result in results["cases"].items() if result["status"] == "error"]
+    if errors:
+        print(f"Casos con error: {', '.join(errors)}")
+    return 1 if regressions or errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+import json
+import argparse
+from src import realtime, face_tracking
+
+def main():
+    parser = argparse.ArgumentParser(description="Análisis de entrevistas en tiempo real")
+    parser.add_argument("source", help="Índice de cámara (0), URL de stream o archivo de video")
+    parser.add_argument("--interval", type=float, default=1.0,
+                        help="Segundos entre frames analizados (frecuencia de muestreo inicial)")
+    parser.add_argument("--max-interval", type=float, default=4.0,
+                        help="Intervalo máximo al degradar cuando la inferencia se atrasa")
+    parser.add_argument("--audio-window", type=float, default=5.0,
+                        help="Segundos de audio por ventana de transcripción")
+    parser.add_argument("--no-audio", action="store_true", help="Solo análisis facial")
+    parser.add_argument("--fast", action="store_true",
+                        help="Procesar el archivo lo más rápido posible en vez de a velocidad real")
+    parser.add_argument("--lstm", action="store_true", help="Suavizado incremental con la LSTM")
+    parser.add_argument("--face-detector", choices=face_tracking.DETECTORS, default=None,
+                        help="Detector de OpenCV con seguimiento del rostro (por defecto, DeepFace en cada frame)")
+    parser.add_argument("--duration", type=float, default=None, help="Detener tras N segundos")
+    parser.add_argument("--events-file", default=None, help="Guardar los eventos en JSON Lines")
+    args = parser.parse_args()
+
+    analyzer = realtime.LiveAnalyzer(
+        args.source, interval=args.interval, max_interval=args.max_interval,
+        audio_window=args.audio_window, with_audio=not args.no_audio,
+        realtime=not args.fast, smoothing=args.lstm, max_duration=args.duration,
+        face_detector=args.face_detector
+    )
+
+    print("=== ANÁLISIS EN VIVO (Ctrl+C para detener) ===")
+    events_file = open(args.events_file, "a", encoding="utf-8") if args.events_file else None
+    try:
+        for event in analyzer.events():
+            if event['type'] == 'incongruence':
+                print(f"[{event['segundo']:>5}s] ⚠ INCONGRUENCIA: rostro={event['emocion_facial']} "
+                      f"texto={event['emocion_texto']} \"{event['texto']}\"")
+            elif event['type'] == 'emotion_change':
+                print(f"[{event['segundo']:>5}s] Cambio de emoción: {event['desde']} -> {event['hacia']}")
+            elif event['type'] == 'transcript':
+                print(f"[{event['inicio']:>5.1f}s] Texto ({event['emocion_texto']}): {event['texto']}")
+            elif event['type'] == 'sampling':
+                print(f"         Muestreo ajustado: 1 frame cada {event['interval']} s "
+                      f"(latencia {event['latency']} s)")
+
+            if events_file:
+                events_file.write(json.dumps(event, ensure_ascii=False, default=str) + "\n")
+                events_file.flush()
+    except KeyboardInterrupt:
+        analyzer.stop()
+    finally:
+        if events_file:
+            events_file.close()
+
+    print(f"=== FIN === {analyzer.stats}")
+
+if __name__ == "__main__":
+    main()
@@ -1,83 +1,428 @@
 import os
+import glob
+import json
 import logging
-import matplotlib.pyplot as plt
-import seaborn as sns
-os.environ["PATH"] += os.pathsep + r"C:\ffmpeg\bin" ## Esto basicamente por si no encuentra Ffmpeg en las variables y ruta
-from src import media_processor, vision_module, audio_module, analysis_core
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from src import analysis_core, model_registry, pipeline, result_cache, report_store, plotting, face_tracking
+from src.instrumentation import measure, profiled, wall, write_run_summary
+
+LOG_FORMAT = "%(asctime)s - %(processName)s - %(levelname)s - %(message)s"
+
+DEFAULT_INPUT = os.path.join("data", "raw_videos", "dia3", "*.mp4")
+# Visión, sincronización, congruencia y reporte se ejecutan siempre
+OPTIONAL_STAGES = ("audio", "lstm", "plot")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Sistema de Análisis Multimodal de Entrevistas")
+    parser.add_argument("inputs", nargs="*", metavar="VIDEO",
+                        help=f"Videos o patrones glob (por defecto {DEFAULT_INPUT})")
+    parser.add_argument("--manifest",
+                        help="Archivo de texto con un video o patrón glob por línea (# para comentarios)")
+    parser.add_argument("--output-dir", default="data", help="Carpeta de reportes, gráficos y resúmenes")
+    parser.add_argument("--work-dir", default="data",
+                        help="Carpeta base de los archivos intermedios (processed_frames)")
+    parser.add_argument("--report-prefix", default="report_day5_", help="Prefijo de los reportes por video")
+    parser.add_argument("--report-formats", default="csv,parquet",
+                        help="Formatos del reporte por video, separados por coma: csv, json, parquet")
+    parser.add_argument("--store", default=None,
+                        help=f"Almacén SQLite consolidado de todos los videos "
+                             f"(por defecto <output-dir>/{report_store.STORE_NAME})")
+    parser.add_argument("--no-store", action="store_true", help="No escribir el almacén consolidado")
+    parser.add_argument("--frame-step", type=int, default=None,
+                        help="Analizar 1 de cada N frames (por defecto 1 por segundo)")
+    parser.add_argument("--whisper-size", default=model_registry.DEFAULT_CONFIG["whisper_size"],
+                        help="tiny / base / small ...: velocidad vs precisión")
+    parser.add_argument("--text-model", default=model_registry.DEFAULT_CONFIG["text_model"])
+    parser.add_argument("--lstm-path", default=model_registry.DEFAULT_CONFIG["lstm_path"])
+    parser.add_argument("--text-batch-size", type=int, default=pipeline.TEXT_BATCH_SIZE,
+                        help="Segmentos de Whisper por llamada al clasificador de texto")
+    parser.add_argument("--text-all-scores", action="store_true",
+                        help="Agregar al reporte la probabilidad de cada emoción del texto (columnas texto_*)")
+    parser.add_argument("--audio-chunk-seconds", type=float, default=pipeline.AUDIO_CHUNK_SECONDS,
+                        help="Decodificar y transcribir el audio por bloques de N segundos (memoria acotada "
+                             "en grabaciones de varias horas; por defecto, el audio completo de una vez)")
+    parser.add_argument("--workers", type=int, default=2,
+                        help="Procesos en paralelo (1 = secuencial). Cada uno carga sus propios modelos")
+    parser.add_argument("--adaptive-sampling", action="store_true",
+                        help="Muestrear más frames alrededor de los bordes de habla y los cambios de emoción "
+                             "y menos en silencios y escenas quietas (reemplaza --frame-step)")
+    parser.add_argument("--sampling-budget", type=float, default=pipeline.SAMPLING_BUDGET,
+                        help="Con --adaptive-sampling: inferencias faciales máximas por minuto de video")
+    parser.add_argument("--face-detector", choices=face_tracking.DETECTORS, default=None,
+                        help="Detector de OpenCV con seguimiento del rostro entre frames; las emociones se "
+                             "calculan sobre el recorte (por defecto, detección de DeepFace en cada frame)")
+    parser.add_argument("--hash-cache-size", type=int, default=pipeline.HASH_CACHE_SIZE,
+                        help="Rostros recientes indexados por dHash del recorte: un rostro casi igual a uno "
+                             "ya analizado reutiliza su resultado (0 = desactivado)")
+    parser.add_argument("--vision-batch-size", type=int, default=16,
+                        help="Rostros por lote en la inferencia de emociones (1 = frame a frame)")
+    parser.add_argument("--stages", default=",".join(OPTIONAL_STAGES),
+                        help="Etapas opcionales a ejecutar, separadas por coma (audio, lstm, plot). "
+                             "Visión, congruencia y reporte se ejecutan siempre")
+    parser.add_argument("--plot-max-points", type=int, default=plotting.MAX_POINTS,
+                        help="Puntos por serie en el gráfico; los videos más largos se submuestrean")
+    parser.add_argument("--save-frames", action="store_true",
+                        help="Guardar los frames en processed_frames (depuración)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Omitir los videos cuyos reportes ya están al día (mismo video y parámetros)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="No leer ni escribir resultados intermedios en el caché")
+    parser.add_argument("--invalidate-cache", nargs="?", const="all", choices=("all",) + result_cache.STAGES,
+                        help="Borra el caché antes de ejecutar (todo, o solo 'vision'/'audio')")
+    parser.add_argument("--cache-dir", default=os.path.join("data", "cache"))
+    parser.add_argument("--cache-max-gb", type=float, default=2.0,
+                        help="Tamaño máximo del caché; se borran primero las entradas menos usadas")
+    parser.add_argument("--profile", action="store_true",
+                        help="Guarda un perfil cProfile por video (profile_<video>.prof y .txt)")
+    args = parser.parse_args(argv)
+
+    args.stages = [stage for stage in args.stages.split(",") if stage]
+    unknown = set(args.stages) - set(OPTIONAL_STAGES)
+    if unknown:
+        parser.error(f"Etapas desconocidas: {sorted(unknown)}. Disponibles: {', '.join(OPTIONAL_STAGES)}")
+
+    args.report_formats = [fmt for fmt in args.report_formats.split(",") if fmt]
+    unknown = set(args.report_formats) - set(report_store.REPORT_FORMATS)
+    if unknown or not args.report_formats:
+        parser.error(f"Formatos desconocidos: {sorted(unknown)}. "
+                     f"Disponibles: {', '.join(report_store.REPORT_FORMATS)}")
+    if args.adaptive_sampling and args.frame_step:
+        parser.error("--adaptive-sampling y --frame-step no se combinan: el muestreo adaptativo decide los frames")
+    if args.sampling_budget <= 0:
+        parser.error("--sampling-budget debe ser positivo")
+    if args.face_detector:
+        # Fallar antes de lanzar los procesos si el detector no está disponible (OpenCV 5, modelo faltante)
+        try:
+            face_tracking.create_detector(args.face_detector)
+        except (ImportError, FileNotFoundError) as e:
+            parser.error(f"Detector '{args.face_detector}' no disponible: {e}")
+    if args.store is None and not args.no_store:
+        args.store = report_store.store_path(args.output_dir)
+    return args
+
+def resolve_videos(patterns, manifest=None):
+    """
+    Expande rutas y patrones glob (de la línea de comandos y del manifiesto) en
+    una lista de videos sin duplicados. Devuelve (videos, entradas sin coincidencias).
+    """
+    patterns = list(patterns)
+    if manifest:
+        with open(manifest, encoding="utf-8") as f:
+            patterns += [line.strip() for line in f if line.strip() and not line.lstrip().startswith("#")]
+
+    videos, missing = [], []
+    for pattern in patterns or [DEFAULT_INPUT]:
+        if glob.has_magic(pattern):
+            matches = sorted(glob.glob(pattern))
+        else:
+            matches = [pattern] if os.path.isfile(pattern) else []
+        if not matches:
+            missing.append(pattern)
+        videos.extend(matches)
+    return list(dict.fromkeys(videos)), missing
+
+def main(argv=None):
+    args = parse_args(argv)
 
-def main():
     # ---------------- CONFIGURACIÓN ----------------
-    VIDEO_NAMES = ["grupo_video1.mp4", "grupo_video2.mp4", "grupo_video3.mp4"]  # videos PROPIOS
-    BASE_DIR = "data"
-    RAW_VIDEO_DIR = os.path.join(BASE_DIR, "raw_videos", "dia3")
-    OUTPUT_DIR = BASE_DIR
+    MODEL_CONFIG = {
+        "whisper_size": args.whisper_size,
+        "text_model": args.text_model,
+        "lstm_path": args.lstm_path,
+    }
+    PIPELINE_CONFIG = {"frame_step": args.frame_step, "face_detector": args.face_detector,
+                       "adaptive_sampling": args.adaptive_sampling, "hash_cache_size": args.hash_cache_size,
+                       "text_batch_size": args.text_batch_size, "text_all_scores": args.text_all_scores,
+                       "audio_chunk_seconds": args.audio_chunk_seconds}
+    if args.adaptive_sampling:
+        PIPELINE_CONFIG["sampling_budget"] = args.sampling_budget
+    CACHE_CONFIG = {
+        "cache_dir": args.cache_dir,
+        "max_bytes": int(args.cache_max_gb * 1024 ** 3),
+        "enabled": not args.no_cache,
+    }
+    WARM_UP = models_to_warm_up(args.stages, args.vision_batch_size, PIPELINE_CONFIG, not args.no_cache)
+    RUN_OPTIONS = {
+        "base_dir": args.work_dir,
+        "output_dir": args.output_dir,
+        "report_prefix": args.report_prefix,
+        "report_formats": args.report_formats,
+        "store": None if args.no_store else args.store,
+        "save_frames": args.save_frames,
+        "vision_batch_size": args.vision_batch_size,
+        "stages": args.stages,
+        "profile": args.profile,
+        # Si cambia algo de esto, los reportes existentes ya no sirven para --resume
+        "params": {"stages": sorted(args.stages), "pipeline": PIPELINE_CONFIG, "models": MODEL_CONFIG},
+    }
 
-    # ---------------- VALIDACIÓN DE INPUT ----------------
-    missing_videos = []
+    # ---------------- LOGGING ----------------
+    logging.basicConfig(
+        level=logging.INFO,
+        format=LOG_FORMAT
+    )
 
-    if not os.path.exists(RAW_VIDEO_DIR):
-         logging.error(f"El directorio {RAW_VIDEO_DIR} no existe.")
-         return
-    
-    for video_name in VIDEO_NAMES:
-        video_path = os.path.join(RAW_VIDEO_DIR, video_name)
-        if not os.path.exists(video_path):
-            missing_videos.append(video_name)
+    # ---------------- VALIDACIÓN DE INPUT ----------------
+    video_paths, missing_videos = resolve_videos(args.inputs, args.manifest)
 
     if missing_videos:
         logging.error("No se encontraron los siguientes videos:")
         for v in missing_videos:
             logging.error(f" - {v}")
         logging.error("Corrige los archivos antes de ejecutar el sistema.")
-        return
+        return 1
 
-    # ---------------- LOGGING ----------------
-    logging.basicConfig(
-        level=logging.INFO,
-        format="%(asctime)s - %(levelname)s - %(message)s"
-    )
+    # Los reportes se nombran por el nombre del archivo: no puede repetirse
+    names = [os.path.basename(path) for path in video_paths]
+    duplicated = sorted({name for name in names if names.count(name) > 1})
+    if duplicated:
+        logging.error(f"Hay videos con el mismo nombre en distintas carpetas: {duplicated}")
+        return 1
+
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    if "parquet" in args.report_formats and not report_store.parquet_available():
+        logging.warning("pyarrow no está instalado: se omite el reporte Parquet")
+        RUN_OPTIONS["report_formats"] = [fmt for fmt in args.report_formats if fmt != "parquet"] or ["csv"]
 
     logging.info("=== INICIANDO SISTEMA DE ANÁLISIS DE ENTREVISTAS ===")
 
-    # ---------------- PROCESAR CADA VIDEO ----------------
-    for video_name in VIDEO_NAMES:
-        video_path = os.path.join(RAW_VIDEO_DIR, video_name)
+    result_cache.configure(**CACHE_CONFIG)
+    if args.invalidate_cache:
+        result_cache.invalidate(None if args.invalidate_cache == "all" else args.invalidate_cache)
+        logging.info(f"Caché invalidado: {args.invalidate_cache}")
 
-        if not os.path.exists(video_path):
-            logging.warning(f"Video no encontrado: {video_name}")
+    # ---------------- REANUDAR UN LOTE ----------------
+    jobs = []
+    for video_path in video_paths:
+        video_name = os.path.basename(video_path)
+        if args.resume and is_up_to_date(video_name, video_path, RUN_OPTIONS):
+            logging.info(f"Omitido (reportes al día): {video_name}")
             continue
+        jobs.append((video_name, video_path))
+    logging.info(f"Videos a procesar: {len(jobs)} de {len(video_paths)}")
+
+    # ---------------- PROCESAR VIDEOS EN PARALELO ----------------
+    results = []
+    # Los gráficos se generan en segundo plano a medida que termina cada video
+    charts = plotting.ChartWorker(args.output_dir, args.plot_max_points) if "plot" in args.stages else None
+
+    def collect(result):
+        plot_df = result.pop("plot_data", None)
+        if charts is not None and plot_df is not None:
+            charts.submit(result["video"], plot_df)
+        results.append(result)
 
-        logging.info(f"Procesando video: {video_name}")
+    if args.workers <= 1 or len(jobs) <= 1:
+        if jobs:
+            init_worker(MODEL_CONFIG, CACHE_CONFIG, PIPELINE_CONFIG, WARM_UP)
+        for video_name, video_path in jobs:
+            collect(process_video(video_name, video_path, RUN_OPTIONS))
+    else:
+        logging.info(f"Procesando {len(jobs)} videos con {args.workers} procesos")
+        with ProcessPoolExecutor(max_workers=args.workers, initializer=init_worker,
+                                 initargs=(MODEL_CONFIG, CACHE_CONFIG, PIPELINE_CONFIG, WARM_UP)) as executor:
+            futures = {}
+            for video_name, video_path in jobs:
+                future = executor.submit(process_video, video_name, video_path, RUN_OPTIONS)
+                futures[future] = video_name
 
-        # PASO 1: Procesamiento de medios
-        # Nota: Asegúrate de que tu función extract_media acepte estos 3 argumentos
-        audio_path, frames_folder = media_processor.extract_media(video_path, BASE_DIR, video_name)
+            for future in as_completed(futures):
+                try:
+                    collect(future.result())
+                except Exception as e:
+                    # Caída del proceso completo (p.ej. falta de memoria)
+                    results.append({"video": futures[future], "ok": False, "error": f"{type(e).__name__}: {e}"})
 
-        # PASO 2: Análisis facial
-        df_video = vision_module.analyze_faces(frames_folder)
-        logging.info(f"Frames analizados: {len(df_video)}")
+    if charts is not None:
+        logging.info("Esperando los gráficos pendientes...")
+        charts_done = charts.close()
+        for r in results:
+            chart = charts_done.get(r["video"])
+            if isinstance(chart, Exception):
+                logging.warning(f"No se pudo generar el gráfico de {r['video']}: {chart}")
+            elif chart is not None:
+                path_img, r["timings"]["plot"] = chart
+                logging.info(f"Gráfico guardado en: {path_img}")
 
-        # PASO 3: Audio + texto
-        df_audio = audio_module.analyze_audio(audio_path)
-        logging.info(f"Segmentos de audio detectados: {len(df_audio)}")
+    # ---------------- RESUMEN DEL LOTE ----------------
+    failed = [r for r in results if not r["ok"]]
+    for r in failed:
+        logging.error(f"Falló {r['video']}: {r['error']}")
+
+    summary = analysis_core.aggregate_congruence_metrics([r["metrics"] for r in results if r["ok"]])
+    for r in results:
+        if r["ok"]:
+            t = r["timings"]
+            logging.info(f"{r['video']}: audio+visión en {wall(t, 'media_parallel')} s "
+                         f"(ahorro por solapamiento: {t['media_parallel']['overlap_saved_s']} s), "
+                         f"frames reutilizados: {r['cache_stats']['frame_hit_rate']:.1%}, "
+                         f"carga de modelos del proceso: {r['model_load_times']}")
+    logging.info(f"Videos OK: {len(results) - len(failed)} / {len(results)} "
+                 f"(omitidos por estar al día: {len(video_paths) - len(jobs)})")
+    logging.info(f"Métricas globales: {summary}")
+
+    summary_path = write_run_summary(results, args.output_dir, extra={
+        "workers": args.workers,
+        "vision_batch_size": args.vision_batch_size,
+        "stages": args.stages,
+        "model_config": MODEL_CONFIG,
+        "pipeline_config": PIPELINE_CONFIG,
+        "cache_enabled": CACHE_CONFIG["enabled"],
+        "skipped": len(video_paths) - len(jobs),
+        "metrics": summary,
+    })
+    logging.info(f"Resumen de la corrida: {summary_path}")
+
+    logging.info("=== PROCESAMIENTO FINALIZADO ===")
+    return 1 if failed else 0
 
-        # PASO 4: Integración
+def models_to_warm_up(stages, vision_batch_size, pipeline_config, use_cache):
+    """
+    Modelos que conviene precargar según las etapas activas. Con el caché activado
+    visión y audio pueden no necesitar sus modelos (resultado ya guardado): esos
+    se cargan recién ante un fallo de caché. DeepFace.analyze (lotes de 1, sin
+    seguimiento ni caché de dHash) carga su propio modelo, no el del registro.
+    """
+    names = []
+    if not use_cache:
+        if "audio" in stages:
+            names += ["whisper", "text_classifier"]
+        if (vision_batch_size > 1 or pipeline_config.get("hash_cache_size")
+                or pipeline_config.get("face_detector")):
+            names.append("face_emotion")
+    if "lstm" in stages:
+        names.append("lstm")
+    return tuple(names)
+
+def init_worker(model_config, cache_config, pipeline_config=None, models=model_registry.MODEL_NAMES):
+    """
+    Inicializa cada proceso (del pool o el principal en modo secuencial): configura
+    logging y precarga con model_registry.warm_up() los modelos indicados (ver
+    models_to_warm_up); los demás se cargan al usarse. Los videos que procese ese
+    proceso reutilizan las mismas instancias.
+    """
+    logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
+    model_registry.configure(**model_config)
+    result_cache.configure(**cache_config)
+    pipeline.configure(**(pipeline_config or {}))
+    if not models:
+        return
+    try:
+        load_times = model_registry.warm_up(models)
+        logging.info(f"Modelos cargados (s): {load_times}")
+    except Exception as e:
+        # Si falla la precarga, cada etapa lo intentará de nuevo al usarse
+        logging.warning(f"No se pudieron precargar los modelos: {e}")
+
+def output_paths(video_name, options):
+    """Archivos que deja un video procesado (según las etapas activas)."""
+    output_dir, prefix = options["output_dir"], options["report_prefix"]
+    report_base = os.path.join(output_dir, f"{prefix}{video_name}")
+    paths = report_store.report_paths(report_base, options["report_formats"])
+    paths["stamp"] = f"{report_base}.run.json"
+    if "plot" in options["stages"]:
+        paths["plot"] = os.path.join(output_dir, f"grafico_{video_name}.png")
+    return paths
+
+def video_signature(video_path):
+    stat = os.stat(video_path)
+    return {"size": stat.st_size, "mtime": stat.st_mtime}
+
+def is_up_to_date(video_name, video_path, options):
+    """
+    True si las salidas del video existen y se generaron con el mismo archivo
+    de entrada (tamaño y fecha) y los mismos parámetros.
+    """
+    paths = output_paths(video_name, options)
+    if not all(os.path.exists(path) for path in paths.values()):
+        return False
+    try:
+        with open(paths["stamp"], encoding="utf-8") as f:
+            stamp = json.load(f)
+    except (OSError, ValueError):
+        return False
+    return stamp.get("video") == video_signature(video_path) and stamp.get("params") == options["params"]
+
+def process_video(video_name, video_path, options):
+    """
+    Ejecuta el pipeline completo de un video. Los errores quedan aislados:
+    nunca lanza excepción, devuelve un resumen con 'ok' y 'error'.
+    """
+    try:
+        profile_path = (os.path.join(options["output_dir"], f"profile_{video_name}.prof")
+                        if options["profile"] else None)
+        with profiled(profile_path):
+            metrics, insights, timings, vision_stats, plot_df = run_pipeline(video_name, video_path, options)
+
+        # Marca de "al día" para --resume: se escribe solo si todo terminó bien
+        with open(output_paths(video_name, options)["stamp"], "w", encoding="utf-8") as f:
+            json.dump({"video": video_signature(video_path), "params": options["params"]}, f, indent=2)
+
+        return {"video": video_name, "ok": True, "metrics": metrics, "insights": insights,
+                "timings": timings, "vision_stats": vision_stats,
+                "cache_stats": cache_stats(timings, vision_stats),
+                "model_load_times": model_registry.load_times(), "plot_data": plot_df}
+    except Exception as e:
+        logging.exception(f"Error procesando {video_name}")
+        return {"video": video_name, "ok": False, "error": f"{type(e).__name__}: {e}"}
+
+def cache_stats(timings, vision_stats):
+    """Aciertos de caché de un video: resultados en disco por etapa y frames reutilizados."""
+    return {
+        "vision_cache_hit": timings.get('vision', {}).get('cache_hit', False),
+        "audio_cache_hit": timings.get('audio', {}).get('cache_hit', False),
+        "frame_hit_rate": vision_stats.get('hit_rate', 0.0),
+        "hash_hit_rate": (vision_stats.get('hash_cache') or {}).get('hit_rate', 0.0),
+    }
+
+def run_pipeline(video_name, video_path, options):
+    """
+    Extracción, visión, audio, sincronización, LSTM y reporte de un video.
+    El gráfico no se genera aquí: se devuelven sus datos (o None si la etapa
+    'plot' está desactivada) y main los grafica en segundo plano.
+    """
+    logging.info(f"Procesando video: {video_name}")
+
+    stages = options["stages"]
+    output_dir = options["output_dir"]
+    timings = {}
+
+    # PASOS 1-3: Medios, análisis facial y audio + texto.
+    # El audio (Whisper + RoBERTa) corre en paralelo con la decodificación y el análisis facial
+    df_video, df_audio, media_timings = pipeline.run_video_stages(
+        video_path, options["base_dir"], video_name,
+        save_frames=options["save_frames"], vision_batch_size=options["vision_batch_size"],
+        use_cache=result_cache.is_enabled(), with_audio="audio" in stages
+    )
+    timings.update(media_timings)
+    vision_stats = df_video.attrs.get('vision_stats', {})
+    logging.info(f"Frames analizados: {len(df_video)}")
+    logging.info(f"Reutilización de resultados faciales: {vision_stats}")
+    logging.info(f"Segmentos de audio detectados: {len(df_audio)}")
+
+    # PASO 4: Integración
+    with measure(timings, 'sync', frames=len(df_video)):
         df_integrated = analysis_core.synchronize_data(df_video, df_audio)
 
-        # --- LO QUE FALTABA 2: ANÁLISIS TEMPORAL (REQUISITO DÍA 4) ---
+    # --- LO QUE FALTABA 2: ANÁLISIS TEMPORAL (REQUISITO DÍA 4) ---
+    if "lstm" in stages:
         logging.info("Aplicando Análisis Temporal (Series de Tiempo)...")
         # Intenta usar LSTM si existe, sino usa Suavizado, sino sigue con datos crudos
-        if hasattr(analysis_core, 'apply_lstm_smoothing'):
-            df_integrated = analysis_core.apply_lstm_smoothing(df_integrated)
-            logging.info("-> Modelo LSTM aplicado.")
-        elif hasattr(analysis_core, 'apply_temporal_smoothing'):
-            df_integrated = analysis_core.apply_temporal_smoothing(df_integrated)
-            logging.info("-> Suavizado temporal aplicado.")
-        else:
-            logging.warning("-> No se encontró función de suavizado. Usando datos crudos.")
-        # -------------------------------------------------------------
+        with measure(timings, 'lstm', frames=len(df_integrated)):
+            if hasattr(analysis_core, 'apply_lstm_smoothing'):
+                df_integrated = analysis_core.apply_lstm_smoothing(df_integrated)
+                logging.info("-> Modelo LSTM aplicado.")
+            elif hasattr(analysis_core, 'apply_temporal_smoothing'):
+                df_integrated = analysis_core.apply_temporal_smoothing(df_integrated)
+                logging.info("-> Suavizado temporal aplicado.")
+            else:
+                logging.warning("-> No se encontró función de suavizado. Usando datos crudos.")
+    # -------------------------------------------------------------
 
-        # PASO 5: Congruencia
+    # PASO 5: Congruencia
+    with measure(timings, 'congruence'):
         final_report = analysis_core.calculate_congruence(df_integrated)
 
         # DÍA 4 – ANÁLISIS AVANZADO EXTRA
@@ -86,73 +431,27 @@ def main():
         metrics = analysis_core.compute_congruence_metrics(final_report)
         insights = analysis_core.generate_insights(final_report)
 
-        logging.info(f"Métricas: {metrics}")
-        logging.info(f"Insights: {insights}")
-
-        # ---------------- SALIDAS ----------------
-        csv_path = os.path.join(OUTPUT_DIR, f"report_day5_{video_name}.csv")
-        json_path = os.path.join(OUTPUT_DIR, f"report_day5_{video_name}.json")
-
-        final_report.to_csv(csv_path, index=False)
-        final_report.to_json(json_path, orient="records", indent=2)
+    logging.info(f"Métricas: {metrics}")
+    logging.info(f"Insights: {insights}")
 
-        logging.info(f"Reporte generado: {csv_path}")
-        logging.info(f"Reporte JSON generado: {json_path}")
+    # ---------------- SALIDAS ----------------
+    report_base = os.path.join(output_dir, f"{options['report_prefix']}{video_name}")
 
-        logging.info("Generando visualización gráfica...")
-        path_img = generar_grafica_avanzada(final_report, video_name, OUTPUT_DIR)
-        logging.info(f"Gráfico guardado en: {path_img}")
+    with measure(timings, 'report', frames=len(final_report)):
+        report_paths = report_store.write_report(final_report, report_base, options["report_formats"])
+    for fmt, path in report_paths.items():
+        logging.info(f"Reporte {fmt.upper()} generado: {path}")
 
-    logging.info("=== PROCESAMIENTO FINALIZADO ===")
+    if options["store"]:
+        with measure(timings, 'store', frames=len(final_report)):
+            report_store.store_report(options["store"], video_name, final_report,
+                                      metrics, insights, video_path=video_path)
+        logging.info(f"Agregado al almacén consolidado: {options['store']}")
 
-def generar_grafica_avanzada(df, video_name, output_dir):
-    """
-    Genera un gráfico comparativo de emociones Video vs Texto a lo largo del tiempo.
-    Marca visualmente las incongruencias.
-    """
-    plt.figure(figsize=(14, 7))
-    sns.set_style("whitegrid")
+    plot_df = plotting.plot_data(final_report) if "plot" in stages else None
 
-    # Mapeo de emociones a valores numéricos para poder graficar
-    emotion_map = {
-        'neutral': 0, 'happy': 1, 'sad': 2, 'angry': 3, 
-        'fear': 4, 'surprise': 5, 'disgust': 6, 'no_detection': -1
-    }
-    
-    # Crear columnas numéricas temporales para el gráfico
-    df['video_val'] = df['emocion_facial'].apply(lambda x: emotion_map.get(str(x).lower(), 0))
-    df['text_val'] = df['emocion_texto'].apply(lambda x: emotion_map.get(str(x).lower(), 0))
-
-    # Lineplot de la emoción facial
-    sns.lineplot(data=df, x='segundo', y='video_val', label='Emoción Facial (Video)', 
-                 color='blue', linewidth=2, marker='o', markersize=4)
-
-    # Scatterplot de la emoción del texto (Solo puntos donde hay habla)
-    text_data = df[df['text_val'] != 0]
-    if not text_data.empty:
-        plt.scatter(text_data['segundo'], text_data['text_val'], 
-                    color='green', s=100, label='Emoción Texto', marker='s', zorder=5)
-
-    # Marcar Incongruencias
-    incongruencias = df[df['congruencia'] == 'INCONGRUENCIA']
-    if not incongruencias.empty:
-        plt.scatter(incongruencias['segundo'], incongruencias['video_val'], 
-                    color='red', s=150, label='Incongruencia', marker='X', zorder=10)
-
-    # Formato del eje Y
-    plt.yticks(list(emotion_map.values()), list(emotion_map.keys()))
-    plt.ylim(-1.5, 7)
-    
-    plt.title(f"Análisis Multimodal: {video_name}", fontsize=16)
-    plt.xlabel("Tiempo (segundos)", fontsize=12)
-    plt.ylabel("Emoción Detectada", fontsize=12)
-    plt.legend(loc='upper right')
-    
-    # Guardar
-    output_path = os.path.join(output_dir, f"grafico_{video_name}.png")
-    plt.savefig(output_path)
-    plt.close()
-    return output_path
+    logging.info("Tiempos por etapa (s): " + ", ".join(f"{name}={wall(timings, name)}" for name in timings))
+    return metrics, insights, timings, vision_stats, plot_df
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    raise SystemExit(main())
\ No newline at end of file
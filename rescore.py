@@ -0,0 +1,85 @@
+import os
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import pandas as pd
+
+from src import analysis_core, rescoring
+
+DEFAULT_INPUT = os.path.join("data", "report_*.*")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Re-puntúa reportes guardados (LSTM, congruencia, cambios, métricas e insights) "
+                    "sin volver a ejecutar DeepFace ni Whisper")
+    parser.add_argument("inputs", nargs="*", metavar="REPORTE",
+                        help=f"Reportes CSV/JSON/Parquet o patrones glob (por defecto {DEFAULT_INPUT})")
+    parser.add_argument("--output-dir", default=os.path.join("data", "rescored"),
+                        help="Carpeta de los reportes re-puntuados (los originales no se modifican)")
+    parser.add_argument("--formats", default="csv",
+                        help="Formatos de salida separados por coma: csv, json, parquet")
+    parser.add_argument("--lstm", choices=["auto", "on", "off"], default="auto",
+                        help="Suavizado LSTM: auto = solo si el reporte original lo tenía")
+    parser.add_argument("--alert-threshold", type=float, default=analysis_core.INCONGRUENCE_ALERT_THRESHOLD,
+                        help="%% de incongruencia a partir del cual se emite la alerta")
+    parser.add_argument("--mapping", default=None,
+                        help="JSON con equivalencias texto -> video que reemplazan las de TEXT_TO_VIDEO_EMOTION, "
+                             "p.ej. {\"surprise\": \"happy\"}")
+    parser.add_argument("--store", default=None, help="Actualizar también este almacén SQLite consolidado")
+    parser.add_argument("--report-prefix", default=rescoring.DEFAULT_PREFIX,
+                        help="Prefijo de los reportes (el --report-prefix de main.py); lo que sigue es el "
+                             "nombre del video en --store")
+    parser.add_argument("--workers", type=int, default=1, help="Procesos en paralelo")
+    args = parser.parse_args(argv)
+
+    formats = [fmt for fmt in args.formats.split(",") if fmt]
+    text_to_video = None
+    if args.mapping:
+        with open(args.mapping, encoding="utf-8") as f:
+            text_to_video = {**analysis_core.TEXT_TO_VIDEO_EMOTION, **json.load(f)}
+
+    reports = rescoring.find_reports(args.inputs or [DEFAULT_INPUT])
+    if not reports:
+        print("No se encontraron reportes.")
+        return 1
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    print(f"=== RE-PUNTUANDO {len(reports)} REPORTES ===")
+    start = time.perf_counter()
+    task = partial(_rescore_one, output_dir=args.output_dir, formats=formats, store=args.store,
+                   prefix=args.report_prefix, smoothing=args.lstm, alert_threshold=args.alert_threshold, text_to_video=text_to_video)
+    if args.workers > 1:
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            results = list(executor.map(task, reports, chunksize=max(1, len(reports) // (4 * args.workers))))
+    else:
+        results = [task(path) for path in reports]
+    elapsed = time.perf_counter() - start
+
+    ok = [r for r in results if "error" not in r]
+    for r in results:
+        if "error" in r:
+            print(f"   [ERROR] {r['report']}: {r['error']}")
+
+    summary = pd.DataFrame(ok)
+    summary_path = os.path.join(args.output_dir, "rescore_summary.csv")
+    summary.to_csv(summary_path, index=False)
+
+    if ok:
+        cols = ["video", "porcentaje_incongruencia", "cambios_congruencia", "insights"]
+        print(summary[[c for c in cols if c in summary.columns]].to_string(index=False))
+    print(f"Métricas globales: {analysis_core.aggregate_congruence_metrics([r for r in ok if 'total_frames' in r])}")
+    print(f"=== {len(ok)}/{len(results)} reportes en {elapsed:.2f} s -> {args.output_dir} ({summary_path}) ===")
+    return 0 if len(ok) == len(results) else 1
+
+def _rescore_one(path, **options):
+    """Un reporte; los errores no detienen el lote."""
+    try:
+        return rescoring.rescore_file(path, **options)
+    except Exception as e:
+        return {"report": path, "error": f"{type(e).__name__}: {e}"}
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,227 @@
+import math
+import numpy as np
+import pandas as pd
+from src import media_processor, vision_module, face_tracking
+
+# Muestreo adaptativo de la etapa de visión (pipeline.configure(adaptive_sampling=True)).
+#
+# En lugar de 1 frame por segundo fijo:
+#   1. Pasada gruesa: 1 frame cada COARSE_STEP segundos (corre en paralelo con Whisper).
+#   2. Con los segmentos de Whisper y la pasada gruesa se decide dónde refinar, por prioridad:
+#        a) 1 frame/s en los segundos alrededor de bordes de segmentos y cambios de emoción
+#        b) 1 frame/s en los tramos con habla que no son escenas quietas
+#        c) DENSE_RATE frames/s alrededor de los cambios de emoción (microexpresiones)
+#        d) DENSE_RATE frames/s alrededor de los bordes de los segmentos
+#      hasta agotar el presupuesto de inferencias por minuto de video.
+#   3. Las muestras se agregan por segundo (promedio de probabilidades); los segundos sin
+#      muestra repiten el último valor. La línea de tiempo `segundo` queda igual que con
+#      el muestreo fijo, así que synchronize_data y los reportes no cambian.
+
+DEFAULT_BUDGET = 90      # inferencias por minuto de video (el muestreo fijo usa 60)
+COARSE_STEP = 3          # segundos entre muestras de la pasada gruesa (silencio / escenas quietas)
+DENSE_RATE = 4           # muestras por segundo alrededor de bordes y cambios
+EVENT_WINDOW = 1         # segundos a cada lado de un borde o cambio que se refinan
+# Bits de dHash del rostro (vision_module.face_hash): dos muestras gruesas más parecidas que esto =
+# escena quieta. Sobre el frame completo dos expresiones distintas quedan a 2-6 bits de 64.
+STATIC_DISTANCE = vision_module.FACE_HASH_DISTANCE
+
+def timeline(video_path):
+    """
+    (frames por segundo de la línea de tiempo, cantidad de segundos), con el mismo
+    criterio que media_processor.iter_frames: el segundo s es el frame s * int(fps).
+    """
+    fps, frame_count = media_processor.video_info(video_path)
+    step = max(int(fps), 1)
+    return step, math.ceil(frame_count / step) if frame_count > 0 else 0
+
+def speech_mask(df_audio, seconds):
+    """True en los segundos que synchronize_data asigna a un segmento (inicio <= t <= fin)."""
+    mask = np.zeros(seconds, dtype=bool)
+    if df_audio is None or df_audio.empty:
+        return mask
+    for start, end in zip(df_audio['inicio'], df_audio['fin']):
+        mask[max(math.ceil(start), 0):min(math.floor(end) + 1, seconds)] = True
+    return mask
+
+def boundary_seconds(df_audio, seconds):
+    """Segundos donde empieza o termina un segmento de Whisper."""
+    if df_audio is None or df_audio.empty:
+        return set()
+    edges = np.concatenate([df_audio['inicio'].to_numpy(), df_audio['fin'].to_numpy()])
+    return {int(t) for t in edges if 0 <= t < seconds}
+
+def _around(points, seconds, window=EVENT_WINDOW):
+    """Segundos a distancia <= window de algún punto."""
+    result = set()
+    for point in points:
+        result.update(range(max(point - window, 0), min(point + window + 1, seconds)))
+    return result
+
+def coarse_events(coarse, hashes, static_distance=STATIC_DISTANCE):
+    """
+    A partir de la pasada gruesa (filas con 'segundo' y 'emocion_facial' ordenadas):
+    - segundos donde detect_emotional_changes se dispararía (todo el intervalo entre las
+      dos muestras, porque el cambio ocurrió en algún punto entre ambas)
+    - segundos dentro de escenas quietas (muestras vecinas casi iguales y misma emoción)
+    """
+    changes, static = set(), set()
+    seconds = coarse['segundo'].to_numpy()
+    changed = coarse['emocion_facial'].ne(coarse['emocion_facial'].shift()).to_numpy()
+    for i in range(1, len(seconds)):
+        previous, current = int(seconds[i - 1]), int(seconds[i])
+        if changed[i]:
+            changes.update(range(previous, current + 1))
+            continue
+        h1, h2 = hashes.get(previous), hashes.get(current)
+        if h1 is not None and h2 is not None and vision_module.hamming_distance(h1, h2) <= static_distance:
+            static.update(range(previous + 1, current))
+    return changes, static
+
+def _spread(candidates, n):
+    """n candidatos repartidos uniformemente (cuando no alcanza el presupuesto para todos)."""
+    if n >= len(candidates):
+        return candidates
+    if n <= 0:
+        return []
+    return [candidates[i] for i in np.unique(np.linspace(0, len(candidates) - 1, n).round().astype(int))]
+
+def plan_refinement(seconds, step, sampled, speech, boundaries, changes, static, budget_total,
+                    dense_rate=DENSE_RATE):
+    """
+    Índices de frame a analizar en la segunda pasada, por orden de prioridad y sin
+    pasarse de budget_total inferencias (contando las de la pasada gruesa).
+
+    Returns:
+        (índices, {nivel: cantidad elegida})
+    """
+    offsets = sorted({k * step // dense_rate for k in range(1, dense_rate)} - {0})
+    change_seconds = _around(sorted(changes), seconds)
+    boundary_seconds_ = _around(sorted(boundaries), seconds)
+    events = sorted(change_seconds | boundary_seconds_)
+
+    levels = [
+        ("eventos", [s * step for s in events]),
+        ("habla", [s * step for s in range(seconds) if speech[s] and s not in static]),
+        ("cambios_denso", [s * step + o for s in sorted(change_seconds) for o in offsets]),
+        ("bordes_denso", [s * step + o for s in sorted(boundary_seconds_ - change_seconds) for o in offsets]),
+    ]
+
+    chosen = set(sampled)
+    remaining = budget_total - len(chosen)
+    plan = {}
+    for name, candidates in levels:
+        candidates = [c for c in dict.fromkeys(candidates) if c not in chosen]
+        picked = _spread(candidates, remaining)
+        chosen.update(picked)
+        remaining -= len(picked)
+        plan[name] = len(picked)
+    return sorted(chosen - set(sampled)), plan
+
+def per_second(samples, step, seconds):
+    """
+    Agrega las muestras (una fila por frame, 'segundo' = índice de frame) a una fila por
+    segundo: promedio de las 7 probabilidades de las muestras con rostro; los segundos
+    sin muestra repiten el anterior. 'muestras' indica cuántos frames se analizaron.
+    """
+    labels = vision_module.EMOTION_LABELS
+    samples = samples.assign(segundo=samples['segundo'] // step)
+    counts = samples.groupby('segundo').size()
+
+    detected = samples[samples['emocion_facial'] != 'no_detection']
+    df = detected.groupby('segundo')[labels].mean()
+    df['emocion_facial'] = df[labels].idxmax(axis=1)
+
+    without_face = counts.index.difference(df.index)
+    if len(without_face):
+        df = pd.concat([df, pd.DataFrame([vision_module.no_detection_row(s) for s in without_face])
+                        .set_index('segundo')]).sort_index()
+
+    df = df.reindex(range(seconds)).ffill().bfill()
+    df.index.name = 'segundo'
+    df = df.reset_index()
+    df['muestras'] = counts.reindex(range(seconds), fill_value=0).to_numpy()
+    return df
+
+def _merge_stats(*stats):
+    merged = {key: sum(s.get(key, 0) for s in stats)
+              for key in ('total_frames', 'analyzed_frames', 'cache_hits', 'hash_hits')}
+    reused = merged['cache_hits'] + merged['hash_hits']
+    merged['hit_rate'] = round(reused / merged['total_frames'], 4) if merged['total_frames'] else 0.0
+    for key in ('hash_cache', 'tracking'):
+        merged[key] = next((s[key] for s in reversed(stats) if s.get(key)), None)
+    return merged
+
+def analyze_video(video_path, analyze, audio=None, budget=DEFAULT_BUDGET, wrap_frames=None, face_detector=None):
+    """
+    Etapa de visión con muestreo adaptativo.
+
+    Args:
+        analyze: función que recibe un iterable de (clave, frame) y devuelve el DataFrame
+            de vision_module.analyze_faces (la clave vuelve en 'segundo')
+        audio: función sin argumentos que devuelve df_audio (se llama después de la pasada
+            gruesa, así Whisper corre en paralelo); None = sin información de habla, se
+            refinan todos los segundos salvo las escenas quietas
+        budget: inferencias máximas por minuto de video
+        wrap_frames: opcional, envuelve cada generador de frames (p.ej. pipeline.prefetch_frames)
+        face_detector: el de la etapa de visión ("haar" / "dnn" / FaceTracker); recorta el rostro
+            de las muestras gruesas para detectar escenas quietas. None = detección de DeepFace
+
+    Returns:
+        DataFrame con un segundo por fila, como el muestreo fijo, más la columna 'muestras'.
+    """
+    wrap_frames = wrap_frames or (lambda frames: frames)
+    step, seconds = timeline(video_path)
+    if seconds == 0:
+        return analyze([])
+
+    budget_total = max(math.ceil(budget * seconds / 60), 1)
+    # Si el presupuesto no alcanza ni para la pasada gruesa, se espacia más
+    coarse_step = max(COARSE_STEP, math.ceil(seconds / budget_total))
+    hashes = {}
+    # Seguimiento propio: el de la etapa de visión recibe los frames en otro orden
+    if isinstance(face_detector, face_tracking.FaceTracker):
+        face_detector = face_detector.detector
+    tracker = face_tracking.FaceTracker(face_detector) if face_detector is not None else None
+
+    def hashed(frames):
+        for index, frame in frames:
+            frame_hash = vision_module.face_hash(frame, tracker) if frame is not None else None
+            if frame_hash is not None:
+                hashes[index // step] = frame_hash
+            yield index, frame
+
+    coarse_frames = [s * step for s in range(0, seconds, coarse_step)]
+    coarse = analyze(hashed(wrap_frames(media_processor.iter_frames_at(video_path, coarse_frames))))
+    coarse_stats = coarse.attrs.get('vision_stats', {})
+    coarse_seconds = coarse.assign(segundo=coarse['segundo'] // step).sort_values('segundo')
+    changes, static = coarse_events(coarse_seconds, hashes)
+
+    df_audio = audio() if audio is not None else None
+    speech = speech_mask(df_audio, seconds) if df_audio is not None else np.ones(seconds, dtype=bool)
+    boundaries = boundary_seconds(df_audio, seconds)
+
+    refine, plan = plan_refinement(seconds, step, coarse['segundo'].tolist(), speech, boundaries,
+                                   changes, static, budget_total)
+    samples = coarse
+    refine_stats = {}
+    if refine:
+        refined = analyze(wrap_frames(media_processor.iter_frames_at(video_path, refine)))
+        refine_stats = refined.attrs.get('vision_stats', {})
+        samples = pd.concat([coarse, refined], ignore_index=True)
+
+    df = per_second(samples, step, seconds)
+    df.attrs['vision_stats'] = {
+        **_merge_stats(coarse_stats, refine_stats),
+        'adaptive': {
+            'seconds': seconds,
+            'budget': budget_total,
+            'inferences': len(samples),
+            'coarse_step': coarse_step,
+            'coarse': len(coarse),
+            **plan,
+            'seconds_sampled': int((df['muestras'] > 0).sum()),
+        },
+    }
+    print(f"   [VISION] Muestreo adaptativo: {len(samples)} frames analizados para {seconds} s "
+          f"(presupuesto {budget_total}; gruesa {len(coarse)}, refinado {plan})")
+    return df
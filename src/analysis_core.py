@@ -2,45 +2,98 @@ import pandas as pd
 import numpy as np
 from src import lstm_model 
 
+# Etiquetas de texto (RoBERTa) -> terminología de video (DeepFace)
+TEXT_TO_VIDEO_EMOTION = {
+    'anger': 'angry', 'joy': 'happy', 'sadness': 'sad',
+    'disgust': 'disgust', 'fear': 'fear', 'surprise': 'surprise',
+    'neutral': 'neutral'
+}
+
+# Códigos numéricos de cada emoción (eje Y del gráfico)
+EMOTION_CODES = {
+    'neutral': 0, 'happy': 1, 'sad': 2, 'angry': 3,
+    'fear': 4, 'surprise': 5, 'disgust': 6, 'no_detection': -1
+}
+
+CONGRUENCE_LABELS = ["Congruente", "INCONGRUENCIA", "No aplicable"]
+
+# % de segundos incongruentes a partir del cual generate_insights emite la alerta
+INCONGRUENCE_ALERT_THRESHOLD = 20
+
+# Columnas de etiquetas que se guardan como categóricas en el reporte
+EMOTION_LABEL_COLUMNS = ['emocion_facial', 'emocion_facial_raw', 'emocion_texto']
+
+def _match_segments(seconds, starts, ends, chunk_cells=4_000_000):
+    """
+    Para cada segundo devuelve el índice del primer segmento con inicio <= t <= fin,
+    o -1 si ninguno lo cubre.
+    """
+    seconds = np.asarray(seconds, dtype=float)
+    starts = np.asarray(starts, dtype=float)
+    ends = np.asarray(ends, dtype=float)
+
+    if len(starts) == 0:
+        return np.full(len(seconds), -1, dtype=np.intp)
+
+    if np.all(np.diff(starts) >= 0) and np.all(np.diff(ends) >= 0):
+        # Caso Whisper (segmentos ordenados): los que cubren t son un rango contiguo
+        # [j, k) y el primero es j. Dos búsquedas binarias por segundo: O(n log m)
+        k = np.searchsorted(starts, seconds, side='right')  # segmentos con inicio <= t
+        j = np.searchsorted(ends, seconds, side='left')     # primero con fin >= t
+        return np.where(j < k, j, -1)
+
+    # Segmentos desordenados o solapados: comparación por bloques (memoria acotada)
+    matches = np.empty(len(seconds), dtype=np.intp)
+    step = max(1, chunk_cells // len(starts))
+    for i in range(0, len(seconds), step):
+        block = seconds[i:i + step, np.newaxis]
+        covers = (starts <= block) & (ends >= block)
+        matches[i:i + step] = np.where(covers.any(axis=1), covers.argmax(axis=1), -1)
+    return matches
+
 def synchronize_data(df_video, df_audio):
     """
     Combina los datos frame a frame (segundo a segundo) con el segmento de audio correspondiente.
     """
-    merged_data = []
+    # Guardamos TODO el vector numérico también en el merged (si existe)
+    merged = df_video.reset_index(drop=True).copy()
 
-    for _, row_vid in df_video.iterrows():
-        current_sec = row_vid['segundo']
-        
-        # Guardamos TODO el vector numérico también en el merged (si existe)
-        row_data = row_vid.to_dict()
-        
-        # Buscar en qué segmento de audio cae este segundo
-        match = df_audio[
-            (df_audio['inicio'] <= current_sec) & 
-            (df_audio['fin'] >= current_sec)
-        ]
-        
-        if not match.empty:
-            # Tomamos el primer match
-            row_data['texto'] = match.iloc[0]['texto']
-            row_data['emocion_texto'] = match.iloc[0]['emocion_texto']
-        else:
-            row_data['texto'] = "[Silencio]"
-            row_data['emocion_texto'] = "neutral"
-
-        merged_data.append(row_data)
-        
-    return pd.DataFrame(merged_data)
+    if df_audio.empty or 'inicio' not in df_audio.columns:
+        merged['texto'] = "[Silencio]"
+        merged['emocion_texto'] = "neutral"
+        return merged
+
+    # Buscar en qué segmento de audio cae cada segundo (join por intervalos)
+    seg_idx = _match_segments(merged['segundo'].to_numpy(), df_audio['inicio'].to_numpy(),
+                              df_audio['fin'].to_numpy())
+    found = seg_idx >= 0
+    safe_idx = np.where(found, seg_idx, 0)
 
-def apply_lstm_smoothing(df):
+    texts = df_audio['texto'].to_numpy(dtype=object)
+    emotions = df_audio['emocion_texto'].to_numpy(dtype=object)
+
+    # Sin segmento: silencio con emoción neutral
+    merged['texto'] = np.where(found, texts[safe_idx], "[Silencio]")
+    merged['emocion_texto'] = np.where(found, emotions[safe_idx], "neutral")
+
+    # Vector completo de emociones del texto (audio_module con return_all_scores)
+    for col in df_audio.columns:
+        if col.startswith('texto_'):
+            silence_value = 1.0 if col == 'texto_neutral' else 0.0
+            merged[col] = np.where(found, df_audio[col].to_numpy()[safe_idx], silence_value)
+
+    return merged
+
+def apply_lstm_smoothing(df, model_path=None):
     """
     Usa el modelo LSTM entrenado para predecir emociones suavizadas.
+    model_path None = el configurado en model_registry (--lstm-path).
     """
     print("   [LSTM] Ejecutando inferencia de series temporales...")
     
     # Llamamos a la función predict_sequence del módulo lstm_model
     try:
-        new_emotions = lstm_model.predict_sequence(df)
+        new_emotions = lstm_model.predict_sequence(df, model_path)
         
         # Guardar original y nueva
         df['emocion_facial_raw'] = df['emocion_facial']
@@ -51,37 +104,60 @@ def apply_lstm_smoothing(df):
     
     return df
 
-def calculate_congruence(df):
+def _labels_lower(df, column, mapping=None, default='neutral'):
     """
-    Determina si la emoción facial coincide con la del texto.
+    Equivale a str(valor).lower() (y opcionalmente mapping.get(..., default)) por fila,
+    pero trabajando sobre las categorías: cada etiqueta distinta se procesa una vez
+    y luego se expande con los códigos.
     """
-    map_text_to_video = {
-        'anger': 'angry', 'joy': 'happy', 'sadness': 'sad',
-        'disgust': 'disgust', 'fear': 'fear', 'surprise': 'surprise',
-        'neutral': 'neutral'
-    }
+    if column not in df.columns:
+        return np.full(len(df), default if mapping is None else mapping.get(default, default), dtype=object)
 
-    congruencia_list = []
+    values = df[column].astype('category')
+    labels = values.cat.categories.astype(str).str.lower().to_numpy(dtype=object)
+    # El código -1 (valor faltante) cae en la última posición: str(NaN) == 'nan'
+    labels = np.append(labels, 'nan')
+    if mapping is not None:
+        labels = np.array([mapping.get(label, default) for label in labels], dtype=object)
 
-    for _, row in df.iterrows():
-        # Manejo seguro por si no existen las columnas
-        vid_em = str(row.get('emocion_facial', 'neutral')).lower()
-        txt_em_raw = str(row.get('emocion_texto', 'neutral')).lower()
-        
-        # Normalizar texto a terminología de video
-        txt_em_norm = map_text_to_video.get(txt_em_raw, 'neutral')
-        
-        # Lógica de congruencia
-        if vid_em == 'no_detection' or row.get('texto') == "[Silencio]":
-            congruencia_list.append("No aplicable")
-        elif vid_em == txt_em_norm:
-            congruencia_list.append("Congruente")
-        else:
-            congruencia_list.append("INCONGRUENCIA")
-
-    df['congruencia'] = congruencia_list
+    return labels[values.cat.codes.to_numpy()]
+
+def emotion_codes(series):
+    """Código int8 de cada emoción según EMOTION_CODES (0 si no se reconoce)."""
+    return _labels_lower(series.to_frame('e'), 'e', EMOTION_CODES, default=0).astype(np.int8)
+
+def compact_emotion_columns(df):
+    """Guarda las columnas de etiquetas como categóricas (códigos int8 en memoria)."""
+    for col in EMOTION_LABEL_COLUMNS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('category')
     return df
 
+def calculate_congruence(df, text_to_video=None):
+    """
+    Determina si la emoción facial coincide con la del texto.
+    text_to_video reemplaza la equivalencia texto -> video (TEXT_TO_VIDEO_EMOTION).
+    """
+    # Manejo seguro por si no existen las columnas
+    vid_em = _labels_lower(df, 'emocion_facial')
+    # Normalizar texto a terminología de video
+    txt_em_norm = _labels_lower(df, 'emocion_texto', text_to_video or TEXT_TO_VIDEO_EMOTION)
+
+    if 'texto' in df.columns:
+        silence = (df['texto'] == "[Silencio]").to_numpy()
+    else:
+        silence = np.zeros(len(df), dtype=bool)
+
+    # Lógica de congruencia
+    congruencia = np.select(
+        [(vid_em == 'no_detection') | silence, vid_em == txt_em_norm],
+        ["No aplicable", "Congruente"],
+        default="INCONGRUENCIA"
+    )
+
+    df['congruencia'] = pd.Categorical(congruencia, categories=CONGRUENCE_LABELS)
+    return compact_emotion_columns(df)
+
 def detect_emotional_changes(df):
     """Detecta cambios bruscos de emoción."""
     df['cambio_emocion'] = df['emocion_facial'].ne(df['emocion_facial'].shift())
@@ -101,12 +177,27 @@ def compute_congruence_metrics(df):
         "porcentaje_incongruencia": round(porcentaje, 2)
     }
 
-def generate_insights(df):
+def aggregate_congruence_metrics(metrics_list):
+    """Combina las métricas de varios videos en un resumen global del lote."""
+    metrics_list = [m for m in metrics_list if m]
+    if not metrics_list: return {}
+
+    total = sum(m['total_frames'] for m in metrics_list)
+    incongruencias = sum(m['incongruencias_detectadas'] for m in metrics_list)
+
+    return {
+        "videos": len(metrics_list),
+        "total_frames": total,
+        "incongruencias_detectadas": incongruencias,
+        "porcentaje_incongruencia": round((incongruencias / total) * 100, 2) if total else 0.0
+    }
+
+def generate_insights(df, alert_threshold=INCONGRUENCE_ALERT_THRESHOLD):
     """Genera texto automático para el reporte."""
     metrics = compute_congruence_metrics(df)
     if not metrics: return "Sin datos."
     
-    if metrics['porcentaje_incongruencia'] > 20:
+    if metrics['porcentaje_incongruencia'] > alert_threshold:
         return "ALERTA: Alta tasa de incongruencia. Posible engaño o nerviosismo."
     else:
         return "El sujeto muestra consistencia entre expresiones faciales y discurso."
\ No newline at end of file
@@ -1,41 +1,96 @@
-import whisper
 import pandas as pd
-from transformers import pipeline
-
-#Whisper (ASR), Transformers (RoBERTa emociones) 
-def analyze_audio(audio_path):
-    # 1. Cargar Whisper (ASR)
-    # 'base' es un buen balance entre velocidad y precisión para CPU
-    model = whisper.load_model("base")
-    result = model.transcribe(audio_path, fp16=False) # fp16=False para evitar warnings en CPU
-    
-    # 2. Cargar Modelo de Emociones (NLP)
-    # Usamos uno específico para emociones (RoBERTa)
-    emotion_classifier = pipeline(
-        "text-classification", 
-        model="j-hartmann/emotion-english-distilroberta-base", 
-        top_k=1
-    )
+from src import model_registry, media_processor
+from src.instrumentation import measure
+
+# Prefijo de las columnas con el vector completo de emociones del texto
+SCORE_PREFIX = 'texto_'
+
+def classify_texts(texts, batch_size=16):
+    """
+    Clasifica la emoción de varios textos en llamadas por lotes.
+    Los textos repetidos se clasifican una sola vez.
+
+    Returns:
+        dict texto -> lista de {'label', 'score'} con todas las clases (mayor score primero)
+    """
+    unique_texts = list(dict.fromkeys(texts))
+    if not unique_texts:
+        return {}
+
+    emotion_classifier = model_registry.get_text_classifier()
+    # Truncation=True por si el texto es muy largo; top_k=None devuelve las 7 clases
+    predictions = emotion_classifier(unique_texts, batch_size=batch_size, truncation=True, top_k=None)
+    return dict(zip(unique_texts, predictions))
+
+def segments_to_frame(segments, batch_size=16, return_all_scores=False, offset=0.0, timings=None):
+    """
+    Clasifica la emoción de los segmentos de Whisper y arma el DataFrame del audio.
+    offset desplaza los tiempos (transcripción por bloques).
+    """
+    with measure({} if timings is None else timings, 'roberta', accumulate=True):
+        predictions = classify_texts([segment['text'] for segment in segments], batch_size)
 
     data = []
-    
-    for segment in result['segments']:
+
+    for segment in segments:
         text = segment['text']
-        start = segment['start']
-        end = segment['end']
-        
-        # Clasificar emoción del texto
-        # Truncation=True por si el texto es muy largo
-        emotion_prediction = emotion_classifier(text, truncation=True)
-        emotion_label = emotion_prediction[0][0]['label']
-        confidence = emotion_prediction[0][0]['score']
-
-        data.append({
-            'inicio': start,
-            'fin': end,
+        prediction = predictions[text]
+        best = max(prediction, key=lambda p: p['score'])
+
+        row = {
+            'inicio': segment['start'] + offset,
+            'fin': segment['end'] + offset,
             'texto': text.strip(),
-            'emocion_texto': emotion_label,
-            'confianza_texto': confidence
-        })
-        
-    return pd.DataFrame(data)
\ No newline at end of file
+            'emocion_texto': best['label'],
+            'confianza_texto': best['score']
+        }
+        if return_all_scores:
+            for p in sorted(prediction, key=lambda p: p['label']):
+                row[SCORE_PREFIX + p['label']] = p['score']
+
+        data.append(row)
+
+    return pd.DataFrame(data)
+
+def iter_audio_segments(video_path, chunk_seconds=300, batch_size=16, return_all_scores=False,
+                        timings=None):
+    """
+    Transcripción por bloques de chunk_seconds con memoria acotada: decodifica,
+    transcribe y clasifica un bloque a la vez y entrega su DataFrame de segmentos
+    (tiempos absolutos) apenas está listo, antes de terminar la grabación completa.
+    """
+    timings = {} if timings is None else timings
+    model = model_registry.get_whisper()
+    for offset, samples in media_processor.iter_audio_chunks(video_path, chunk_seconds):
+        with measure(timings, 'whisper', accumulate=True):
+            result = model.transcribe(samples, fp16=False)
+        yield segments_to_frame(result['segments'], batch_size, return_all_scores, offset, timings)
+
+#Whisper (ASR), Transformers (RoBERTa emociones)
+def analyze_audio(audio, batch_size=16, return_all_scores=False, chunk_seconds=None, timings=None):
+    """
+    Transcribe el audio y clasifica la emoción de cada segmento.
+
+    Args:
+        audio: Ruta de un archivo de audio/video o buffer float32 mono 16 kHz
+            (media_processor.load_audio)
+        batch_size: Segmentos por llamada al clasificador de texto
+        return_all_scores: Agrega una columna texto_<emoción> por clase con su probabilidad
+        chunk_seconds: Si se indica (y audio es una ruta), transcribe por bloques
+            para acotar la memoria en grabaciones de varias horas
+        timings: Si se indica, guarda las métricas de 'whisper' y 'roberta'
+    """
+    if chunk_seconds and isinstance(audio, str):
+        # Solo se acumulan los segmentos (texto y etiquetas, pocos KB por hora); las
+        # muestras de cada bloque se liberan antes de decodificar el siguiente
+        chunks = [chunk for chunk in iter_audio_segments(audio, chunk_seconds, batch_size, return_all_scores,
+                                                         timings) if not chunk.empty]
+        return pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+
+    # 1. Whisper (ASR)
+    model = model_registry.get_whisper()
+    with measure({} if timings is None else timings, 'whisper'):
+        result = model.transcribe(audio, fp16=False) # fp16=False para evitar warnings en CPU
+
+    # 2. Modelo de Emociones (NLP): todos los segmentos en lotes
+    return segments_to_frame(result['segments'], batch_size, return_all_scores, timings=timings)
@@ -0,0 +1,157 @@
+import os
+import cv2
+import numpy as np
+
+# Detectores de OpenCV para el modo con seguimiento (vision_module con face_detector=...)
+#   haar: cascada frontal incluida en opencv-python 4.x (sin archivos extra)
+#   dnn:  YuNet (cv2.FaceDetectorYN, OpenCV >= 4.5.4); el modelo ONNX se descarga aparte
+#         del opencv_zoo y se deja en DNN_MODEL_PATH
+DETECTORS = ("haar", "dnn")
+DNN_MODEL_PATH = os.path.join("models", "face_detection_yunet_2023mar.onnx")
+
+# Tamaño de entrada del modelo de emociones de DeepFace (gris 48x48 en [0, 1])
+FACE_SIZE = 48
+
+class HaarDetector:
+    """Cascada de Haar frontal: la opción más rápida en CPU."""
+
+    def __init__(self, scale_factor=1.1, min_neighbors=5, min_size=40):
+        if not hasattr(cv2, "CascadeClassifier"):
+            # OpenCV 5 sacó las cascadas del paquete principal
+            raise ImportError(f"OpenCV {cv2.__version__} no incluye CascadeClassifier; usar el detector 'dnn'")
+        path = os.path.join(cv2.data.haarcascades, "haarcascade_frontalface_default.xml")
+        self.cascade = cv2.CascadeClassifier(path)
+        if self.cascade.empty():
+            raise FileNotFoundError(f"No se pudo cargar la cascada de Haar: {path}")
+        self.scale_factor = scale_factor
+        self.min_neighbors = min_neighbors
+        self.min_size = min_size
+
+    def __call__(self, image):
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+        boxes = self.cascade.detectMultiScale(gray, scaleFactor=self.scale_factor, minNeighbors=self.min_neighbors,
+                                              minSize=(self.min_size, self.min_size))
+        return [tuple(int(v) for v in box) for box in boxes]
+
+class DnnDetector:
+    """YuNet (red convolucional chica de OpenCV): más robusto que Haar con rostros girados o poca luz."""
+
+    def __init__(self, model_path=DNN_MODEL_PATH, score_threshold=0.6):
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f"Falta el modelo del detector DNN: {model_path}")
+        self.detector = cv2.FaceDetectorYN.create(model_path, "", (320, 320), score_threshold)
+        self.input_size = None
+
+    def __call__(self, image):
+        if image.ndim == 2:
+            image = cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+        h, w = image.shape[:2]
+        if self.input_size != (w, h):  # la ventana de seguimiento cambia de tamaño
+            self.detector.setInputSize((w, h))
+            self.input_size = (w, h)
+        _, faces = self.detector.detect(image)
+        if faces is None:
+            return []
+        boxes = []
+        for x, y, bw, bh in faces[:, :4]:
+            x1, y1 = max(int(x), 0), max(int(y), 0)
+            x2, y2 = min(int(x + bw), w), min(int(y + bh), h)
+            if x2 > x1 and y2 > y1:
+                boxes.append((x1, y1, x2 - x1, y2 - y1))
+        return boxes
+
+def create_detector(backend):
+    if backend == "haar":
+        return HaarDetector()
+    if backend == "dnn":
+        return DnnDetector()
+    raise ValueError(f"Detector de rostros desconocido: {backend}. Disponibles: {', '.join(DETECTORS)}")
+
+def crop_face(frame, box=None, size=FACE_SIZE):
+    """
+    Recorte del rostro en gris size x size y [0, 1], listo para el modelo de emociones.
+    Sin box se usa el frame completo (lo mismo que hace DeepFace con enforce_detection=False).
+    """
+    if box is not None:
+        x, y, w, h = box
+        frame = frame[y:y + h, x:x + w]
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+    return cv2.resize(gray, (size, size), interpolation=cv2.INTER_AREA).astype(np.float32) / 255.0
+
+class FaceTracker:
+    """
+    Sigue el rostro principal entre frames: después de una detección, el siguiente
+    frame se busca solo en una ventana alrededor de la caja anterior (search_margin
+    veces su tamaño a cada lado). La detección en el frame completo (reducido a
+    detect_width de ancho) se repite solo cuando el rostro se pierde.
+    """
+
+    def __init__(self, detector, search_margin=0.5, detect_width=640):
+        self.detector = create_detector(detector) if isinstance(detector, str) else detector
+        self.backend = detector if isinstance(detector, str) else type(detector).__name__
+        self.search_margin = search_margin
+        self.detect_width = detect_width
+        self.box = None
+        self.full_detections = 0
+        self.roi_detections = 0
+        self.lost = 0
+        self.misses = 0
+
+    def _search_window(self, shape):
+        x, y, w, h = self.box
+        mx, my = int(w * self.search_margin), int(h * self.search_margin)
+        x1, y1 = max(x - mx, 0), max(y - my, 0)
+        x2, y2 = min(x + w + mx, shape[1]), min(y + h + my, shape[0])
+        return x1, y1, x2, y2
+
+    def _closest(self, boxes):
+        """Entre varias caras, la más cercana a la anterior (o la más grande si no hay anterior)."""
+        if self.box is None:
+            return max(boxes, key=lambda b: b[2] * b[3])
+        cx, cy = self.box[0] + self.box[2] / 2, self.box[1] + self.box[3] / 2
+        return min(boxes, key=lambda b: (b[0] + b[2] / 2 - cx) ** 2 + (b[1] + b[3] / 2 - cy) ** 2)
+
+    def _detect_full(self, frame):
+        self.full_detections += 1
+        scale = min(1.0, self.detect_width / frame.shape[1]) if self.detect_width else 1.0
+        small = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA) if scale < 1 else frame
+        boxes = self.detector(small)
+        return [tuple(int(round(v / scale)) for v in box) for box in boxes]
+
+    def locate(self, frame):
+        """Caja (x, y, w, h) del rostro en el frame, o None."""
+        if self.box is not None:
+            x1, y1, x2, y2 = self._search_window(frame.shape)
+            boxes = self.detector(frame[y1:y2, x1:x2])
+            if boxes:
+                self.roi_detections += 1
+                bx, by, bw, bh = self._closest([(bx + x1, by + y1, bw, bh) for bx, by, bw, bh in boxes])
+                self.box = (bx, by, bw, bh)
+                return self.box
+            self.lost += 1
+            self.box = None
+
+        boxes = self._detect_full(frame)
+        if not boxes:
+            self.misses += 1
+            return None
+        self.box = self._closest(boxes)
+        return self.box
+
+    def face(self, frame):
+        """Rostro recortado y reducido para el modelo de emociones (el frame completo si no hay rostro)."""
+        return crop_face(frame, self.locate(frame))
+
+    def reset(self):
+        self.box = None
+
+    def stats(self):
+        located = self.full_detections - self.misses + self.roi_detections
+        return {
+            'backend': self.backend,
+            'full_detections': self.full_detections,
+            'roi_detections': self.roi_detections,
+            'lost': self.lost,
+            'misses': self.misses,
+            'roi_rate': round(self.roi_detections / located, 4) if located else 0.0,
+        }
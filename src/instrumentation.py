@@ -0,0 +1,109 @@
+import os
+import json
+import time
+import pstats
+import cProfile
+import platform
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import resource  # No existe en Windows
+except ImportError:
+    resource = None
+
+def peak_rss_mb():
+    """Memoria residente máxima del proceso hasta ahora (MB), o None si no se puede medir."""
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reporta KB, macOS bytes
+        return round(peak / (1024 * 1024 if platform.system() == "Darwin" else 1024), 1)
+    try:
+        import psutil
+        info = psutil.Process().memory_info()
+        return round(getattr(info, "peak_wset", info.rss) / (1024 * 1024), 1)
+    except ImportError:
+        return None
+
+@contextmanager
+def measure(metrics, name, frames=None, accumulate=False):
+    """
+    Mide un bloque y guarda en metrics[name]:
+    wall_s (reloj), cpu_s (CPU de todo el proceso: si dos etapas corren en
+    paralelo, su CPU se superpone), process_peak_rss_mb (pico de memoria de todo
+    el proceso hasta el fin de la etapa, no de la etapa) y, si se conocen, frames y fps.
+    El bloque puede completar la entrada (p.ej. entry['frames'] = n). Si anota
+    entry['wait_s'] (tiempo bloqueado esperando a otra etapa), ese tiempo se
+    descuenta de wall_s y queda aparte.
+    Con accumulate=True suma a la entrada existente (etapas medidas por bloques).
+    """
+    entry = {}
+    if frames is not None:
+        entry['frames'] = frames
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    try:
+        yield entry
+    finally:
+        wait = entry.get('wait_s', 0.0)
+        entry['wall_s'] = round(time.perf_counter() - wall_start - wait, 3)
+        entry['cpu_s'] = round(time.process_time() - cpu_start, 3)
+        if 'wait_s' in entry:
+            entry['wait_s'] = round(wait, 3)
+
+        if accumulate and name in metrics:
+            previous = metrics[name]
+            entry['wall_s'] = round(entry['wall_s'] + previous['wall_s'], 3)
+            entry['cpu_s'] = round(entry['cpu_s'] + previous['cpu_s'], 3)
+            if 'frames' in previous:
+                entry['frames'] = entry.get('frames', 0) + previous['frames']
+            if 'wait_s' in previous:
+                entry['wait_s'] = round(entry.get('wait_s', 0.0) + previous['wait_s'], 3)
+
+        entry['process_peak_rss_mb'] = peak_rss_mb()
+        if entry.get('frames') and entry['wall_s'] > 0:
+            entry['fps'] = round(entry['frames'] / entry['wall_s'], 2)
+        metrics[name] = entry
+
+def wall(metrics, name):
+    """Tiempo de reloj de una etapa (0 si no se ejecutó)."""
+    return metrics.get(name, {}).get('wall_s', 0.0)
+
+@contextmanager
+def profiled(output_path=None):
+    """
+    Perfil cProfile del bloque (solo el hilo que lo ejecuta). Guarda el .prof
+    (abrible con snakeviz / pstats) y un resumen de texto con las 40 funciones más costosas.
+    """
+    if output_path is None:
+        yield
+        return
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+        profiler.dump_stats(output_path)
+        with open(f"{output_path}.txt", "w", encoding="utf-8") as f:
+            pstats.Stats(profiler, stream=f).sort_stats("cumulative").print_stats(40)
+
+def write_run_summary(results, output_dir, extra=None):
+    """
+    Escribe un resumen JSON de la corrida (por video: etapas, estadísticas de
+    caché, métricas) para comparar corridas y detectar regresiones.
+    """
+    summary = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        **(extra or {}),
+        "videos": results,
+    }
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, f"run_summary_{datetime.now():%Y%m%d_%H%M%S}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2, ensure_ascii=False, default=str)
+    return path
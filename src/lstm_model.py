@@ -1,15 +1,21 @@
 import numpy as np
-import tensorflow as tf
-from tensorflow.keras.models import Sequential, load_model
-from tensorflow.keras.layers import LSTM, Dense, Input
+from numpy.lib.stride_tricks import sliding_window_view
+from collections import deque
 import os
 import pandas as pd
+from src import model_registry
+
+# TensorFlow se importa dentro de las funciones que lo usan: importar este
+# módulo (o analysis_core) no debe costar los segundos que tarda en cargar.
 
 # Las 7 emociones que maneja DeepFace
 EMOTIONS = ['angry', 'disgust', 'fear', 'happy', 'sad', 'surprise', 'neutral']
 
 def create_lstm_model(input_shape):
     """Crea una arquitectura LSTM simple"""
+    from tensorflow.keras.models import Sequential
+    from tensorflow.keras.layers import LSTM, Dense, Input
+
     model = Sequential()
     model.add(Input(shape=input_shape))
     model.add(LSTM(32, activation='relu')) 
@@ -18,8 +24,8 @@ def create_lstm_model(input_shape):
     model.compile(optimizer='adam', loss='categorical_crossentropy', metrics=['accuracy'])
     return model
 
-def prepare_sequences(df, window_size=3):
-    """Convierte el DataFrame en ventanas deslizantes para la LSTM."""
+def emotion_matrix(df):
+    """Matriz (frames, 7) de probabilidades normalizada a 0-1."""
     # Asegurar que existan las columnas
     for col in EMOTIONS:
         if col not in df.columns:
@@ -27,68 +33,309 @@ def prepare_sequences(df, window_size=3):
 
     data = df[EMOTIONS].values 
     # Normalizar de 0-100 a 0-1 si es necesario (DeepFace suele dar 0-100)
-    if data.max() > 1.0:
+    if len(data) and data.max() > 1.0:
         data = data / 100.0
-    
-    X, y = [], []
-    for i in range(len(data) - window_size):
-        X.append(data[i:i+window_size]) # Input: frames anteriores
-        y.append(data[i+window_size])   # Target: frame siguiente
-        
-    return np.array(X), np.array(y)
-
-def train_and_save(dfs_training, model_path='data/lstm_emotion.h5'):
-    window_size = 3
-    X_all, y_all = [], []
-    
-    for df in dfs_training:
-        if len(df) > window_size:
-            X, y = prepare_sequences(df, window_size)
-            X_all.append(X)
-            y_all.append(y)
-            
-    if not X_all:
+    return data
+
+def _windows(data, window_size):
+    """
+    Vista (sin copiar) de todas las ventanas consecutivas: forma (n - w + 1, w, 7).
+    """
+    return sliding_window_view(data, window_size, axis=0).transpose(0, 2, 1)
+
+def prepare_sequences(df, window_size=3):
+    """Convierte el DataFrame en ventanas deslizantes para la LSTM."""
+    data = emotion_matrix(df)
+    n = len(data) - window_size
+    if n <= 0:
+        return np.empty((0, window_size, len(EMOTIONS))), np.empty((0, len(EMOTIONS)))
+
+    X = _windows(data, window_size)[:n]  # Input: frames anteriores
+    y = data[window_size:]               # Target: frame siguiente
+    return X, y
+
+# ---------------- ENTRENAMIENTO ----------------
+# Las ventanas se generan video por video y se pasan por tf.data (shuffle +
+# batch + prefetch): en memoria solo hay un video y el buffer de mezcla, no
+# todo el corpus.
+
+WINDOW_SIZE = 3
+TRAIN_DEFAULTS = {
+    "epochs": 15,
+    "batch_size": 256,
+    "shuffle_buffer": 10000,
+    "learning_rate": 1e-3,
+    "fine_tune_learning_rate": 1e-4,
+}
+
+def _load_source(source):
+    """Una fuente es un DataFrame o una función sin argumentos que lo devuelve (carga diferida)."""
+    return source() if callable(source) else source
+
+def iter_training_arrays(sources, window_size=WINDOW_SIZE, shuffle=False, seed=None):
+    """
+    Genera (X, y) por video sin juntar todo el corpus: cada fuente se carga,
+    se convierte en ventanas y se libera antes de pasar a la siguiente.
+    Con shuffle, el orden de los videos cambia en cada pasada.
+    """
+    order = np.arange(len(sources))
+    if shuffle:
+        np.random.default_rng(seed).shuffle(order)
+    for i in order:
+        df = _load_source(sources[i])
+        if df is None:
+            continue
+        # Filas sin rostro/probabilidades (p.ej. en el almacén SQLite quedan como NULL)
+        df = df.dropna(subset=[col for col in EMOTIONS if col in df.columns])
+        if len(df) <= window_size:
+            continue
+        X, y = prepare_sequences(df, window_size)
+        yield np.ascontiguousarray(X, dtype=np.float32), np.asarray(y, dtype=np.float32)
+
+def split_holdout(sources, fraction=0.2, seed=0, groups=None):
+    """
+    Separa videos completos para evaluación (no ventanas sueltas: las ventanas
+    vecinas de un mismo video casi se repiten y la evaluación saldría optimista).
+    groups: clave de video por fuente; las fuentes con la misma clave (p.ej. dos
+    análisis de la misma entrevista) quedan siempre del mismo lado.
+    """
+    groups = list(range(len(sources))) if groups is None else list(groups)
+    keys = list(dict.fromkeys(groups))
+    if fraction <= 0 or len(keys) < 2:
+        return list(sources), []
+    order = np.random.default_rng(seed).permutation(len(keys))
+    n_holdout = min(len(keys) - 1, max(1, int(round(len(keys) * fraction))))
+    holdout = {keys[i] for i in order[:n_holdout].tolist()}
+    train = [s for s, g in zip(sources, groups) if g not in holdout]
+    return train, [s for s, g in zip(sources, groups) if g in holdout]
+
+def window_dataset(sources, window_size=WINDOW_SIZE, batch_size=TRAIN_DEFAULTS["batch_size"],
+                   shuffle_buffer=TRAIN_DEFAULTS["shuffle_buffer"], seed=None):
+    """
+    tf.data.Dataset de lotes (X, y) leídos de las fuentes en streaming.
+    shuffle_buffer=0 mantiene el orden (evaluación).
+    """
+    import tensorflow as tf
+
+    n_emotions = len(EMOTIONS)
+    epoch = [0]
+
+    def generator():
+        # Semilla distinta por época para variar el orden de los videos
+        run_seed = None if seed is None else seed + epoch[0]
+        epoch[0] += 1
+        yield from iter_training_arrays(sources, window_size, shuffle=shuffle_buffer > 0, seed=run_seed)
+
+    dataset = tf.data.Dataset.from_generator(
+        generator,
+        output_signature=(tf.TensorSpec(shape=(None, window_size, n_emotions), dtype=tf.float32),
+                          tf.TensorSpec(shape=(None, n_emotions), dtype=tf.float32))
+    ).unbatch()
+    if shuffle_buffer > 0:
+        dataset = dataset.shuffle(shuffle_buffer, seed=seed, reshuffle_each_iteration=True)
+    return dataset.batch(batch_size).prefetch(tf.data.AUTOTUNE)
+
+def persistence_accuracy(sources, window_size=WINDOW_SIZE):
+    """
+    Acierto de la referencia trivial "la emoción siguiente es la del último frame",
+    para saber si la LSTM aporta algo sobre los videos de evaluación.
+    """
+    hits = total = 0
+    for X, y in iter_training_arrays(sources, window_size):
+        hits += int((X[:, -1].argmax(axis=1) == y.argmax(axis=1)).sum())
+        total += len(y)
+    return round(hits / total, 4) if total else None
+
+def _evaluate(model, sources, batch_size):
+    if not sources:
+        return None
+    loss, accuracy = model.evaluate(window_dataset(sources, batch_size=batch_size, shuffle_buffer=0), verbose=0)
+    return {"loss": round(float(loss), 4), "accuracy": round(float(accuracy), 4)}
+
+def default_model_path():
+    """Ruta configurada en model_registry (--lstm-path / configure(lstm_path=...))."""
+    return model_registry.get_config()["lstm_path"]
+
+def train_streaming(sources, model_path=None, output_path=None, fine_tune=False,
+                    holdout=0.2, checkpoint_dir=None, seed=0, verbose=1, groups=None, **options):
+    """
+    Entrena (o re-entrena) la LSTM leyendo las ventanas en streaming.
+
+    Args:
+        sources: DataFrames con las 7 probabilidades por segundo, o funciones que los cargan
+        model_path: modelo existente (fine_tune) y destino por defecto (None = el configurado)
+        output_path: dónde guardar el modelo final (por defecto model_path)
+        fine_tune: partir de model_path con una tasa de aprendizaje menor en lugar de un modelo nuevo
+        holdout: fracción de videos que se reservan para evaluación
+        groups: clave de video por fuente para el holdout (ver split_holdout)
+        checkpoint_dir: si se indica, se guarda el modelo al final de cada época
+        options: epochs, batch_size, shuffle_buffer, learning_rate (ver TRAIN_DEFAULTS)
+
+    Returns:
+        dict con el historial por época y la evaluación antes/después en los videos reservados
+    """
+    import tensorflow as tf
+
+    opts = {**TRAIN_DEFAULTS, **{k: v for k, v in options.items() if v is not None}}
+    model_path = model_path or default_model_path()
+    output_path = output_path or model_path
+    train_sources, eval_sources = split_holdout(list(sources), holdout, seed, groups)
+    if not train_sources:
         print("ERROR: No hay suficientes datos para entrenar.")
-        return
+        return None
 
-    X_train = np.concatenate(X_all)
-    y_train = np.concatenate(y_all)
-    
-    print(f"Entrenando LSTM con {len(X_train)} secuencias...")
-    model = create_lstm_model((window_size, 7))
-    model.fit(X_train, y_train, epochs=15, batch_size=4, verbose=1)
-    
-    os.makedirs(os.path.dirname(model_path), exist_ok=True)
-    model.save(model_path)
-    print(f"Modelo guardado en {model_path}")
+    if fine_tune:
+        if not os.path.exists(model_path):
+            print(f"ERROR: No existe el modelo {model_path} para re-entrenar.")
+            return None
+        model = tf.keras.models.load_model(model_path, compile=False)
+        learning_rate = options.get("learning_rate") or opts["fine_tune_learning_rate"]
+    else:
+        model = create_lstm_model((WINDOW_SIZE, len(EMOTIONS)))
+        learning_rate = opts["learning_rate"]
+    model.compile(optimizer=tf.keras.optimizers.Adam(learning_rate), loss='categorical_crossentropy',
+                  metrics=['accuracy'])
 
-def predict_sequence(df, model_path='data/lstm_emotion.h5', window_size=3):
-    """Usa el modelo guardado para suavizar las emociones"""
+    summary = {
+        "mode": "fine_tune" if fine_tune else "scratch",
+        "train_videos": len(train_sources),
+        "eval_videos": len(eval_sources),
+        "learning_rate": learning_rate,
+        **{k: opts[k] for k in ("epochs", "batch_size", "shuffle_buffer")},
+        "persistence_accuracy": persistence_accuracy(eval_sources) if eval_sources else None,
+        # Con fine_tune: cómo estaba el modelo antes de tocarlo
+        "eval_before": _evaluate(model, eval_sources, opts["batch_size"]) if fine_tune else None,
+    }
+
+    callbacks = []
+    if checkpoint_dir:
+        os.makedirs(checkpoint_dir, exist_ok=True)
+        callbacks.append(tf.keras.callbacks.ModelCheckpoint(
+            os.path.join(checkpoint_dir, "lstm_epoch_{epoch:02d}.h5"), save_best_only=False))
+
+    train_ds = window_dataset(train_sources, batch_size=opts["batch_size"],
+                              shuffle_buffer=opts["shuffle_buffer"], seed=seed)
+    eval_ds = (window_dataset(eval_sources, batch_size=opts["batch_size"], shuffle_buffer=0)
+               if eval_sources else None)
+
+    print(f"Entrenando LSTM con {len(train_sources)} videos ({len(eval_sources)} reservados para evaluación)...")
+    history = model.fit(train_ds, validation_data=eval_ds, epochs=opts["epochs"],
+                        callbacks=callbacks, verbose=verbose)
+
+    summary["history"] = {k: [round(float(v), 4) for v in values] for k, values in history.history.items()}
+    summary["eval_after"] = _evaluate(model, eval_sources, opts["batch_size"])
+    if "val_loss" in history.history:
+        summary["best_epoch"] = int(np.argmin(history.history["val_loss"])) + 1
+
+    if os.path.dirname(output_path):
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    model.save(output_path)
+    summary["model_path"] = output_path
+    print(f"Modelo guardado en {output_path}")
+    return summary
+
+def train_and_save(dfs_training, model_path=None):
+    """Entrena desde cero con DataFrames ya cargados, sin reservar videos para evaluación."""
+    return train_streaming(dfs_training, model_path, holdout=0)
+
+# Funciones de inferencia compiladas, una por modelo cargado
+_predictors = {}
+
+def get_predictor(model):
+    """
+    tf.function que llama model(x, training=False) directamente: evita el
+    overhead de model.predict y no se re-traza para distintos tamaños de lote.
+    """
+    key = id(model)
+    if key not in _predictors:
+        import tensorflow as tf
+        _predictors[key] = tf.function(
+            lambda x: model(x, training=False),
+            input_signature=[tf.TensorSpec(shape=[None, None, len(EMOTIONS)], dtype=tf.float32)]
+        )
+    return _predictors[key]
+
+def predict_sequence(df, model_path=None, window_size=3, chunk_size=4096):
+    """
+    Usa el modelo guardado para suavizar las emociones.
+
+    Cada frame se predice con los window_size frames anteriores; los primeros
+    usan el frame 0 repetido. Las ventanas son vistas sobre los datos y solo
+    se copian por bloques de chunk_size para la inferencia (videos muy largos).
+    model_path None = el configurado en model_registry (el mismo que precarga warm_up).
+    """
+    model_path = model_path or default_model_path()
     if not os.path.exists(model_path):
         print("Modelo LSTM no encontrado.")
         return df['emocion_facial'].tolist() # Retorna original si falla
 
-    model = load_model(model_path)
-    
-    # Preparar datos
-    for col in EMOTIONS:
-        if col not in df.columns:
-            df[col] = 0.0
-            
-    data = df[EMOTIONS].values
-    if data.max() > 1.0: data = data / 100.0
-
-    sequences = []
-    # Rllenar padding para mantener longitud
-    for i in range(len(data)):
-        if i < window_size:
-            seq = np.array([data[0]] * window_size)
-        else:
-            seq = data[i-window_size : i]
-        sequences.append(seq)
-    
-    preds = model.predict(np.array(sequences), verbose=0)
-    indices = np.argmax(preds, axis=1)
+    predict = get_predictor(model_registry.get_lstm(model_path))
+    data = emotion_matrix(df).astype(np.float32)
+    n = len(data)
+    indices = np.empty(n, dtype=np.intp)
+
+    # Rellenar padding para mantener longitud: las primeras ventanas son idénticas
+    head = min(window_size, n)
+    if head:
+        first = np.repeat(data[:1], window_size, axis=0)[np.newaxis]
+        indices[:head] = np.argmax(predict(first).numpy(), axis=1)[0]
+
+    if n > window_size:
+        windows = _windows(data, window_size)[:n - window_size]  # ventana i -> frame i + window_size
+        for start in range(0, len(windows), chunk_size):
+            chunk = np.ascontiguousarray(windows[start:start + chunk_size])
+            preds = predict(chunk).numpy()
+            indices[window_size + start:window_size + start + len(chunk)] = np.argmax(preds, axis=1)
+
     labels = [EMOTIONS[i] for i in indices]
     
-    return labels
\ No newline at end of file
+    return labels
+
+class StreamingSmoother:
+    """
+    Variante incremental de predict_sequence: suaviza cada frame cuando llega,
+    sin recalcular la secuencia completa. Da las mismas etiquetas que
+    predict_sequence salvo por la normalización 0-100 -> 0-1, que aquí se
+    decide frame a frame.
+    """
+
+    def __init__(self, model_path=None, window_size=3):
+        self.predict = get_predictor(model_registry.get_lstm(model_path or default_model_path()))
+        self.window_size = window_size
+        self.history = deque(maxlen=window_size)
+        self.first = None
+        self.count = 0
+
+    def update(self, probabilities):
+        """
+        Args:
+            probabilities: dict/Series con las 7 emociones o secuencia en el orden de EMOTIONS
+        Returns:
+            Etiqueta suavizada del frame
+        """
+        if hasattr(probabilities, 'get'):
+            vector = np.array([probabilities.get(e, 0.0) for e in EMOTIONS], dtype=np.float32)
+        else:
+            vector = np.asarray(probabilities, dtype=np.float32)
+        if vector.max() > 1.0:
+            vector = vector / 100.0
+
+        if self.first is None:
+            self.first = vector
+
+        # Mismo criterio que predict_sequence: frames anteriores, padding con el frame 0
+        if self.count < self.window_size:
+            window = np.repeat(self.first[np.newaxis], self.window_size, axis=0)
+        else:
+            window = np.stack(self.history)
+
+        self.history.append(vector)
+        self.count += 1
+
+        pred = self.predict(window[np.newaxis]).numpy()[0]
+        return EMOTIONS[int(np.argmax(pred))]
+
+    def reset(self):
+        self.history.clear()
+        self.first = None
+        self.count = 0
@@ -1,19 +1,99 @@
 import os
+import wave
+import tempfile
+import subprocess
 import cv2
-from moviepy import VideoFileClip
+import numpy as np
 
-def extract_media(video_path, output_base, video_name, frame_step=None):
-    # Crear carpetas separadas por video
-    frames_dir = os.path.join(output_base, "processed_frames\dia5", video_name)
-    audio_dir = os.path.join(output_base, "processed_audio\dia5", video_name)
-    os.makedirs(frames_dir, exist_ok=True)
+# Formato que espera Whisper: mono, 16 kHz, float32 en [-1, 1]
+SAMPLE_RATE = 16000
+
+def frames_output_dir(output_base, video_name):
+    """Carpeta donde se guardan los frames cuando se activa save_frames."""
+    return os.path.join(output_base, "processed_frames", "dia5", video_name)
+
+def _ffmpeg_audio_command(video_path):
+    """ffmpeg decodifica solo la pista de audio a PCM 16 bits mono 16 kHz por stdout."""
+    return [
+        "ffmpeg", "-nostdin", "-threads", "0", "-i", video_path,
+        "-vn", "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(SAMPLE_RATE), "-"
+    ]
+
+def _pcm_to_float(raw):
+    usable = len(raw) - len(raw) % 2
+    return np.frombuffer(raw[:usable], np.int16).astype(np.float32) / 32768.0
+
+def load_audio(video_path):
+    """
+    Decodifica el audio del video una sola vez, directo a un buffer float32
+    mono 16 kHz en memoria (sin pasar por un WAV en disco).
+    """
+    proc = subprocess.run(_ffmpeg_audio_command(video_path), capture_output=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"ffmpeg no pudo decodificar el audio: {proc.stderr.decode(errors='ignore')[-500:]}")
+    return _pcm_to_float(proc.stdout)
+
+def iter_audio_chunks(video_path, chunk_seconds=300):
+    """
+    Generador de (offset_segundos, buffer float32) de chunk_seconds cada uno.
+    La memoria queda acotada al tamaño de un bloque aunque la grabación dure horas.
+    Si ffmpeg falla se lanza RuntimeError como en load_audio (no un audio vacío).
+    """
+    # stderr a un archivo temporal: un PIPE sin leer puede bloquear a ffmpeg
+    stderr = tempfile.TemporaryFile()
+    proc = subprocess.Popen(_ffmpeg_audio_command(video_path), stdout=subprocess.PIPE, stderr=stderr)
+    bytes_per_chunk = int(chunk_seconds * SAMPLE_RATE) * 2
+    offset = 0.0
+
+    try:
+        while True:
+            raw = proc.stdout.read(bytes_per_chunk)
+            if not raw:
+                break
+            samples = _pcm_to_float(raw)
+            yield offset, samples
+            offset += len(samples) / SAMPLE_RATE
+        if proc.wait() != 0:
+            stderr.seek(0)
+            raise RuntimeError(f"ffmpeg no pudo decodificar el audio: {stderr.read().decode(errors='ignore')[-500:]}")
+    finally:
+        proc.stdout.close()
+        if proc.poll() is None:
+            proc.kill()
+        proc.wait()
+        stderr.close()
+
+def write_wav(samples, audio_path):
+    """Guarda un buffer float32 como WAV PCM 16 bits (para depurar o escuchar)."""
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype(np.int16)
+    with wave.open(audio_path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes(pcm.tobytes())
+
+def extract_audio(video_path, output_base, video_name):
+    """Extrae la pista de audio del video a un archivo WAV y devuelve su ruta."""
+    audio_dir = os.path.join(output_base, "processed_audio", "dia5", video_name)
     os.makedirs(audio_dir, exist_ok=True)
 
-    # Extraer audio
-    video_clip = VideoFileClip(video_path)
     audio_path = os.path.join(audio_dir, "audio.wav")
-    video_clip.audio.write_audiofile(audio_path, logger=None)
+    write_wav(load_audio(video_path), audio_path)
 
+    return audio_path
+
+def iter_frames(video_path, frame_step=None, frames_dir=None):
+    """
+    Generador que entrega (segundo, frame) directamente en memoria.
+
+    Solo decodifica los frames muestreados: el resto se salta con cap.grab(),
+    que avanza el stream sin convertir la imagen.
+
+    Args:
+        video_path: Ruta del video
+        frame_step: Cada cuántos frames muestrear (por defecto, los FPS del video = 1 frame/seg)
+        frames_dir: Si se indica, además guarda cada frame como JPEG (modo debug)
+    """
     cap = cv2.VideoCapture(video_path)
 
     # Extraer frames (1 frame por segundo si no se especifica)
@@ -21,24 +101,86 @@ def extract_media(video_path, output_base, video_name, frame_step=None):
         fps = int(cap.get(cv2.CAP_PROP_FPS))
     else:
         fps = frame_step
-    
+    fps = max(fps, 1)
+
+    if frames_dir is not None:
+        os.makedirs(frames_dir, exist_ok=True)
+
     count = 0
     saved_count = 0
-    
-    while cap.isOpened():
-        ret, frame = cap.read()
-        if not ret:
-            break
-            
-        # Guardar frame cada 1 segundo aprox (modulo FPS)
-        if count % fps == 0:
-            frame_name = os.path.join(frames_dir, f"frame_{saved_count}.jpg")
-            cv2.imwrite(frame_name, frame)
-            saved_count += 1
-            
-        count += 1
-        
-    cap.release()
-    video_clip.close()
-    
-    return audio_path, frames_dir
+
+    try:
+        while cap.isOpened():
+            # grab() avanza sin decodificar; solo hacemos retrieve() en los muestreados
+            if not cap.grab():
+                break
+
+            if count % fps == 0:
+                ret, frame = cap.retrieve()
+                if not ret:
+                    break
+
+                if frames_dir is not None:
+                    frame_name = os.path.join(frames_dir, f"frame_{saved_count}.jpg")
+                    cv2.imwrite(frame_name, frame)
+
+                yield saved_count, frame
+                saved_count += 1
+
+            count += 1
+    finally:
+        cap.release()
+
+def video_info(video_path):
+    """(fps, cantidad de frames) según el contenedor; la cantidad puede ser aproximada."""
+    cap = cv2.VideoCapture(video_path)
+    try:
+        return cap.get(cv2.CAP_PROP_FPS), int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    finally:
+        cap.release()
+
+def iter_frames_at(video_path, frame_indices):
+    """
+    Generador de (índice de frame, frame) solo para los índices pedidos. Igual que
+    iter_frames, avanza con grab() y decodifica únicamente esos frames; termina
+    después del último índice (o al final del video).
+    """
+    wanted = sorted(set(frame_indices))
+    if not wanted:
+        return
+    cap = cv2.VideoCapture(video_path)
+    count = 0
+    position = 0
+
+    try:
+        while position < len(wanted) and cap.isOpened():
+            if not cap.grab():
+                break
+            if count == wanted[position]:
+                ret, frame = cap.retrieve()
+                if not ret:
+                    break
+                yield count, frame
+                position += 1
+            count += 1
+    finally:
+        cap.release()
+
+def extract_media(video_path, output_base, video_name, frame_step=None, save_frames=False):
+    """
+    Extrae el audio a disco y prepara el stream de frames en memoria.
+
+    Returns:
+        (audio_path, frames): frames es un generador de (segundo, ndarray) que
+        vision_module.analyze_faces consume directamente. Con save_frames=True
+        los frames también se escriben en processed_frames (opcional, para depurar).
+    """
+    audio_path = extract_audio(video_path, output_base, video_name)
+
+    frames_dir = None
+    if save_frames:
+        frames_dir = frames_output_dir(output_base, video_name)
+
+    frames = iter_frames(video_path, frame_step=frame_step, frames_dir=frames_dir)
+
+    return audio_path, frames
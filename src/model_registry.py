@@ -0,0 +1,129 @@
+import os
+import time
+import threading
+
+# Configuración de los modelos (modificable con configure())
+DEFAULT_CONFIG = {
+    "whisper_size": "base",  # tiny / base / small / medium ...
+    "text_model": "j-hartmann/emotion-english-distilroberta-base",
+    "lstm_path": os.path.join("data", "lstm_emotion.h5"),
+}
+
+MODEL_NAMES = ("whisper", "text_classifier", "face_emotion", "lstm")
+
+_config = dict(DEFAULT_CONFIG)
+_models = {}      # (nombre, parámetro) -> instancia compartida
+_load_times = {}  # "nombre:parámetro" -> segundos que tardó la carga
+_locks = {}
+_registry_lock = threading.Lock()
+
+def configure(**options):
+    """
+    Cambia nombres/tamaños de los modelos, p.ej. configure(whisper_size="tiny").
+    Los modelos ya cargados con otra configuración no se reutilizan.
+    """
+    unknown = set(options) - set(DEFAULT_CONFIG)
+    if unknown:
+        raise ValueError(f"Opciones de modelo desconocidas: {sorted(unknown)}")
+    _config.update({k: v for k, v in options.items() if v is not None})
+
+def get_config():
+    return dict(_config)
+
+def _load_whisper(size):
+    import whisper
+    return whisper.load_model(size)
+
+def _load_text_classifier(model_name):
+    from transformers import pipeline
+    return pipeline("text-classification", model=model_name, top_k=1)
+
+def _load_face_emotion(_):
+    from deepface import DeepFace
+    try:
+        client = DeepFace.build_model(task="facial_attribute", model_name="Emotion")
+    except TypeError:
+        # Versiones anteriores de DeepFace: build_model(model_name)
+        client = DeepFace.build_model("Emotion")
+    return client.model
+
+def _load_lstm(path):
+    from tensorflow.keras.models import load_model
+    return load_model(path)
+
+_LOADERS = {
+    "whisper": (_load_whisper, "whisper_size"),
+    "text_classifier": (_load_text_classifier, "text_model"),
+    "face_emotion": (_load_face_emotion, None),
+    "lstm": (_load_lstm, "lstm_path"),
+}
+
+def get(name, param=None):
+    """
+    Devuelve el modelo compartido; lo carga la primera vez (lazy).
+    param sobreescribe el valor configurado (p.ej. otra ruta de LSTM).
+    """
+    loader, config_key = _LOADERS[name]
+    if param is None and config_key is not None:
+        param = _config[config_key]
+    key = (name, param)
+
+    if key in _models:
+        return _models[key]
+
+    with _registry_lock:
+        lock = _locks.setdefault(key, threading.Lock())
+
+    # Un lock por modelo: dos hilos no cargan el mismo modelo a la vez
+    with lock:
+        if key not in _models:
+            start = time.perf_counter()
+            _models[key] = loader(param)
+            label = name if param is None else f"{name}:{param}"
+            _load_times[label] = round(time.perf_counter() - start, 3)
+    return _models[key]
+
+def register(name, model, param=None):
+    """
+    Registra una instancia ya construida (p.ej. un backend de prueba en los
+    benchmarks) para que get(name) la devuelva sin cargar el modelo real.
+    """
+    _, config_key = _LOADERS[name]
+    if param is None and config_key is not None:
+        param = _config[config_key]
+    _models[(name, param)] = model
+    return model
+
+def get_whisper():
+    return get("whisper")
+
+def get_text_classifier():
+    return get("text_classifier")
+
+def get_face_emotion_model():
+    return get("face_emotion")
+
+def get_lstm(path=None):
+    return get("lstm", path)
+
+def warm_up(names=MODEL_NAMES):
+    """
+    Carga por adelantado los modelos indicados y devuelve los tiempos de carga.
+    La LSTM se omite si el archivo del modelo no existe todavía.
+    """
+    for name in names:
+        if name == "lstm" and not os.path.exists(_config["lstm_path"]):
+            continue
+        get(name)
+    return load_times()
+
+def load_times():
+    """Tiempos de carga (segundos) de cada modelo cargado en este proceso."""
+    return dict(_load_times)
+
+def clear():
+    """Libera todos los modelos cargados (p.ej. para cambiar de configuración)."""
+    with _registry_lock:
+        _models.clear()
+        _load_times.clear()
+        _locks.clear()
@@ -0,0 +1,247 @@
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from src import media_processor, vision_module, audio_module, model_registry, result_cache, adaptive_sampling
+from src.instrumentation import measure, wall
+
+# Parámetros por defecto de la etapa de visión (forman parte de la clave del caché)
+FRAME_STEP = None            # None = 1 frame por segundo (FPS del video)
+SIMILARITY_THRESHOLD = 0.95
+HASH_CACHE_SIZE = 0          # rostros analizados recientes indexados por dHash (0 = desactivado)
+HASH_DISTANCE = vision_module.FACE_HASH_DISTANCE  # bits (de 256) tolerados para reutilizar un resultado
+FACE_DETECTOR = None         # None = DeepFace en el frame completo; "haar" / "dnn" = OpenCV con seguimiento
+ADAPTIVE_SAMPLING = False    # True = muestreo según habla y cambios de emoción (ver adaptive_sampling)
+SAMPLING_BUDGET = adaptive_sampling.DEFAULT_BUDGET  # inferencias por minuto de video con ADAPTIVE_SAMPLING
+
+# Parámetros de la etapa de audio
+TEXT_BATCH_SIZE = 16         # segmentos por llamada al clasificador de texto
+TEXT_ALL_SCORES = False      # True agrega el vector de 7 emociones del texto (columnas texto_*)
+AUDIO_CHUNK_SECONDS = None   # p.ej. 600 para grabaciones de varias horas (memoria acotada)
+
+# Nombre de opción de configure() -> parámetro del módulo
+_OPTIONS = {
+    "frame_step": "FRAME_STEP",
+    "similarity_threshold": "SIMILARITY_THRESHOLD",
+    "hash_cache_size": "HASH_CACHE_SIZE",
+    "hash_distance": "HASH_DISTANCE",
+    "face_detector": "FACE_DETECTOR",
+    "adaptive_sampling": "ADAPTIVE_SAMPLING",
+    "sampling_budget": "SAMPLING_BUDGET",
+    "text_batch_size": "TEXT_BATCH_SIZE",
+    "text_all_scores": "TEXT_ALL_SCORES",
+    "audio_chunk_seconds": "AUDIO_CHUNK_SECONDS",
+}
+
+def configure(**options):
+    """
+    Cambia los parámetros de las etapas, p.ej. configure(frame_step=5).
+    En los procesos del pool se llama desde el initializer (ver main.init_worker).
+    """
+    unknown = set(options) - set(_OPTIONS)
+    if unknown:
+        raise ValueError(f"Opciones de pipeline desconocidas: {sorted(unknown)}")
+    for key, value in options.items():
+        globals()[_OPTIONS[key]] = value
+
+def get_config():
+    return {key: globals()[name] for key, name in _OPTIONS.items()}
+
+def prefetch_frames(frames, max_buffer=32, timings=None, accumulate=False):
+    """
+    Decodifica los frames en un hilo aparte y los entrega a medida que están listos,
+    de modo que el análisis facial empieza con los primeros segundos mientras
+    los siguientes todavía se están decodificando.
+
+    Args:
+        frames: Generador de (segundo, frame), p.ej. media_processor.iter_frames
+        max_buffer: Frames decodificados en espera como máximo (acota la memoria)
+        timings: Si se indica, guarda las métricas de decodificación en timings['decode']
+            (wall_s sin el tiempo bloqueado con el buffer lleno, que queda en wait_s)
+        accumulate: Sumar a timings['decode'] en lugar de reemplazarlo (varias pasadas por video)
+    """
+    buffer = queue.Queue(maxsize=max_buffer)
+    done = object()
+    stop = threading.Event()
+    errors = []
+
+    def put(item, entry=None):
+        # Espera con timeout para poder abandonar si el consumidor ya terminó
+        start = time.perf_counter()
+        try:
+            while not stop.is_set():
+                try:
+                    buffer.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        finally:
+            if entry is not None:
+                # El tiempo con el buffer lleno es espera del consumidor, no decodificación
+                entry['wait_s'] += time.perf_counter() - start
+
+    def producer():
+        with measure({} if timings is None else timings, 'decode', accumulate=accumulate) as entry:
+            entry['frames'] = 0
+            entry['wait_s'] = 0.0
+            try:
+                for item in frames:
+                    entry['frames'] += 1
+                    if not put(item, entry):
+                        break
+            except Exception as e:
+                errors.append(e)
+            finally:
+                if hasattr(frames, 'close'):
+                    frames.close()  # libera el VideoCapture
+        put(done)
+
+    thread = threading.Thread(target=producer, name="frame-decoder", daemon=True)
+    thread.start()
+
+    try:
+        while True:
+            item = buffer.get()
+            if item is done:
+                break
+            yield item
+        if errors:
+            raise errors[0]
+    finally:
+        stop.set()
+        thread.join()
+
+def vision_cache_params(with_audio=True):
+    """
+    Todo lo que cambia el resultado de la etapa de visión. El tamaño de lote no
+    entra: por lotes o frame a frame se obtienen las mismas emociones.
+    """
+    params = {
+        "frame_step": FRAME_STEP,
+        "similarity_threshold": SIMILARITY_THRESHOLD,
+        "hash_cache_size": HASH_CACHE_SIZE,
+        "hash_distance": HASH_DISTANCE,
+        "deepface": result_cache.package_version("deepface"),
+    }
+    if FACE_DETECTOR:
+        # Solo si no es el predeterminado, para no invalidar las entradas ya guardadas
+        params["face_detector"] = FACE_DETECTOR
+        params["opencv"] = result_cache.package_version("opencv-python")
+    if ADAPTIVE_SAMPLING:
+        # Qué frames se analizan depende también de los segmentos de Whisper
+        params["adaptive_sampling"] = {"budget": SAMPLING_BUDGET, "with_audio": with_audio,
+                                       "audio": audio_cache_params() if with_audio else None,
+                                       "static": ("face_dhash", adaptive_sampling.STATIC_DISTANCE)}
+    return params
+
+def audio_cache_params():
+    """Todo lo que cambia el resultado de la etapa de audio."""
+    config = model_registry.get_config()
+    return {
+        "whisper_size": config["whisper_size"],
+        "text_model": config["text_model"],
+        "text_all_scores": TEXT_ALL_SCORES,
+        "audio_chunk_seconds": AUDIO_CHUNK_SECONDS,
+        "whisper": result_cache.package_version("openai-whisper"),
+        "transformers": result_cache.package_version("transformers"),
+    }
+
+def analyze_video_faces(video_path, frames_dir=None, vision_batch_size=1, timings=None, use_cache=True,
+                        audio=None):
+    """
+    Etapa de visión de un video (decodificación + DeepFace), reutilizando el
+    resultado guardado en caché si ya se analizó el mismo contenido.
+
+    Con ADAPTIVE_SAMPLING, audio es una función que devuelve df_audio (se espera recién
+    después de la pasada gruesa); None = sin información de habla. En ese modo
+    FRAME_STEP y frames_dir no se usan.
+    """
+    timings = {} if timings is None else timings
+
+    def analyze(frames):
+        return vision_module.analyze_faces(
+            frames, similarity_threshold=SIMILARITY_THRESHOLD, batch_size=vision_batch_size,
+            hash_cache_size=HASH_CACHE_SIZE, hash_distance=HASH_DISTANCE, face_detector=FACE_DETECTOR
+        )
+
+    def compute():
+        if ADAPTIVE_SAMPLING:
+            return adaptive_sampling.analyze_video(
+                video_path, analyze, audio=audio, budget=SAMPLING_BUDGET,
+                wrap_frames=lambda frames: prefetch_frames(frames, timings=timings, accumulate=True),
+                face_detector=FACE_DETECTOR
+            )
+        frames = media_processor.iter_frames(video_path, frame_step=FRAME_STEP, frames_dir=frames_dir)
+        return analyze(prefetch_frames(frames, timings=timings))
+
+    with measure(timings, 'vision') as entry:
+        if use_cache:
+            df_video, entry['cache_hit'] = result_cache.cached_stage(
+                video_path, 'vision', vision_cache_params(with_audio=audio is not None), compute
+            )
+        else:
+            df_video = compute()
+        entry['frames'] = len(df_video)
+    return df_video
+
+def _run_audio_stage(video_path, timings, use_cache=True):
+    """
+    Etapa de audio completa: decodificar el audio a memoria (ffmpeg, sin WAV)
+    y luego Whisper + RoBERTa.
+    """
+    def compute():
+        if AUDIO_CHUNK_SECONDS:
+            # Decodificación y transcripción intercaladas por bloques
+            return audio_module.analyze_audio(video_path, batch_size=TEXT_BATCH_SIZE,
+                                              return_all_scores=TEXT_ALL_SCORES,
+                                              chunk_seconds=AUDIO_CHUNK_SECONDS, timings=timings)
+        with measure(timings, 'extract_audio'):
+            samples = media_processor.load_audio(video_path)
+        return audio_module.analyze_audio(samples, batch_size=TEXT_BATCH_SIZE,
+                                          return_all_scores=TEXT_ALL_SCORES, timings=timings)
+
+    # 'audio' es la rama completa: extracción + Whisper + RoBERTa (o la lectura del caché)
+    with measure(timings, 'audio') as entry:
+        if use_cache:
+            df_audio, entry['cache_hit'] = result_cache.cached_stage(
+                video_path, 'audio', audio_cache_params(), compute
+            )
+        else:
+            df_audio = compute()
+    return df_audio
+
+def run_video_stages(video_path, base_dir, video_name, save_frames=False, vision_batch_size=1,
+                     use_cache=True, with_audio=True):
+    """
+    Ejecuta en paralelo las dos ramas independientes de un video:
+    - audio: decodificación del audio a memoria y transcripción/clasificación (hilo aparte)
+    - visión: decodificación de frames (hilo aparte) + análisis facial
+    Con use_cache, cada rama reutiliza su resultado previo si el video no cambió.
+    Con with_audio=False se omite la rama de audio (df_audio vacío: todo es silencio).
+
+    Returns:
+        (df_video, df_audio, timings): timings tiene las métricas de cada etapa
+        (instrumentation.measure) y en 'media_parallel' el tiempo real de la fase
+        paralela y cuánto se ahorró frente a correr audio y visión en serie.
+    """
+    timings = {}
+    frames_dir = media_processor.frames_output_dir(base_dir, video_name) if save_frames else None
+
+    with measure(timings, 'media_parallel') as entry:
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="audio") as executor:
+            audio_future = executor.submit(_run_audio_stage, video_path, timings, use_cache) if with_audio else None
+
+            df_video = analyze_video_faces(video_path, frames_dir, vision_batch_size, timings, use_cache,
+                                           audio=audio_future.result if with_audio else None)
+
+            df_audio = audio_future.result() if with_audio else pd.DataFrame()
+
+    # 'audio' ya incluye la extracción del audio
+    sequential = wall(timings, 'audio') + wall(timings, 'vision')
+    entry['overlap_saved_s'] = round(max(sequential - entry['wall_s'], 0.0), 3)
+
+    return df_video, df_audio, timings
@@ -0,0 +1,121 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from src import analysis_core
+from src.instrumentation import measure
+
+# Columnas que necesita el gráfico (lo único que viaja desde los procesos de análisis)
+PLOT_COLUMNS = ['segundo', 'emocion_facial', 'emocion_texto', 'congruencia']
+MAX_POINTS = 2000  # puntos por serie; los videos más largos se submuestrean
+
+def plot_data(df):
+    """Copia mínima del reporte para graficar."""
+    return df[[col for col in PLOT_COLUMNS if col in df.columns]].copy()
+
+def _thin(x, y, max_points):
+    """Submuestreo uniforme de una serie de puntos a max_points como máximo."""
+    if len(x) <= max_points:
+        return x, y
+    step = int(np.ceil(len(x) / max_points))
+    return x[::step], y[::step]
+
+def _emotion_steps(x, codes, max_points):
+    """
+    Puntos de la línea de emoción facial: solo donde la emoción cambia (más el
+    último), que dibujados como escalones reproducen la serie completa.
+    """
+    if len(codes) <= max_points:
+        return x, codes
+    keep = np.ones(len(codes), dtype=bool)
+    keep[1:-1] = codes[1:-1] != codes[:-2]
+    return _thin(x[keep], codes[keep], max_points)
+
+def generar_grafica_avanzada(df, video_name, output_dir, max_points=MAX_POINTS):
+    """
+    Genera un gráfico comparativo de emociones Video vs Texto a lo largo del tiempo.
+    Marca visualmente las incongruencias.
+    Usa matplotlib (backend Agg, sin pyplot) así que puede correr en un hilo aparte.
+    """
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    fig = Figure(figsize=(14, 7))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    ax.grid(True, color="#e5e5e5")
+    ax.set_axisbelow(True)
+
+    # Mapeo de emociones a valores numéricos para poder graficar (códigos int8)
+    emotion_map = analysis_core.EMOTION_CODES
+    seconds = df['segundo'].to_numpy()
+    video_val = np.asarray(analysis_core.emotion_codes(df['emocion_facial']))
+    text_val = np.asarray(analysis_core.emotion_codes(df['emocion_texto']))
+
+    # Línea de la emoción facial (con marcadores solo si hay pocos puntos)
+    x, y = _emotion_steps(seconds, video_val, max_points)
+    marker = 'o' if len(df) <= max_points else None
+    ax.plot(x, y, drawstyle='steps-post', label='Emoción Facial (Video)',
+            color='blue', linewidth=2, marker=marker, markersize=4)
+
+    # Emoción del texto (Solo puntos donde hay habla)
+    speech = text_val != 0
+    if speech.any():
+        x, y = _thin(seconds[speech], text_val[speech], max_points)
+        ax.scatter(x, y, color='green', s=100, label='Emoción Texto', marker='s', zorder=5)
+
+    # Marcar Incongruencias
+    incongruent = (df['congruencia'] == 'INCONGRUENCIA').to_numpy()
+    if incongruent.any():
+        x, y = _thin(seconds[incongruent], video_val[incongruent], max_points)
+        ax.scatter(x, y, color='red', s=150, label='Incongruencia', marker='X', zorder=10)
+
+    # Formato del eje Y
+    ax.set_yticks(list(emotion_map.values()), list(emotion_map.keys()))
+    ax.set_ylim(-1.5, 7)
+
+    ax.set_title(f"Análisis Multimodal: {video_name}", fontsize=16)
+    ax.set_xlabel("Tiempo (segundos)", fontsize=12)
+    ax.set_ylabel("Emoción Detectada", fontsize=12)
+    ax.legend(loc='upper right')
+
+    # Guardar
+    output_path = os.path.join(output_dir, f"grafico_{video_name}.png")
+    fig.savefig(output_path)
+    return output_path
+
+class ChartWorker:
+    """
+    Genera los gráficos en un hilo aparte, en orden de llegada, para que el
+    análisis del siguiente video no espere al renderizado.
+    """
+
+    def __init__(self, output_dir, max_points=MAX_POINTS):
+        self.output_dir = output_dir
+        self.max_points = max_points
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="charts")
+        self._futures = {}
+
+    def _render(self, video_name, df):
+        timings = {}
+        with measure(timings, 'plot', frames=len(df)):
+            path = generar_grafica_avanzada(df, video_name, self.output_dir, self.max_points)
+        return path, timings['plot']
+
+    def submit(self, video_name, df):
+        self._futures[video_name] = self._executor.submit(self._render, video_name, df)
+
+    def close(self):
+        """
+        Espera los gráficos pendientes.
+        Returns: dict video -> (ruta, métricas de la etapa) o la excepción si falló.
+        """
+        self._executor.shutdown(wait=True)
+        results = {}
+        for video_name, future in self._futures.items():
+            try:
+                results[video_name] = future.result()
+            except Exception as e:
+                results[video_name] = e
+        return results
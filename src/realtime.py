@@ -0,0 +1,253 @@
+import math
+import time
+import threading
+from collections import deque
+
+import cv2
+import pandas as pd
+
+from src import media_processor, vision_module, audio_module, analysis_core, model_registry, face_tracking
+
+class LiveAnalyzer:
+    """
+    Análisis de una entrevista en vivo (webcam, stream o un archivo reproducido
+    a velocidad real) con latencia acotada.
+
+    - Un hilo captura frames y conserva solo el más reciente (los viejos se descartan).
+    - Otro hilo transcribe el audio en ventanas de audio_window segundos (archivos y
+      streams por URL; las cámaras locales no tienen pista de audio que leer).
+    - El bucle principal analiza un frame cada `interval` segundos y aplica las mismas
+      reglas que el modo batch (synchronize_data + calculate_congruence + cambio de emoción).
+      La congruencia de un frame se emite recién cuando la transcripción cubre su
+      instante: el evento 'sample' llega con un retraso de hasta una ventana de audio
+      más lo que tarde Whisper ('delay' en el evento).
+    - Si la inferencia tarda más que el intervalo, el intervalo crece (hasta max_interval);
+      cuando vuelve a sobrar tiempo, regresa al valor inicial.
+    """
+
+    def __init__(self, source, interval=1.0, max_interval=4.0, audio_window=5.0,
+                 with_audio=True, realtime=True, smoothing=False, max_duration=None, face_detector=None):
+        # "0", "1"... = índice de cámara; cualquier otra cosa = archivo o URL
+        self.source = int(source) if str(source).isdigit() else source
+        self.base_interval = interval
+        self.interval = interval
+        self.max_interval = max_interval
+        self.audio_window = audio_window
+        self.is_file = isinstance(self.source, str) and "://" not in self.source
+        # ffmpeg lee el audio de archivos y de streams; de una cámara (índice) no hay audio
+        self.with_audio = with_audio and isinstance(self.source, str)
+        self.realtime = realtime
+        self.max_duration = max_duration
+        self.smoother = None
+        if smoothing:
+            from src import lstm_model
+            self.smoother = lstm_model.StreamingSmoother()
+        # Con un detector de OpenCV el rostro se sigue entre frames en lugar de detectarlo en cada uno
+        self.tracker = face_tracking.FaceTracker(face_detector) if face_detector else None
+
+        self._lock = threading.Lock()
+        self._latest = None          # (timestamp, índice de frame, frame)
+        self._segments = deque()     # segmentos que todavía pueden cubrir un frame pendiente
+        self._new_segments = []
+        self._audio_until = 0.0      # segundos de media ya transcritos
+        self._audio_done = threading.Event()
+        self._capture_done = threading.Event()
+        self._stop = threading.Event()
+        self._start_time = None
+
+        self.stats = {'captured_frames': 0, 'analyzed_frames': 0, 'dropped_frames': 0,
+                      'max_latency': 0.0, 'interval_changes': 0}
+
+    # ---------------- HILOS DE CAPTURA ----------------
+    def _media_clock(self):
+        return time.perf_counter() - self._start_time
+
+    def _capture_loop(self):
+        cap = cv2.VideoCapture(self.source)
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        index = 0
+        try:
+            while not self._stop.is_set() and cap.isOpened():
+                if not cap.grab():
+                    break
+                timestamp = index / fps if self.is_file else self._media_clock()
+
+                if self.is_file and self.realtime:
+                    # Reproducir el archivo a velocidad real
+                    wait = timestamp - self._media_clock()
+                    if wait > 0:
+                        time.sleep(wait)
+
+                ret, frame = cap.retrieve()
+                if ret:
+                    with self._lock:
+                        self._latest = (timestamp, index, frame)
+                    self.stats['captured_frames'] += 1
+                index += 1
+        finally:
+            cap.release()
+            self._capture_done.set()
+
+    def _audio_loop(self):
+        try:
+            model = model_registry.get_whisper()
+            for offset, samples in media_processor.iter_audio_chunks(self.source, self.audio_window):
+                if self._stop.is_set():
+                    break
+                if self.is_file and self.realtime:
+                    # La ventana solo "existe" cuando termina de sonar (en un stream ya es así)
+                    wait = offset + len(samples) / media_processor.SAMPLE_RATE - self._media_clock()
+                    if wait > 0 and self._stop.wait(wait):
+                        break
+
+                result = model.transcribe(samples, fp16=False)
+                df_chunk = audio_module.segments_to_frame(result['segments'], offset=offset)
+                with self._lock:
+                    if not df_chunk.empty:
+                        records = df_chunk.to_dict('records')
+                        self._segments.extend(records)
+                        self._new_segments.extend(records)
+                    # También las ventanas sin habla: sus frames ya se pueden puntuar
+                    self._audio_until = offset + len(samples) / media_processor.SAMPLE_RATE
+        except Exception as e:
+            print(f"   [LIVE] Audio deshabilitado: {e}")
+        finally:
+            self._audio_done.set()
+
+    def _transcribed_until(self):
+        """Hasta qué instante hay transcripción definitiva (infinito si no hay o ya no habrá audio)."""
+        if not self.with_audio or self._audio_done.is_set():
+            return math.inf
+        with self._lock:
+            return self._audio_until
+
+    # ---------------- ANÁLISIS ----------------
+    def _score(self, row):
+        """
+        Misma lógica que el modo batch, sobre una sola fila. Los frames se puntúan en
+        orden: los segmentos que terminan antes de este ya no cubren ninguno y se descartan.
+        """
+        with self._lock:
+            while self._segments and self._segments[0]['fin'] < row['segundo']:
+                self._segments.popleft()
+            segments = pd.DataFrame(list(self._segments))
+        df = analysis_core.synchronize_data(pd.DataFrame([row]), segments)
+        return analysis_core.calculate_congruence(df).iloc[0]
+
+    def _adapt_interval(self, latency):
+        """Degradación: baja la frecuencia de muestreo si la inferencia no da abasto."""
+        new_interval = self.interval
+        if latency > 0.8 * self.interval:
+            new_interval = min(self.interval * 1.5, self.max_interval)
+        elif latency < 0.3 * self.interval and self.interval > self.base_interval:
+            new_interval = max(self.interval / 1.5, self.base_interval)
+
+        if new_interval != self.interval:
+            self.interval = round(new_interval, 3)
+            self.stats['interval_changes'] += 1
+            return {'type': 'sampling', 'interval': self.interval, 'latency': round(latency, 3)}
+        return None
+
+    def _release(self, pending, until):
+        """Puntúa y emite los frames pendientes cuyo instante ya tiene transcripción."""
+        while pending and pending[0]['timestamp'] < until:
+            item = pending.popleft()
+            scored = self._score(item['row'])
+            event = {
+                'type': 'sample', 'segundo': item['segundo'], 'timestamp': item['timestamp'],
+                'emocion_facial': str(scored['emocion_facial']), 'emocion_texto': str(scored['emocion_texto']),
+                'texto': scored['texto'], 'congruencia': str(scored['congruencia']),
+                'latency': item['latency'], 'delay': round(time.perf_counter() - item['analyzed'], 3),
+            }
+            yield event
+            if event['congruencia'] == 'INCONGRUENCIA':
+                yield {**event, 'type': 'incongruence'}
+
+    def _new_transcripts(self):
+        with self._lock:
+            new_segments, self._new_segments = self._new_segments, []
+        for segment in new_segments:
+            yield {'type': 'transcript', **segment}
+
+    def events(self):
+        """
+        Generador de eventos a medida que ocurren:
+        'sample' (cada frame analizado, con su congruencia cuando ya hay transcripción),
+        'incongruence', 'emotion_change', 'transcript' (nuevo segmento de audio) y
+        'sampling' (cambio de frecuencia).
+        """
+        self._start_time = time.perf_counter()
+        threads = [threading.Thread(target=self._capture_loop, name="live-capture", daemon=True)]
+        if self.with_audio:
+            threads.append(threading.Thread(target=self._audio_loop, name="live-audio", daemon=True))
+        for thread in threads:
+            thread.start()
+
+        previous_emotion = None
+        last_index = -1
+        next_tick = time.perf_counter()
+        pending = deque()  # frames analizados esperando la transcripción de su instante
+
+        try:
+            while not self._stop.is_set():
+                if self.max_duration and self._media_clock() >= self.max_duration:
+                    break
+
+                with self._lock:
+                    latest = self._latest
+
+                yield from self._new_transcripts()
+                yield from self._release(pending, self._transcribed_until())
+
+                if latest is None or latest[1] == last_index:
+                    if self._capture_done.is_set():
+                        break
+                    time.sleep(0.01)
+                    continue
+
+                timestamp, index, frame = latest
+                if last_index >= 0:
+                    self.stats['dropped_frames'] += index - last_index - 1
+                last_index = index
+
+                start = time.perf_counter()
+                row = vision_module.analyze_frame(frame, int(timestamp), tracker=self.tracker)
+                if self.smoother is not None and row['emocion_facial'] != 'no_detection':
+                    row['emocion_facial_raw'] = row['emocion_facial']
+                    row['emocion_facial'] = self.smoother.update(row)
+                latency = time.perf_counter() - start
+
+                self.stats['analyzed_frames'] += 1
+                self.stats['max_latency'] = round(max(self.stats['max_latency'], latency), 3)
+                pending.append({'row': row, 'segundo': int(timestamp), 'timestamp': round(timestamp, 3),
+                                'latency': round(latency, 3), 'analyzed': time.perf_counter()})
+
+                # El cambio de emoción solo depende del rostro: se emite sin esperar al audio
+                emotion = str(row['emocion_facial'])
+                if previous_emotion is not None and emotion != previous_emotion:
+                    yield {'type': 'emotion_change', 'segundo': int(timestamp),
+                           'desde': previous_emotion, 'hacia': emotion}
+                previous_emotion = emotion
+
+                sampling_event = self._adapt_interval(latency)
+                if sampling_event:
+                    yield sampling_event
+
+                # Esperar al siguiente tick; si vamos atrasados, no acumular deuda
+                next_tick = max(next_tick + self.interval, time.perf_counter())
+                time.sleep(max(0.0, next_tick - time.perf_counter()))
+
+            # Fin del video: esperar la transcripción de las últimas ventanas (salvo con stop())
+            while pending and not self._stop.is_set() and self._transcribed_until() <= pending[-1]['timestamp']:
+                self._audio_done.wait(0.05)
+                yield from self._new_transcripts()
+                yield from self._release(pending, self._transcribed_until())
+            yield from self._new_transcripts()
+            yield from self._release(pending, math.inf)
+        finally:
+            self.stop()
+            for thread in threads:
+                thread.join(timeout=5)
+
+    def stop(self):
+        self._stop.set()
@@ -0,0 +1,157 @@
+import os
+import json
+import sqlite3
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# Formatos de reporte por video (extensión = nombre del formato)
+REPORT_FORMATS = ("csv", "json", "parquet")
+
+# Columnas de texto con pocos valores distintos: en Parquet se guardan como diccionario
+CATEGORY_COLUMNS = ('texto', 'emocion_facial', 'emocion_facial_raw', 'emocion_texto', 'congruencia')
+
+STORE_NAME = "reports.sqlite"
+
+def parquet_available():
+    """True si pandas puede escribir Parquet (pyarrow o fastparquet instalados)."""
+    for engine in ("pyarrow", "fastparquet"):
+        try:
+            __import__(engine)
+            return True
+        except ImportError:
+            continue
+    return False
+
+# ---------------- REPORTE POR VIDEO ----------------
+
+def compact_report(df):
+    """
+    Copia del reporte con tipos compactos: probabilidades en float32, segundo en
+    int32 y las columnas de texto/emociones como categóricas (cada frase o etiqueta
+    se guarda una vez en el diccionario y cada fila solo lleva su código).
+    """
+    report = df.copy()
+    for col in report.columns:
+        if report[col].dtype == np.float64:
+            report[col] = report[col].astype(np.float32)
+    if 'segundo' in report.columns:
+        report['segundo'] = report['segundo'].astype(np.int32)
+    for col in CATEGORY_COLUMNS:
+        if col in report.columns and not isinstance(report[col].dtype, pd.CategoricalDtype):
+            report[col] = report[col].astype('category')
+    return report
+
+def report_paths(base_path, formats):
+    """base_path sin extensión -> {formato: ruta}."""
+    return {fmt: f"{base_path}.{fmt}" for fmt in formats}
+
+def write_report(df, base_path, formats=("csv", "json")):
+    """Escribe el reporte en cada formato pedido y devuelve {formato: ruta}."""
+    unknown = set(formats) - set(REPORT_FORMATS)
+    if unknown:
+        raise ValueError(f"Formatos de reporte desconocidos: {sorted(unknown)}")
+
+    paths = report_paths(base_path, formats)
+    if "csv" in paths:
+        df.to_csv(paths["csv"], index=False)
+    if "json" in paths:
+        df.to_json(paths["json"], orient="records", indent=2)
+    if "parquet" in paths:
+        compact_report(df).to_parquet(paths["parquet"], index=False, compression="zstd")
+    return paths
+
+def read_report(path):
+    """Lee un reporte en cualquiera de los formatos según su extensión."""
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path)
+    if path.endswith(".json"):
+        return pd.read_json(path, orient="records")
+    return pd.read_csv(path)
+
+def report_columns(path):
+    """Columnas de un reporte sin leer sus filas (salvo JSON, que no tiene cabecera)."""
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        return pq.read_schema(path).names
+    if path.endswith(".json"):
+        return list(read_report(path).columns)
+    return list(pd.read_csv(path, nrows=0).columns)
+
+# ---------------- ALMACÉN CONSOLIDADO (SQLite) ----------------
+# Una tabla 'segundos' con todas las filas de todos los videos, indexada por
+# (video, segundo), y una tabla 'videos' con las métricas de cada uno.
+
+def store_path(output_dir):
+    return os.path.join(output_dir, STORE_NAME)
+
+def _connect(path):
+    # timeout: los procesos del pool escriben por turnos en el mismo archivo
+    conn = sqlite3.connect(path, timeout=120)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("""CREATE TABLE IF NOT EXISTS videos (
+                        video TEXT PRIMARY KEY, video_path TEXT, updated TEXT,
+                        frames INTEGER, metrics TEXT, insights TEXT)""")
+    conn.execute("CREATE TABLE IF NOT EXISTS segundos (video TEXT NOT NULL, segundo INTEGER NOT NULL)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_segundos_video_segundo ON segundos (video, segundo)")
+    return conn
+
+def _sql_type(dtype):
+    if pd.api.types.is_bool_dtype(dtype) or pd.api.types.is_integer_dtype(dtype):
+        return "INTEGER"
+    if pd.api.types.is_float_dtype(dtype):
+        return "REAL"
+    return "TEXT"
+
+def _ensure_columns(conn, df):
+    """Agrega a 'segundos' las columnas nuevas del reporte (p.ej. texto_* o emocion_facial_raw)."""
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(segundos)")}
+    for col in df.columns:
+        if col not in existing:
+            conn.execute(f'ALTER TABLE segundos ADD COLUMN "{col}" {_sql_type(df[col].dtype)}')
+
+def store_report(path, video, df, metrics=None, insights=None, video_path=None):
+    """
+    Guarda (o reemplaza) las filas de un video en el almacén consolidado.
+    """
+    columns = [col for col in df.columns if col != 'video']
+    # tolist() convierte a tipos de Python (sqlite3 no acepta escalares de numpy)
+    values = [df[col].astype(object).where(df[col].notna(), None).tolist() for col in columns]
+    rows = [(video, *row) for row in zip(*values)]
+
+    conn = _connect(path)
+    try:
+        # IMMEDIATE toma el lock de escritura antes de leer el esquema: dos procesos
+        # no pueden agregar la misma columna a la vez
+        conn.execute("BEGIN IMMEDIATE")
+        with conn:
+            _ensure_columns(conn, df[columns])
+            names = ", ".join(f'"{col}"' for col in ['video'] + columns)
+            placeholders = ", ".join("?" * (len(columns) + 1))
+            conn.execute("DELETE FROM segundos WHERE video = ?", (video,))
+            conn.executemany(f"INSERT INTO segundos ({names}) VALUES ({placeholders})", rows)
+            conn.execute("INSERT OR REPLACE INTO videos VALUES (?, ?, ?, ?, ?, ?)",
+                         (video, video_path, datetime.now().isoformat(timespec="seconds"), len(df),
+                          json.dumps(metrics or {}), insights))
+    finally:
+        conn.close()
+
+def query(path, sql, params=()):
+    """
+    Consulta SQL sobre el almacén, p.ej.:
+    query(p, "SELECT video, COUNT(*) FROM segundos WHERE congruencia = ? GROUP BY video", ("INCONGRUENCIA",))
+    """
+    conn = _connect(path)
+    try:
+        return pd.read_sql_query(sql, conn, params=params)
+    finally:
+        conn.close()
+
+def list_videos(path):
+    """Videos guardados en el almacén."""
+    return query(path, "SELECT video FROM videos ORDER BY video")['video'].tolist()
+
+def load_video(path, video):
+    """Filas de un video ordenadas por segundo."""
+    return query(path, "SELECT * FROM segundos WHERE video = ? ORDER BY segundo", (video,))
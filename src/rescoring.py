@@ -0,0 +1,132 @@
+import os
+import re
+import glob
+
+from src import analysis_core, lstm_model, report_store
+
+# Columnas que calcula el análisis a partir de las salidas de los modelos
+DERIVED_COLUMNS = ['congruencia', 'cambio_emocion', 'emocion_facial_raw']
+# Reportes de los primeros días: la transcripción tenía otro nombre
+LEGACY_COLUMNS = {'transcripcion': 'texto'}
+# Si un reporte existe en varios formatos se lee el más rápido
+FORMAT_PREFERENCE = ('parquet', 'csv', 'json')
+# Prefijo por defecto de main.py (--report-prefix): report_day5_<video>
+DEFAULT_PREFIX = "report_day5_"
+# Prefijos con la etiqueta del día: report_day4_, report_day5_, report_dia6_, ...
+DAY_PREFIX = re.compile(r"^report_(?:day|dia)\d+_")
+
+def find_reports(patterns):
+    """
+    Expande rutas y patrones glob a una lista de reportes, uno por reporte
+    (si está en CSV y Parquet, se toma el Parquet).
+    """
+    by_base = {}
+    for pattern in patterns:
+        for path in sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]:
+            base, ext = os.path.splitext(path)
+            fmt = ext.lstrip('.')
+            if fmt not in FORMAT_PREFERENCE or base.endswith('.run'):
+                continue  # marcas de --resume, resúmenes, etc.
+            current = by_base.get(base)
+            if current is None or FORMAT_PREFERENCE.index(fmt) < FORMAT_PREFERENCE.index(current[1]):
+                by_base[base] = (path, fmt)
+    return [path for path, _ in by_base.values()]
+
+def report_video_name(path, prefix=DEFAULT_PREFIX):
+    """report_day5_video1.mp4.csv -> video1.mp4 (el nombre con el que main.py guarda el video)"""
+    name = os.path.splitext(os.path.basename(path))[0]
+    return name[len(prefix):] if prefix and name.startswith(prefix) else name
+
+def report_video_key(path):
+    """
+    Video al que corresponde un reporte, sea cual sea el día del prefijo:
+    report_day4_video1.mp4.csv y report_day5_video1.mp4.parquet -> video1.mp4.
+    """
+    name = os.path.splitext(os.path.basename(path))[0]
+    match = DAY_PREFIX.match(name)
+    return name[match.end():] if match else report_video_name(path)
+
+def stored_video(store, path, prefix=DEFAULT_PREFIX):
+    """
+    (video, video_path) de la fila de 'videos' a la que corresponde el reporte, o None.
+    Solo corresponde si el nombre del reporte es exactamente <prefix><video>: un video
+    cuyo nombre es sufijo de otro (video1.mp4 / grupo_video1.mp4) no se confunde. Para
+    reportes generados con otro --report-prefix hay que indicar ese prefijo.
+    """
+    name = os.path.splitext(os.path.basename(path))[0]
+    if not os.path.exists(store) or not prefix or not name.startswith(prefix):
+        return None
+    video = name[len(prefix):]
+    rows = report_store.query(store, "SELECT video, video_path FROM videos WHERE video = ?", (video,))
+    return (video, rows['video_path'].iloc[0]) if len(rows) else None
+
+def restore_inputs(df):
+    """
+    Devuelve el reporte al estado de synchronize_data (antes de la LSTM y la
+    congruencia): emoción facial sin suavizar y sin columnas derivadas.
+    """
+    df = df.rename(columns={old: new for old, new in LEGACY_COLUMNS.items()
+                            if old in df.columns and new not in df.columns})
+    if 'emocion_facial_raw' in df.columns:
+        df['emocion_facial'] = df['emocion_facial_raw']
+    return df.drop(columns=[col for col in DERIVED_COLUMNS if col in df.columns])
+
+def has_probabilities(df):
+    """True si el reporte trae el vector de 7 emociones por segundo (necesario para la LSTM)."""
+    return all(col in df.columns for col in lstm_model.EMOTIONS)
+
+def rescore(df, smoothing="auto", alert_threshold=analysis_core.INCONGRUENCE_ALERT_THRESHOLD,
+            text_to_video=None):
+    """
+    Vuelve a ejecutar solo el análisis sobre un reporte guardado: LSTM (opcional),
+    congruencia, cambios de emoción, métricas e insights.
+
+    Args:
+        smoothing: "on", "off" o "auto" (la LSTM solo si el reporte original la usó)
+        alert_threshold: % de incongruencia a partir del cual se emite la alerta
+        text_to_video: equivalencia texto -> video alternativa para la congruencia
+
+    Returns:
+        (reporte, métricas, insights)
+    """
+    smoothed_before = 'emocion_facial_raw' in df.columns
+    df = restore_inputs(df)
+
+    if smoothing == "on" or (smoothing == "auto" and smoothed_before):
+        if has_probabilities(df):
+            df = analysis_core.apply_lstm_smoothing(df)
+        else:
+            print("   [RESCORE] El reporte no tiene probabilidades por emoción: se omite la LSTM.")
+
+    report = analysis_core.calculate_congruence(df, text_to_video)
+    report = analysis_core.detect_emotional_changes(report)
+    metrics = analysis_core.compute_congruence_metrics(report)
+    insights = analysis_core.generate_insights(report, alert_threshold)
+    return report, metrics, insights
+
+def rescore_file(path, output_dir, formats=("csv",), store=None, prefix=DEFAULT_PREFIX, **options):
+    """
+    Re-puntúa un reporte y lo escribe en output_dir con el mismo nombre.
+    Con store reemplaza las filas del video que ya estaba guardado (ver stored_video).
+    Devuelve un resumen con las métricas y cuántos segundos cambiaron de congruencia.
+    """
+    original = report_store.read_report(path)
+    report, metrics, insights = rescore(original.copy(), **options)
+
+    changed = None
+    if 'congruencia' in original.columns:
+        changed = int((original['congruencia'].astype(str).to_numpy()
+                       != report['congruencia'].astype(str).to_numpy()).sum())
+
+    base = os.path.join(output_dir, os.path.splitext(os.path.basename(path))[0])
+    report_store.write_report(report, base, formats)
+
+    video, video_path = report_video_name(path, prefix), path
+    if store:
+        existing = stored_video(store, path, prefix)
+        if existing is not None:
+            video, video_path = existing[0], existing[1] or path
+        report_store.store_report(store, video, report, metrics, insights, video_path=video_path)
+
+    return {"video": video, "report": path, **metrics, "cambios_congruencia": changed,
+            "insights": insights}
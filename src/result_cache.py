@@ -0,0 +1,155 @@
+import os
+import json
+import glob
+import shutil
+import hashlib
+import threading
+from importlib import metadata
+
+import pandas as pd
+
+# Caché en disco de resultados intermedios (DataFrames) por etapa.
+# Clave = hash del contenido del video + etapa + versión de modelos + parámetros,
+# así un video renombrado reutiliza sus resultados y un cambio de parámetros no.
+CACHE_VERSION = 1
+# Etapas con caché (una subcarpeta de cache_dir cada una)
+STAGES = ("vision", "audio")
+
+_settings = {
+    "cache_dir": os.path.join("data", "cache"),
+    "max_bytes": 2 * 1024 ** 3,  # 2 GB
+    "enabled": True,
+}
+_hash_memo = {}  # (ruta, tamaño, mtime) -> sha256, evita re-hashear en el mismo proceso
+_lock = threading.Lock()
+
+def configure(cache_dir=None, max_bytes=None, enabled=None):
+    """Cambia directorio, tamaño máximo (bytes) o activa/desactiva el caché."""
+    if cache_dir is not None:
+        _settings["cache_dir"] = cache_dir
+    if max_bytes is not None:
+        _settings["max_bytes"] = max_bytes
+    if enabled is not None:
+        _settings["enabled"] = enabled
+
+def is_enabled():
+    return _settings["enabled"]
+
+def package_version(name):
+    """Versión instalada de un paquete (forma parte de la clave del caché)."""
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+def file_hash(path, chunk_size=1024 * 1024):
+    """SHA-256 del contenido del archivo (leído por bloques)."""
+    stat = os.stat(path)
+    memo_key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    if memo_key not in _hash_memo:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(chunk_size), b""):
+                digest.update(block)
+        _hash_memo[memo_key] = digest.hexdigest()
+    return _hash_memo[memo_key]
+
+def make_key(video_path, stage, params):
+    payload = {
+        "cache_version": CACHE_VERSION,
+        "video": file_hash(video_path),
+        "stage": stage,
+        "params": params,
+    }
+    raw = json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(raw).hexdigest()
+
+def _entry_path(stage, key):
+    return os.path.join(_settings["cache_dir"], stage, f"{key}.parquet")
+
+def _write(df, path):
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        df.to_parquet(tmp_path, index=False)
+    except ImportError:
+        # Sin pyarrow/fastparquet: mismo archivo en formato pickle
+        df.to_pickle(tmp_path)
+    os.replace(tmp_path, path)  # atómico: otro proceso nunca ve un archivo a medias
+
+def _read(path):
+    try:
+        return pd.read_parquet(path)
+    except Exception:
+        return pd.read_pickle(path)
+
+def load(video_path, stage, params):
+    """Devuelve el DataFrame guardado o None si no está en caché."""
+    if not is_enabled():
+        return None
+    path = _entry_path(stage, make_key(video_path, stage, params))
+    if not os.path.exists(path):
+        return None
+    try:
+        df = _read(path)
+    except Exception:
+        return None  # entrada corrupta: se recalcula y se sobrescribe
+    os.utime(path)  # marca de uso reciente para la evicción
+    return df
+
+def store(video_path, stage, params, df):
+    if not is_enabled():
+        return
+    path = _entry_path(stage, make_key(video_path, stage, params))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    _write(df, path)
+    evict()
+
+def cached_stage(video_path, stage, params, compute):
+    """
+    Ejecuta compute() solo si el resultado de esta etapa no está en caché.
+    Returns:
+        (df, hit): hit es True si se reutilizó un resultado previo
+    """
+    df = load(video_path, stage, params)
+    if df is not None:
+        return df, True
+    df = compute()
+    store(video_path, stage, params, df)
+    return df, False
+
+def _entries():
+    return glob.glob(os.path.join(_settings["cache_dir"], "*", "*.parquet"))
+
+def cache_size():
+    return sum(os.path.getsize(p) for p in _entries() if os.path.exists(p))
+
+def evict(max_bytes=None):
+    """Borra las entradas usadas hace más tiempo hasta quedar bajo max_bytes."""
+    max_bytes = _settings["max_bytes"] if max_bytes is None else max_bytes
+    with _lock:
+        entries = []
+        for path in _entries():
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        return total
+
+def invalidate(stage=None):
+    """Borra todo el caché, o solo el de una etapa (una de STAGES)."""
+    if stage is not None and stage not in STAGES:
+        raise ValueError(f"Etapa de caché desconocida: {stage!r}. Disponibles: {', '.join(STAGES)}")
+    target = _settings["cache_dir"] if stage is None else os.path.join(_settings["cache_dir"], stage)
+    if os.path.isdir(target):
+        shutil.rmtree(target)
@@ -1,8 +1,22 @@
 import os
+from collections import OrderedDict
 import pandas as pd
-from deepface import DeepFace
 import cv2
 import numpy as np
+from src import model_registry, face_tracking
+
+# Orden de salida del modelo de emociones de DeepFace (FER-2013)
+EMOTION_LABELS = ['angry', 'disgust', 'fear', 'happy', 'sad', 'surprise', 'neutral']
+
+# DeepFace (y con él TensorFlow) se importa al analizar el primer frame
+DeepFace = None
+
+def _deepface():
+    global DeepFace
+    if DeepFace is None:
+        from deepface import DeepFace as deepface_api
+        DeepFace = deepface_api
+    return DeepFace
 
 def frames_are_similar(img1, img2, threshold=0.95):
     """
@@ -26,84 +40,354 @@ def frames_are_similar(img1, img2, threshold=0.95):
     
     return similarity >= threshold
 
-def analyze_faces_full_vector(frames_folder, similarity_threshold=0.95):
+def dhash(img, hash_size=8):
+    """
+    Hash perceptual por diferencias (dHash) de 64 bits: compara cada píxel con
+    su vecino en una versión gris de 9x8. Frames casi iguales difieren en pocos bits.
+    """
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) if img.ndim == 3 else img
+    small = cv2.resize(gray, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    bits = small[:, 1:] > small[:, :-1]
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+# dHash del rostro recortado (no del frame completo, donde el rostro es una parte chica
+# y dos expresiones distintas dan el mismo hash): 16x16 = 256 bits. En los frames de
+# data/processed_frames/dia5 los pares con otra emoción quedan a 12 bits o más.
+FACE_HASH_SIZE = 16
+FACE_HASH_DISTANCE = 8
+
+def hamming_distance(hash1, hash2):
+    return bin(hash1 ^ hash2).count('1')
+
+class FrameHashCache:
+    """
+    Índice LRU acotado: hash perceptual de rostros ya analizados -> índice de su
+    fila de resultados. Una búsqueda devuelve el más cercano dentro de max_distance.
+    """
+
+    def __init__(self, max_size=64, max_distance=FACE_HASH_DISTANCE):
+        self.max_size = max_size
+        self.max_distance = max_distance
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, frame_hash):
+        best_hash, best_distance = None, self.max_distance + 1
+        for cached_hash in self.entries:
+            distance = hamming_distance(frame_hash, cached_hash)
+            if distance < best_distance:
+                best_hash, best_distance = cached_hash, distance
+
+        if best_hash is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.entries.move_to_end(best_hash)  # usado recientemente
+        return self.entries[best_hash]
+
+    def add(self, frame_hash, value):
+        self.entries[frame_hash] = value
+        self.entries.move_to_end(frame_hash)
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)  # descarta el menos usado
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self.entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+def no_detection_row(second):
+    """Vector neutro por defecto cuando no hay frame o falla el análisis."""
+    return {
+        'segundo': second, 
+        'angry': 0, 'disgust': 0, 'fear': 0, 'happy': 0, 
+        'sad': 0, 'surprise': 0, 'neutral': 100,
+        'emocion_facial': 'no_detection'
+    }
+
+def preprocess_face(frame):
+    """
+    Detecta el rostro principal y lo deja listo para el modelo de emociones
+    (gris 48x48 en [0, 1]), igual que DeepFace.analyze.
+    Devuelve None si DeepFace no entrega ningún rostro.
+    """
+    faces = _deepface().extract_faces(
+        img_path=frame,
+        detector_backend='opencv',
+        enforce_detection=False,
+        align=True
+    )
+    if not faces:
+        return None
+
+    face = faces[0]['face']  # RGB float en [0, 1]
+    if face.shape[0] == 0 or face.shape[1] == 0:
+        return None
+
+    face = face[:, :, ::-1]  # RGB -> BGR
+    try:
+        from deepface.modules import preprocessing
+        face = preprocessing.resize_image(img=face, target_size=(224, 224))[0]
+    except ImportError:
+        face = cv2.resize(face, (224, 224))
+
+    gray = cv2.cvtColor(face.astype(np.float32), cv2.COLOR_BGR2GRAY)
+    return cv2.resize(gray, (48, 48))
+
+def _safe_preprocess(frame):
+    try:
+        return preprocess_face(frame)
+    except Exception:
+        return None
+
+def face_hash(frame, tracker=None):
+    """
+    dHash de FACE_HASH_SIZE del rostro recortado, o None si no hay rostro. Con tracker
+    (face_tracking.FaceTracker) el recorte lo da el seguimiento; si no, DeepFace.
+    """
+    face = tracker.face(frame) if tracker is not None else _safe_preprocess(frame)
+    return dhash(face, FACE_HASH_SIZE) if face is not None else None
+
+def predict_emotions_batch(frames):
+    """
+    Inferencia de emociones por lotes: detecta el rostro de cada frame y pasa
+    todos los recortes por el modelo en un único tensor.
+
+    Returns:
+        Lista con (emotions_dict, dominant) por frame, o None si no hubo rostro.
+    """
+    return classify_faces([_safe_preprocess(frame) for frame in frames])
+
+def classify_faces(faces):
+    """
+    Modelo de emociones sobre rostros ya preprocesados (gris 48x48 en [0, 1]).
+    Los None se devuelven como None (sin rostro).
+    """
+    valid = [i for i, face in enumerate(faces) if face is not None]
+    outputs = [None] * len(faces)
+    if not valid:
+        return outputs
+
+    batch = np.stack([faces[i] for i in valid])[..., np.newaxis]
+    preds = np.asarray(model_registry.get_face_emotion_model()(batch, training=False))
+
+    for i, pred in zip(valid, preds):
+        total = pred.sum()
+        emotions = {label: float(100 * pred[j] / total) for j, label in enumerate(EMOTION_LABELS)}
+        outputs[i] = (emotions, EMOTION_LABELS[int(np.argmax(pred))])
+
+    return outputs
+
+def _flush_batch(pending, results, preprocessed=False):
+    """
+    Resuelve los frames pendientes de un lote y completa sus filas en results.
+    Con preprocessed, pending ya tiene los rostros recortados (seguimiento o caché de dHash).
+    """
+    items = [item for _, item in pending]
+    outputs = classify_faces(items) if preprocessed else predict_emotions_batch(items)
+
+    for (idx, _), output in zip(pending, outputs):
+        second = results[idx]['segundo']
+        if output is None:
+            results[idx] = no_detection_row(second)
+            continue
+        emotions, dominant = output
+        row = {'segundo': second}
+        row.update(emotions)
+        row['emocion_facial'] = dominant
+        results[idx] = row
+
+def analyze_frame(frame, second, tracker=None):
+    """
+    Análisis completo de un frame con DeepFace.analyze; devuelve la fila de resultados.
+    Con tracker (face_tracking.FaceTracker) el rostro lo ubica el seguimiento y el
+    modelo de emociones recibe solo el recorte.
+    """
+    if tracker is not None:
+        output = classify_faces([tracker.face(frame)])[0]
+        if output is None:
+            return no_detection_row(second)
+        row = {'segundo': second}
+        row.update(output[0])
+        row['emocion_facial'] = output[1]
+        return row
+
+    try:
+        analysis = _deepface().analyze(
+            img_path=frame, 
+            actions=['emotion'], 
+            enforce_detection=False, 
+            silent=True
+        )
+        
+        # DeepFace devuelve una lista
+        result_dict = analysis[0]
+        emotions = result_dict['emotion'] # Diccionario {'angry': 0.1, ...}
+        dominant = result_dict['dominant_emotion']
+        
+        # Guardamos fila con desglose numérico
+        row = {'segundo': second}
+        row.update(emotions) # Agrega columnas: angry, disgust, fear, happy, sad, surprise, neutral
+        row['emocion_facial'] = dominant # Mantenemos la string para compatibilidad
+        return row
+        
+    except Exception as e:
+        # Si falla, vector neutro por defecto
+        return no_detection_row(second)
+
+def iter_folder_frames(frames_folder):
+    """
+    Lee una carpeta con frame_N.jpg (modo legado / debug) y entrega (segundo, frame)
+    en orden. Si un archivo no se puede leer, el frame es None.
+    """
+    files = [f for f in os.listdir(frames_folder) if f.endswith('.jpg')]
+    files.sort(key=lambda x: int(x.split('_')[1].split('.')[0]))
+
+    for file in files:
+        second = int(file.split('_')[1].split('.')[0])
+        yield second, cv2.imread(os.path.join(frames_folder, file))
+
+def analyze_faces_full_vector(frames, similarity_threshold=0.95, batch_size=1,
+                              hash_cache_size=0, hash_distance=FACE_HASH_DISTANCE, face_detector=None):
     """
     Analiza frames y devuelve el vector completo de probabilidades de emociones.
     Necesario para el modelo LSTM.
+
+    Args:
+        frames: Iterable de (segundo, frame) como el que genera
+            media_processor.extract_media, o la ruta a una carpeta con frame_N.jpg
+        similarity_threshold: Umbral para reutilizar el resultado del frame anterior
+        batch_size: 1 = DeepFace.analyze frame a frame; >1 = acumula N rostros y
+            ejecuta el modelo de emociones sobre un solo tensor (mismas columnas)
+        hash_cache_size: Rostros analizados recientes indexados por dHash (0 = desactivado).
+            El hash se calcula sobre el rostro recortado, así que activarlo sin face_detector
+            separa la detección de DeepFace del modelo de emociones (igual que batch_size > 1)
+        hash_distance: Distancia de Hamming máxima (de 256 bits) para reutilizar un resultado
+        face_detector: None = detección de DeepFace en cada frame analizado. "haar" / "dnn"
+            (o un face_tracking.FaceTracker) = detector de OpenCV con seguimiento de la caja
+            entre frames; el modelo de emociones recibe solo el rostro recortado y reducido
+
+    Las estadísticas de reutilización quedan en df.attrs['vision_stats'].
     """
     results = []
+    pending = []          # (índice en results, frame) esperando el lote
+    deferred_copies = []  # (fila, fila origen) cuyo origen puede seguir en el lote
+    hash_index = FrameHashCache(hash_cache_size, hash_distance) if hash_cache_size else None
+    tracker = face_detector
+    if isinstance(face_detector, str):
+        tracker = face_tracking.FaceTracker(face_detector)
+    # Con seguimiento o caché de dHash el rostro se recorta antes de decidir si se analiza:
+    # se usa el modelo de emociones directo (lotes de al menos 1)
+    preprocessed = tracker is not None or hash_index is not None
+    flush_size = max(batch_size, 1) if preprocessed else batch_size
     cache_hits = 0
+    hash_hits = 0
     total_frames = 0
-    
-    # Obtener lista de archivos ordenados
-    files = [f for f in os.listdir(frames_folder) if f.endswith('.jpg')]
-    files.sort(key=lambda x: int(x.split('_')[1].split('.')[0]))
+
+    if isinstance(frames, (str, os.PathLike)):
+        frames = iter_folder_frames(frames)
     
     previous_frame = None
     
-    for file in files:
-        img_path = os.path.join(frames_folder, file)
-        second = int(file.split('_')[1].split('.')[0])
+    for second, current_frame in frames:
         total_frames += 1
         
-        # Leer frame actual
-        current_frame = cv2.imread(img_path)
-        
         # Verificar si el frame es None (error de lectura)
         if current_frame is None:
-            row = {
-                'segundo': second, 
-                'angry': 0, 'disgust': 0, 'fear': 0, 'happy': 0, 
-                'sad': 0, 'surprise': 0, 'neutral': 100,
-                'emocion_facial': 'no_detection'
-            }
-            results.append(row)
+            results.append(no_detection_row(second))
             continue
         
         # Comparar con frame anterior si existe
         if previous_frame is not None and frames_are_similar(previous_frame, current_frame, similarity_threshold):
+            if pending:
+                # El resultado anterior aún no existe: se copia al cerrar el lote
+                deferred_copies.append((len(results), len(results) - 1))
+                results.append({'segundo': second})
+                cache_hits += 1
+                continue
+
             # Reutilizar último resultado del caché
             cached_result = results[-1].copy()
             cached_result['segundo'] = second
             results.append(cached_result)
             cache_hits += 1
             continue
+
+        face = None
+        if preprocessed:
+            # El seguimiento necesita los frames en orden: el rostro se recorta al llegar
+            face = tracker.face(current_frame) if tracker is not None else _safe_preprocess(current_frame)
+
+        # Buscar un rostro parecido entre los analizados recientemente (no solo el anterior)
+        frame_hash = dhash(face, FACE_HASH_SIZE) if hash_index is not None and face is not None else None
+        source = hash_index.lookup(frame_hash) if frame_hash is not None else None
+        if source is not None:
+            if pending:
+                deferred_copies.append((len(results), source))
+                results.append({'segundo': second})
+            else:
+                cached_result = results[source].copy()
+                cached_result['segundo'] = second
+                results.append(cached_result)
+            hash_hits += 1
+            previous_frame = current_frame
+            continue
+
+        if frame_hash is not None:
+            hash_index.add(frame_hash, len(results))
         
         # Frame diferente o es el primero: hacer análisis completo
-        try:
-            analysis = DeepFace.analyze(
-                img_path=img_path, 
-                actions=['emotion'], 
-                enforce_detection=False, 
-                silent=True
-            )
-            
-            # DeepFace devuelve una lista
-            result_dict = analysis[0]
-            emotions = result_dict['emotion'] # Diccionario {'angry': 0.1, ...}
-            dominant = result_dict['dominant_emotion']
-            
-            # Guardamos fila con desglose numérico
-            row = {'segundo': second}
-            row.update(emotions) # Agrega columnas: angry, disgust, fear, happy, sad, surprise, neutral
-            row['emocion_facial'] = dominant # Mantenemos la string para compatibilidad
-            
-            results.append(row)
-            
-        except Exception as e:
-            # Si falla, vector neutro por defecto
-            row = {
-                'segundo': second, 
-                'angry': 0, 'disgust': 0, 'fear': 0, 'happy': 0, 
-                'sad': 0, 'surprise': 0, 'neutral': 100,
-                'emocion_facial': 'no_detection'
-            }
-            results.append(row)
+        if preprocessed or batch_size > 1:
+            results.append({'segundo': second})
+            pending.append((len(results) - 1, face if preprocessed else current_frame))
+            if len(pending) >= flush_size:
+                _flush_batch(pending, results, preprocessed=preprocessed)
+                pending = []
+                _resolve_copies(results, deferred_copies)
+                deferred_copies = []
+            previous_frame = current_frame
+            continue
+
+        results.append(analyze_frame(current_frame, second))
         
         # Actualizar frame anterior para la próxima iteración
         previous_frame = current_frame
 
-    return pd.DataFrame(results)
+    if pending:
+        _flush_batch(pending, results, preprocessed=preprocessed)
+        _resolve_copies(results, deferred_copies)
+
+    df = pd.DataFrame(results)
+    reused = cache_hits + hash_hits
+    df.attrs['vision_stats'] = {
+        'total_frames': total_frames,
+        'analyzed_frames': total_frames - reused,
+        'cache_hits': cache_hits,
+        'hash_hits': hash_hits,
+        'hit_rate': round(reused / total_frames, 4) if total_frames else 0.0,
+        'hash_cache': hash_index.stats() if hash_index is not None else None,
+        'tracking': tracker.stats() if tracker is not None else None,
+    }
+    print(f"   [VISION] {total_frames} frames, reutilizados {reused} "
+          f"(anterior: {cache_hits}, dHash: {hash_hits})")
+    if tracker is not None:
+        tracking = tracker.stats()
+        print(f"   [VISION] Detector {tracking['backend']}: {tracking['full_detections']} detecciones completas, "
+              f"{tracking['roi_detections']} en la ventana de seguimiento")
+    return df
+
+def _resolve_copies(results, copies):
+    """Rellena las filas de caché con el resultado de su fila origen (en orden)."""
+    for idx, source in copies:
+        cached_result = results[source].copy()
+        cached_result['segundo'] = results[idx]['segundo']
+        results[idx] = cached_result
 
 # Mantener la compatibilidad con el nombre anterior
 analyze_faces = analyze_faces_full_vector
\ No newline at end of file
@@ -0,0 +1,85 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from src import adaptive_sampling, face_tracking, vision_module
+from tests.test_hash_cache import FACE_BOX, FRAMES_DIR, VIDEOS, baseline_labels
+
+STEP = 10  # frames por segundo de la línea de tiempo
+
+
+def plan(budget_total, static=()):
+    seconds = 10
+    speech = np.zeros(seconds, dtype=bool)
+    speech[2:8] = True
+    return adaptive_sampling.plan_refinement(seconds, STEP, [0, 30, 60, 90], speech, boundaries={2, 7},
+                                             changes=set(), static=set(static), budget_total=budget_total)
+
+
+def test_plan_prioritizes_events_then_speech():
+    refine, levels = plan(budget_total=4 + 6 + 1, static={4})
+
+    # Alrededor de los bordes 2 y 7 (sin las muestras gruesas 3 y 6 ya analizadas)
+    assert levels["eventos"] == 4
+    assert {s * STEP for s in (1, 2, 7, 8)} <= set(refine)
+    # Habla que no es escena quieta: 5 (el 4 es quieto)
+    assert levels["habla"] == 1 and 5 * STEP in refine and 4 * STEP not in refine
+    # Lo que sobra del presupuesto (11 - 4 gruesas - 5) va a frames densos alrededor de los bordes
+    assert levels["bordes_denso"] == 2 and len(refine) == 7
+
+
+def test_plan_respects_budget():
+    for budget_total in (4, 6, 9, 40):
+        refine, levels = plan(budget_total)
+        assert len(refine) + 4 <= max(budget_total, 4)
+        assert sum(levels.values()) == len(refine)
+        assert not set(refine) & {0, 30, 60, 90}
+
+
+def row(frame_index, label, **probs):
+    data = {name: 0.0 for name in vision_module.EMOTION_LABELS}
+    data.update(probs)
+    return {'segundo': frame_index, **data, 'emocion_facial': label}
+
+
+def test_per_second_averages_and_fills():
+    samples = pd.DataFrame([
+        row(0, 'happy', happy=100.0),
+        row(10, 'happy', happy=80.0, sad=20.0),
+        row(15, 'sad', happy=20.0, sad=80.0),
+        vision_module.no_detection_row(30),
+    ])
+    df = adaptive_sampling.per_second(samples, STEP, 5)
+
+    assert df['segundo'].tolist() == [0, 1, 2, 3, 4]
+    assert df['muestras'].tolist() == [1, 2, 0, 1, 0]
+    assert df.loc[1, 'happy'] == 50.0 and df.loc[1, 'sad'] == 50.0
+    # Sin muestra: repite el segundo anterior
+    assert df.loc[2, 'happy'] == df.loc[1, 'happy']
+    assert df.loc[3, 'emocion_facial'] == 'no_detection'
+    assert df.loc[4, 'emocion_facial'] == 'no_detection'
+
+
+def test_static_scenes_keep_expression_changes_on_real_frames(monkeypatch):
+    """Ningún segundo marcado como escena quieta tiene otra emoción que sus muestras gruesas."""
+    monkeypatch.setattr(vision_module, "preprocess_face", lambda frame: face_tracking.crop_face(frame, FACE_BOX))
+    for video in VIDEOS:
+        folder = os.path.join(FRAMES_DIR, video)
+        labels = baseline_labels(video)
+        frames = dict(vision_module.iter_folder_frames(folder))
+        for coarse_step in (1, 2, 3):
+            seconds = list(range(0, len(frames), coarse_step))
+            coarse = pd.DataFrame({'segundo': seconds, 'emocion_facial': [labels[s] for s in seconds]})
+            hashes = {s: vision_module.face_hash(frames[s]) for s in seconds}
+
+            _, static = adaptive_sampling.coarse_events(coarse, hashes)
+
+            for second in static:
+                assert labels[second] == labels[second - second % coarse_step], (video, coarse_step, second)
+
+        # El mismo rostro en todas las muestras gruesas sí es una escena quieta
+        coarse = pd.DataFrame({'segundo': [0, 3, 6], 'emocion_facial': ['neutral'] * 3})
+        same = vision_module.face_hash(frames[0])
+        _, static = adaptive_sampling.coarse_events(coarse, {0: same, 3: same, 6: same})
+        assert static == {1, 2, 4, 5}
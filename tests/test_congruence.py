@@ -0,0 +1,60 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import analysis_core
+
+FACIAL = ['happy', 'HAPPY', 'Neutral', 'sad', 'no_detection', 'desconocida', np.nan]
+TEXT_EMOTION = ['joy', 'JOY', 'neutral', 'sadness', 'anger', 'otra', np.nan]
+TEXT = ['hola', "[Silencio]", np.nan]
+
+
+def congruence_reference(df):
+    """Reglas anteriores, fila a fila con iterrows."""
+    result = []
+    for _, row in df.iterrows():
+        vid_em = str(row.get('emocion_facial', 'neutral')).lower()
+        txt_em_raw = str(row.get('emocion_texto', 'neutral')).lower()
+        txt_em_norm = analysis_core.TEXT_TO_VIDEO_EMOTION.get(txt_em_raw, 'neutral')
+        if vid_em == 'no_detection' or row.get('texto') == "[Silencio]":
+            result.append("No aplicable")
+        elif vid_em == txt_em_norm:
+            result.append("Congruente")
+        else:
+            result.append("INCONGRUENCIA")
+    return result
+
+
+def all_combinations():
+    return pd.DataFrame(list(itertools.product(FACIAL, TEXT_EMOTION, TEXT)),
+                        columns=['emocion_facial', 'emocion_texto', 'texto'])
+
+
+def test_congruence_matches_previous_rules():
+    df = all_combinations()
+    expected = congruence_reference(df)
+
+    result = analysis_core.calculate_congruence(df.copy())
+
+    assert result['congruencia'].astype(str).tolist() == expected
+
+
+@pytest.mark.parametrize("missing", ['emocion_facial', 'emocion_texto', 'texto'])
+def test_congruence_with_missing_column(missing):
+    df = all_combinations().drop(columns=missing)
+    expected = congruence_reference(df)
+
+    result = analysis_core.calculate_congruence(df.copy())
+
+    assert result['congruencia'].astype(str).tolist() == expected
+
+
+def test_emotion_codes_match_previous_mapping():
+    values = pd.Series(FACIAL + TEXT_EMOTION + ['ANGRY', 'No_Detection', 'fear'])
+
+    expected = [analysis_core.EMOTION_CODES.get(str(x).lower(), 0) for x in values]
+
+    assert analysis_core.emotion_codes(values).tolist() == expected
+    assert analysis_core.emotion_codes(values.astype('category')).tolist() == expected
@@ -0,0 +1,46 @@
+import os
+
+import pandas as pd
+import pytest
+
+from src import face_tracking, vision_module
+
+FRAMES_DIR = os.path.join("data", "processed_frames", "dia5")
+VIDEOS = ("grupo_video1.mp4", "grupo_video2.mp4", "grupo_video3.mp4")
+# Zona del rostro en estos videos (selfie, cámara fija); reemplaza al detector de DeepFace
+FACE_BOX = (90, 120, 340, 540)
+
+
+def baseline_labels(video):
+    report = pd.read_csv(os.path.join("data", f"report_day5_{video}.csv"))
+    return dict(zip(report['segundo'], report['emocion_facial_raw']))
+
+
+@pytest.mark.parametrize("video", VIDEOS)
+def test_hash_reuse_keeps_labels_on_real_frames(video, monkeypatch):
+    frames_folder = os.path.join(FRAMES_DIR, video)
+    if not os.path.isdir(frames_folder):
+        pytest.skip(f"faltan los frames de {frames_folder}")
+    labels = baseline_labels(video)
+
+    # El modelo de emociones de prueba devuelve la etiqueta del reporte para ese rostro
+    by_face = {}
+    for second, frame in vision_module.iter_folder_frames(frames_folder):
+        by_face[face_tracking.crop_face(frame, FACE_BOX).tobytes()] = labels[second]
+
+    def classify(faces):
+        outputs = []
+        for face in faces:
+            label = by_face[face.tobytes()]
+            outputs.append(({name: 100.0 * (name == label) for name in vision_module.EMOTION_LABELS}, label))
+        return outputs
+
+    monkeypatch.setattr(vision_module, "preprocess_face", lambda frame: face_tracking.crop_face(frame, FACE_BOX))
+    monkeypatch.setattr(vision_module, "classify_faces", classify)
+
+    # similarity_threshold > 1: solo reutiliza el caché de dHash
+    df = vision_module.analyze_faces_full_vector(frames_folder, similarity_threshold=2.0, batch_size=4,
+                                                 hash_cache_size=64)
+
+    assert df.attrs['vision_stats']['hash_hits'] > 0
+    assert df['emocion_facial'].tolist() == [labels[s] for s in df['segundo']]
@@ -0,0 +1,31 @@
+import time
+
+from src import pipeline
+from src.instrumentation import measure
+
+
+def test_measure_excludes_wait_and_accumulates():
+    metrics = {}
+    for _ in range(2):
+        with measure(metrics, 'decode', accumulate=True) as entry:
+            entry['frames'] = 1
+            entry['wait_s'] = 0.2
+            time.sleep(0.25)
+
+    assert 0.05 <= metrics['decode']['wall_s'] < 0.3
+    assert metrics['decode']['wait_s'] == 0.4
+    assert metrics['decode']['frames'] == 2
+    assert 'process_peak_rss_mb' in metrics['decode']
+
+
+def test_prefetch_decode_time_excludes_slow_consumer():
+    timings = {}
+    frames = ((second, None) for second in range(4))
+
+    for _ in pipeline.prefetch_frames(frames, max_buffer=1, timings=timings):
+        time.sleep(0.1)  # consumidor lento: el productor queda bloqueado en put()
+
+    decode = timings['decode']
+    assert decode['frames'] == 4
+    assert decode['wait_s'] >= 0.15
+    assert decode['wall_s'] < 0.1
@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+
+from src import analysis_core, lstm_model, model_registry
+
+
+class _Output:
+    def __init__(self, values):
+        self.values = values
+
+    def numpy(self):
+        return self.values
+
+
+class AlwaysSad:
+    """LSTM de prueba: predice 'sad' para cualquier ventana."""
+
+    def __call__(self, x):
+        probs = np.zeros((len(x), len(lstm_model.EMOTIONS)), dtype=np.float32)
+        probs[:, lstm_model.EMOTIONS.index('sad')] = 1.0
+        return _Output(probs)
+
+
+def test_smoothing_uses_configured_lstm_path(tmp_path, monkeypatch):
+    path = tmp_path / "otro_lstm.h5"
+    path.write_bytes(b"")
+    lstm = AlwaysSad()
+    monkeypatch.setattr(model_registry, "_models", {})
+    monkeypatch.setattr(model_registry, "_config", {**model_registry.get_config(), "lstm_path": str(path)})
+    monkeypatch.setattr(lstm_model, "_predictors", {id(lstm): lstm})
+    model_registry.register("lstm", lstm)
+
+    rows = []
+    for second in range(6):
+        row = {label: 0.0 for label in lstm_model.EMOTIONS}
+        row.update({'segundo': second, 'happy': 100.0, 'emocion_facial': 'happy'})
+        rows.append(row)
+    df = analysis_core.apply_lstm_smoothing(pd.DataFrame(rows))
+
+    assert (df['emocion_facial'] == 'sad').all()
@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import lstm_model, model_registry
+from tests.test_lstm_path import _Output
+
+WINDOW = 3
+
+
+class WeightedWindow:
+    """LSTM de prueba: suma ponderada de la ventana (depende del orden de los frames)."""
+
+    def __call__(self, x):
+        weights = np.arange(1, x.shape[1] + 1, dtype=np.float64)[:, np.newaxis]
+        return _Output((np.asarray(x, dtype=np.float64) * weights).sum(axis=1))
+
+
+def probabilities(n, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(rng.dirichlet(np.ones(len(lstm_model.EMOTIONS)), size=n) * 100,
+                      columns=lstm_model.EMOTIONS)
+    df['emocion_facial'] = np.array(lstm_model.EMOTIONS)[df[lstm_model.EMOTIONS].to_numpy().argmax(axis=1)]
+    return df
+
+
+def padding_reference(df, model, window_size=WINDOW):
+    """Bucle anterior de predict_sequence: relleno con el frame 0 y una ventana por frame."""
+    data = df[lstm_model.EMOTIONS].values
+    if data.max() > 1.0:
+        data = data / 100.0
+    sequences = []
+    for i in range(len(data)):
+        if i < window_size:
+            seq = np.array([data[0]] * window_size)
+        else:
+            seq = data[i - window_size:i]
+        sequences.append(seq)
+    indices = np.argmax(model(np.array(sequences)).numpy(), axis=1)
+    return [lstm_model.EMOTIONS[i] for i in indices]
+
+
+def sequences_reference(df, window_size=WINDOW):
+    """Bucle anterior de prepare_sequences."""
+    data = df[lstm_model.EMOTIONS].values
+    if data.max() > 1.0:
+        data = data / 100.0
+    X, y = [], []
+    for i in range(len(data) - window_size):
+        X.append(data[i:i + window_size])
+        y.append(data[i + window_size])
+    return np.array(X), np.array(y)
+
+
+@pytest.fixture
+def lstm(tmp_path, monkeypatch):
+    path = tmp_path / "lstm.h5"
+    path.write_bytes(b"")
+    model = WeightedWindow()
+    monkeypatch.setattr(model_registry, "_models", {})
+    monkeypatch.setattr(model_registry, "_config", {**model_registry.get_config(), "lstm_path": str(path)})
+    monkeypatch.setattr(lstm_model, "_predictors", {id(model): model})
+    model_registry.register("lstm", model)
+    return model
+
+
+@pytest.mark.parametrize("n", [1, 2, WINDOW, WINDOW + 1, 50])
+@pytest.mark.parametrize("chunk_size", [1, 4, 4096])
+def test_predict_sequence_matches_padding_loop(lstm, n, chunk_size):
+    df = probabilities(n, seed=n)
+
+    labels = lstm_model.predict_sequence(df.copy(), window_size=WINDOW, chunk_size=chunk_size)
+
+    assert labels == padding_reference(df, lstm)
+
+
+def test_predict_sequence_empty(lstm):
+    assert lstm_model.predict_sequence(probabilities(0)) == []
+
+
+@pytest.mark.parametrize("n", [WINDOW + 1, 20])
+def test_prepare_sequences_matches_previous_loop(n):
+    df = probabilities(n, seed=n)
+    X, y = lstm_model.prepare_sequences(df.copy(), window_size=WINDOW)
+    X_ref, y_ref = sequences_reference(df)
+
+    np.testing.assert_array_equal(X, X_ref)
+    np.testing.assert_array_equal(y, y_ref)
+
+
+@pytest.mark.parametrize("n", [0, 1, WINDOW])
+def test_prepare_sequences_short_video_is_empty(n):
+    X, y = lstm_model.prepare_sequences(probabilities(n), window_size=WINDOW)
+
+    assert X.shape == (0, WINDOW, len(lstm_model.EMOTIONS))
+    assert y.shape == (0, len(lstm_model.EMOTIONS))
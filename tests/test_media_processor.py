@@ -0,0 +1,41 @@
+import sys
+
+import numpy as np
+import pytest
+
+from src import media_processor
+
+
+def fake_ffmpeg(monkeypatch, seconds, returncode, message=""):
+    """Reemplaza ffmpeg por un proceso que escribe `seconds` de PCM y termina con returncode."""
+    script = (f"import sys; sys.stdout.buffer.write(b'\\0\\0' * {int(seconds * media_processor.SAMPLE_RATE)}); "
+              f"sys.stdout.flush(); sys.stderr.write({message!r}); sys.exit({returncode})")
+    monkeypatch.setattr(media_processor, "_ffmpeg_audio_command", lambda video_path: [sys.executable, "-c", script])
+
+
+def test_chunks_cover_the_whole_audio(monkeypatch):
+    fake_ffmpeg(monkeypatch, seconds=2.5, returncode=0)
+
+    chunks = list(media_processor.iter_audio_chunks("video.mp4", chunk_seconds=1))
+
+    assert [offset for offset, _ in chunks] == [0.0, 1.0, 2.0]
+    assert sum(len(samples) for _, samples in chunks) == int(2.5 * media_processor.SAMPLE_RATE)
+    assert all(samples.dtype == np.float32 for _, samples in chunks)
+
+
+@pytest.mark.parametrize("seconds", [0, 1.5])
+def test_ffmpeg_failure_raises_like_load_audio(monkeypatch, seconds):
+    fake_ffmpeg(monkeypatch, seconds=seconds, returncode=1, message="Output file does not contain any stream")
+
+    with pytest.raises(RuntimeError, match="does not contain any stream"):
+        list(media_processor.iter_audio_chunks("video.mp4", chunk_seconds=1))
+    with pytest.raises(RuntimeError, match="does not contain any stream"):
+        media_processor.load_audio("video.mp4")
+
+
+def test_closing_early_does_not_raise(monkeypatch):
+    fake_ffmpeg(monkeypatch, seconds=3, returncode=0)
+
+    chunks = media_processor.iter_audio_chunks("video.mp4", chunk_seconds=1)
+    next(chunks)
+    chunks.close()
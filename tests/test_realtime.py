@@ -0,0 +1,83 @@
+import cv2
+import numpy as np
+import pytest
+
+from src import media_processor, model_registry, realtime, vision_module
+
+SECONDS = 4
+WINDOW = 2.0
+
+
+class StubWhisper:
+    """Habla durante toda la ventana."""
+
+    def transcribe(self, samples, **kwargs):
+        duration = len(samples) / media_processor.SAMPLE_RATE
+        return {'segments': [{'start': 0.0, 'end': duration - 0.01, 'text': 'I feel so sad today'}]}
+
+
+def stub_text_classifier(texts, **kwargs):
+    return [[{'label': 'sadness', 'score': 0.9}, {'label': 'joy', 'score': 0.1}] for _ in texts]
+
+
+def stub_audio_chunks(source, chunk_seconds):
+    samples = np.zeros(int(chunk_seconds * media_processor.SAMPLE_RATE), dtype=np.float32)
+    for offset in np.arange(0, SECONDS, chunk_seconds):
+        yield float(offset), samples
+
+
+def happy_face(frame, second, tracker=None):
+    row = vision_module.no_detection_row(second)
+    row.update({'neutral': 0, 'happy': 100, 'emocion_facial': 'happy'})
+    return row
+
+
+@pytest.fixture
+def video(tmp_path):
+    path = str(tmp_path / "clip.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 10, (64, 48))
+    for i in range(SECONDS * 10):
+        writer.write(np.full((48, 64, 3), i, dtype=np.uint8))
+    writer.release()
+    return path
+
+
+@pytest.fixture
+def stubs(monkeypatch):
+    monkeypatch.setattr(model_registry, "_models", {})
+    model_registry.register("whisper", StubWhisper())
+    model_registry.register("text_classifier", stub_text_classifier)
+    monkeypatch.setattr(media_processor, "iter_audio_chunks", stub_audio_chunks)
+    monkeypatch.setattr(vision_module, "analyze_frame", happy_face)
+
+
+def test_mid_window_seconds_get_a_verdict(video, stubs):
+    analyzer = realtime.LiveAnalyzer(video, interval=0.25, audio_window=WINDOW, realtime=True)
+    samples = [e for e in analyzer.events() if e['type'] == 'sample']
+
+    # Rostro feliz y texto triste durante todo el clip: todos los segundos son incongruentes,
+    # no solo los que caen justo en el borde de una ventana de audio
+    assert {e['segundo'] for e in samples} >= {0, 1, 2, 3}
+    assert [e['congruencia'] for e in samples] == ['INCONGRUENCIA'] * len(samples)
+    assert all(e['delay'] >= 0 for e in samples)
+
+
+def test_without_audio_samples_are_not_delayed(video, stubs):
+    analyzer = realtime.LiveAnalyzer(video, interval=0.25, with_audio=False, realtime=False)
+    samples = [e for e in analyzer.events() if e['type'] == 'sample']
+
+    assert samples
+    assert {e['congruencia'] for e in samples} == {'No aplicable'}
+
+
+def test_score_keeps_only_segments_that_can_still_match(video, stubs):
+    analyzer = realtime.LiveAnalyzer(video, audio_window=WINDOW)
+    analyzer._segments.extend({'inicio': float(t), 'fin': t + 1.5, 'texto': f"frase {t}",
+                               'emocion_texto': 'joy' if t == 50 else 'sadness'} for t in range(0, 100, 2))
+
+    scored = analyzer._score(happy_face(None, 50))
+
+    assert scored['texto'] == "frase 50"
+    assert scored['congruencia'] == 'Congruente'
+    assert analyzer._segments[0]['inicio'] == 50.0
+    assert len(analyzer._segments) == 25
@@ -0,0 +1,73 @@
+import os
+import shutil
+
+import pytest
+
+import rescore
+from src import report_store, rescoring
+
+REPORT = os.path.join("data", "report_day5_grupo_video1.mp4.csv")
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Almacén con el video guardado como lo hace main.py (nombre del archivo de video)."""
+    path = str(tmp_path / "reports.sqlite")
+    report_store.store_report(path, "grupo_video1.mp4", report_store.read_report(REPORT),
+                              video_path="data/raw_videos/dia5/grupo_video1.mp4")
+    return path
+
+
+@pytest.fixture
+def output_dir(tmp_path):
+    path = tmp_path / "rescored"
+    path.mkdir()
+    return str(path)
+
+
+@pytest.mark.parametrize("name, prefix", [("report_day5_grupo_video1.mp4.csv", rescoring.DEFAULT_PREFIX),
+                                          ("report_dia6_grupo_video1.mp4.csv", "report_dia6_")])
+def test_rescore_into_existing_store_keeps_video_count(store, tmp_path, output_dir, name, prefix):
+    path = str(tmp_path / name)
+    shutil.copy(REPORT, path)
+
+    summary = rescoring.rescore_file(path, output_dir, store=store, prefix=prefix, smoothing="off")
+
+    assert summary["video"] == "grupo_video1.mp4"
+    assert report_store.list_videos(store) == ["grupo_video1.mp4"]
+    videos = report_store.query(store, "SELECT video_path FROM videos")
+    assert videos['video_path'].tolist() == ["data/raw_videos/dia5/grupo_video1.mp4"]
+
+
+def test_suffix_video_is_not_overwritten(tmp_path, output_dir):
+    """video1.mp4 es sufijo de grupo_video1.mp4: re-puntuar uno no toca las filas del otro."""
+    store = str(tmp_path / "reports.sqlite")
+    other = report_store.read_report(os.path.join("data", "report_day5_grupo_video2.mp4.csv"))
+    report_store.store_report(store, "video1.mp4", other, video_path="video1.mp4")
+    path = str(tmp_path / "report_day5_grupo_video1.mp4.csv")
+    shutil.copy(REPORT, path)
+
+    rescoring.rescore_file(path, output_dir, store=store, smoothing="off")
+
+    assert report_store.list_videos(store) == ["grupo_video1.mp4", "video1.mp4"]
+    assert len(report_store.load_video(store, "video1.mp4")) == len(other)
+    assert len(report_store.load_video(store, "grupo_video1.mp4")) == len(report_store.read_report(REPORT))
+
+
+def test_rescore_new_video_uses_main_name(store, tmp_path, output_dir):
+    path = str(tmp_path / "report_day5_otro.mp4.csv")
+    shutil.copy(REPORT, path)
+
+    rescoring.rescore_file(path, output_dir, store=store, smoothing="off")
+
+    assert report_store.list_videos(store) == ["grupo_video1.mp4", "otro.mp4"]
+
+
+def test_cli_exit_code_reports_failures(tmp_path, output_dir):
+    good = str(tmp_path / "report_day5_grupo_video1.mp4.csv")
+    shutil.copy(REPORT, good)
+    broken = tmp_path / "report_day5_roto.mp4.csv"
+    broken.write_text("segundo\n0\n", encoding="utf-8")
+
+    assert rescore.main([good, "--output-dir", output_dir, "--lstm", "off"]) == 0
+    assert rescore.main([good, str(broken), "--output-dir", output_dir, "--lstm", "off"]) == 1
@@ -0,0 +1,36 @@
+import os
+
+import pytest
+
+import main
+from src import result_cache
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    path = tmp_path / "cache"
+    for stage in result_cache.STAGES:
+        (path / stage).mkdir(parents=True)
+    monkeypatch.setitem(result_cache._settings, "cache_dir", str(path))
+    return path
+
+
+def test_invalidate_one_stage(cache_dir):
+    result_cache.invalidate("audio")
+
+    assert not (cache_dir / "audio").exists()
+    assert (cache_dir / "vision").exists()
+
+
+@pytest.mark.parametrize("stage", ["..", "../cache", "vision/..", "frames"])
+def test_invalidate_rejects_unknown_stage(cache_dir, stage):
+    with pytest.raises(ValueError):
+        result_cache.invalidate(stage)
+
+    assert sorted(os.listdir(cache_dir)) == sorted(result_cache.STAGES)
+
+
+def test_cli_rejects_unknown_stage():
+    with pytest.raises(SystemExit):
+        main.parse_args(["--invalidate-cache", ".."])
+    assert main.parse_args(["--invalidate-cache"]).invalidate_cache == "all"
@@ -0,0 +1,31 @@
+import os
+import importlib.util
+
+import pytest
+
+from benchmarks import check_startup
+
+
+@pytest.fixture(scope="module")
+def probe_env(tmp_path_factory):
+    """
+    Entorno del proceso de prueba. Los módulos pesados que no están instalados se
+    reemplazan por paquetes vacíos: si algún módulo liviano los importara al
+    arrancar, aparecerían en sys.modules igual que los reales.
+    """
+    placeholders = tmp_path_factory.mktemp("heavy")
+    for name in check_startup.HEAVY_MODULES:
+        if importlib.util.find_spec(name) is None:
+            (placeholders / name).mkdir()
+            (placeholders / name / "__init__.py").write_text("")
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [check_startup.ROOT, env.get("PYTHONPATH"), str(placeholders)]))
+    return env
+
+
+@pytest.mark.parametrize("module", list(check_startup.TARGETS))
+def test_light_module_startup(module, probe_env):
+    seconds, heavy = check_startup.measure_import(module, env=probe_env)
+
+    assert heavy == [], f"{module} carga al arrancar: {', '.join(heavy)}"
+    assert seconds is not None and seconds <= check_startup.DEFAULT_BUDGET
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.bench_synchronize import synchronize_reference, synthetic_inputs
+from src import analysis_core
+
+
+def segments(rows):
+    return pd.DataFrame([{'inicio': start, 'fin': end, 'texto': f"frase {i}",
+                          'emocion_texto': ['joy', 'anger', 'sadness'][i % 3]}
+                         for i, (start, end) in enumerate(rows)])
+
+
+def video(seconds):
+    df_video, _ = synthetic_inputs(seconds)
+    return df_video
+
+
+@pytest.mark.parametrize("rows", [
+    [(0.5, 2.0), (2.0, 4.5), (6.0, 9.0)],              # ordenados, fin == inicio del siguiente
+    [(6.0, 9.0), (0.5, 2.0), (2.0, 4.5)],              # desordenados
+    [(0.0, 5.0), (1.0, 3.0), (2.5, 8.0), (7.0, 7.0)],  # solapados: gana el primero
+    [(3.0, 9.0), (0.0, 4.0), (1.0, 2.0)],              # inicios y fines sin orden
+])
+def test_synchronize_matches_previous_loop(rows):
+    df_video, df_audio = video(12), segments(rows)
+
+    pd.testing.assert_frame_equal(analysis_core.synchronize_data(df_video, df_audio),
+                                  synchronize_reference(df_video, df_audio))
+
+
+def test_synchronize_matches_previous_loop_on_synthetic_interview():
+    df_video, df_audio = synthetic_inputs(600)
+
+    pd.testing.assert_frame_equal(analysis_core.synchronize_data(df_video, df_audio),
+                                  synchronize_reference(df_video, df_audio))
+
+
+@pytest.mark.parametrize("df_audio", [pd.DataFrame(), pd.DataFrame({'texto': ["hola"]})])
+def test_synchronize_without_segments_is_silence(df_audio):
+    merged = analysis_core.synchronize_data(video(5), df_audio)
+
+    assert (merged['texto'] == "[Silencio]").all()
+    assert (merged['emocion_texto'] == "neutral").all()
+
+
+@pytest.mark.parametrize("chunk_cells", [1, 3, 7, 4_000_000])
+def test_match_segments_fallback_chunks(chunk_cells):
+    rng = np.random.default_rng(1)
+    starts = rng.uniform(0, 50, size=20)
+    ends = starts + rng.uniform(0, 6, size=20)
+    seconds = np.arange(60)
+
+    expected = []
+    for t in seconds:
+        covers = np.flatnonzero((starts <= t) & (ends >= t))
+        expected.append(covers[0] if len(covers) else -1)
+
+    result = analysis_core._match_segments(seconds, starts, ends, chunk_cells=chunk_cells)
+    np.testing.assert_array_equal(result, expected)
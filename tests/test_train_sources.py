@@ -0,0 +1,41 @@
+import os
+
+import train_model
+from src import lstm_model, report_store, rescoring
+
+
+def test_report_video_key_ignores_day_prefix():
+    assert rescoring.report_video_key("data/report_day4_grupo_video1.mp4.csv") == "grupo_video1.mp4"
+    assert rescoring.report_video_key("data/report_day5_grupo_video1.mp4.parquet") == "grupo_video1.mp4"
+    assert rescoring.report_video_key("salidas/report_dia12_a.avi.csv") == "a.avi"
+
+
+def test_default_reports_use_each_video_once():
+    sources = train_model.collect_sources(train_model.parse_args([]))
+    videos = [video for _, _, video in sources]
+
+    assert len(videos) == len(set(videos))
+    assert {"grupo_video1.mp4", "grupo_video2.mp4", "grupo_video3.mp4"} <= set(videos)
+    # Del mismo video se usa el análisis más reciente
+    names = {video: name for name, _, video in sources}
+    assert os.path.basename(names["grupo_video1.mp4"]).startswith("report_day5_")
+
+
+def test_store_and_reports_with_same_video(tmp_path):
+    store = str(tmp_path / "reports.sqlite")
+    report = os.path.join("data", "report_day5_grupo_video1.mp4.csv")
+    report_store.store_report(store, "grupo_video1.mp4", report_store.read_report(report))
+
+    sources = train_model.collect_sources(train_model.parse_args([report, "--store", store]))
+
+    assert [(name, video) for name, _, video in sources] == [(f"{store}:grupo_video1.mp4", "grupo_video1.mp4")]
+
+
+def test_holdout_keeps_groups_together():
+    sources = [f"{day}_{video}" for day in ("day4", "day5") for video in "abcde"]
+    groups = [name.split("_")[1] for name in sources]
+    for seed in range(10):
+        train, holdout = lstm_model.split_holdout(sources, 0.2, seed, groups)
+        assert holdout and train
+        assert not {s.split("_")[1] for s in train} & {s.split("_")[1] for s in holdout}
+        assert len(train) + len(holdout) == len(sources)
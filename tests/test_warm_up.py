@@ -0,0 +1,30 @@
+import pytest
+
+import main
+from src import model_registry, result_cache
+
+
+@pytest.mark.parametrize("stages, batch_size, config, use_cache, expected", [
+    (["audio", "lstm", "plot"], 16, {}, False, ("whisper", "text_classifier", "face_emotion", "lstm")),
+    (["plot"], 16, {}, False, ("face_emotion",)),
+    (["lstm"], 1, {}, False, ("lstm",)),
+    (["audio"], 1, {"face_detector": "dnn"}, False, ("whisper", "text_classifier", "face_emotion")),
+    (["audio"], 1, {"hash_cache_size": 64}, False, ("whisper", "text_classifier", "face_emotion")),
+    # Con caché, visión y audio cargan sus modelos recién ante un fallo de caché
+    (["audio", "lstm", "plot"], 16, {}, True, ("lstm",)),
+    (["plot"], 16, {}, True, ()),
+])
+def test_models_follow_active_stages(stages, batch_size, config, use_cache, expected):
+    assert main.models_to_warm_up(stages, batch_size, config, use_cache) == expected
+
+
+def test_init_worker_loads_only_requested_models(monkeypatch):
+    calls = []
+    monkeypatch.setattr(model_registry, "warm_up", lambda names=model_registry.MODEL_NAMES: calls.append(names) or {})
+    monkeypatch.setattr(model_registry, "_config", model_registry.get_config())
+    monkeypatch.setattr(result_cache, "_settings", dict(result_cache._settings))
+
+    main.init_worker({}, {"enabled": False}, {}, models=())
+    main.init_worker({}, {"enabled": False}, {}, models=("lstm",))
+
+    assert calls == [("lstm",)]
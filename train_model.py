@@ -1,38 +1,126 @@
 import os
-from src import media_processor, vision_module, lstm_model
+import glob
+import json
+import argparse
+from datetime import datetime
+from functools import partial
 
-def main():
+from src import pipeline, result_cache, lstm_model, model_registry, report_store, rescoring
+
+DEFAULT_REPORTS = os.path.join("data", "report_*.*")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Entrenamiento del modelo LSTM a partir de los vectores de emoción por segundo ya guardados")
+    parser.add_argument("reports", nargs="*", metavar="REPORTE",
+                        help=f"Reportes CSV/JSON/Parquet o patrones glob (por defecto {DEFAULT_REPORTS})")
+    parser.add_argument("--store", help="Usar también todos los videos de este almacén SQLite consolidado")
+    parser.add_argument("--videos", help="Patrón glob de videos crudos a analizar con DeepFace "
+                                         "(usa el caché de main.py si ya se analizaron)")
+    parser.add_argument("--model-path", default=model_registry.DEFAULT_CONFIG["lstm_path"],
+                        help="Modelo existente (con --fine-tune) y destino por defecto")
+    parser.add_argument("--output", help="Dónde guardar el modelo entrenado (por defecto --model-path)")
+    parser.add_argument("--fine-tune", action="store_true",
+                        help="Re-entrenar el modelo existente con las entrevistas nuevas en lugar de partir de cero")
+    parser.add_argument("--epochs", type=int, default=lstm_model.TRAIN_DEFAULTS["epochs"])
+    parser.add_argument("--batch-size", type=int, default=lstm_model.TRAIN_DEFAULTS["batch_size"])
+    parser.add_argument("--shuffle-buffer", type=int, default=lstm_model.TRAIN_DEFAULTS["shuffle_buffer"],
+                        help="Ventanas en el buffer de mezcla de tf.data")
+    parser.add_argument("--learning-rate", type=float, default=None,
+                        help="Por defecto 1e-3 desde cero y 1e-4 con --fine-tune")
+    parser.add_argument("--holdout", type=float, default=0.2,
+                        help="Fracción de videos reservados para evaluación (0 = ninguno)")
+    parser.add_argument("--checkpoint-dir", default=None,
+                        help="Carpeta de checkpoints por época (por defecto data/checkpoints/lstm_<fecha>)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Con --videos, re-analizar aunque main.py ya tenga sus resultados en caché")
+    return parser.parse_args(argv)
+
+def has_probabilities(path):
+    """Los reportes de los primeros días no guardaban las 7 probabilidades."""
+    columns = set(report_store.report_columns(path))
+    return all(col in columns for col in lstm_model.EMOTIONS)
+
+def analyze_video(video_path, use_cache=True):
+    """Vectores por segundo de un video crudo (reutiliza el caché de main.py si el video ya se analizó)."""
+    print(f"--> Procesando video para entrenamiento: {os.path.basename(video_path)}")
+    timings = {}
+    df = pipeline.analyze_video_faces(video_path, vision_batch_size=16, timings=timings, use_cache=use_cache)
+    if timings['vision'].get('cache_hit'):
+        print("    (resultado reutilizado del caché)")
+    return df
+
+def collect_sources(args):
+    """
+    Lista de fuentes (nombre, función que carga el DataFrame, video). Nada se lee
+    hasta que el entrenamiento pide ese video. Cada video aparece una sola vez
+    (ver unique_videos).
+    """
+    sources = []
+    if args.reports or not (args.store or args.videos):
+        for path in rescoring.find_reports(args.reports or [DEFAULT_REPORTS]):
+            if has_probabilities(path):
+                sources.append((path, partial(report_store.read_report, path), rescoring.report_video_key(path)))
+            else:
+                print(f"   [TRAIN] {path} no tiene las probabilidades por emoción: se omite.")
+    if args.store:
+        for video in report_store.list_videos(args.store):
+            sources.append((f"{args.store}:{video}", partial(report_store.load_video, args.store, video), video))
+    if args.videos:
+        result_cache.configure(cache_dir=os.path.join("data", "cache"), enabled=not args.no_cache)
+        for video_path in sorted(glob.glob(args.videos)):
+            sources.append((video_path, partial(analyze_video, video_path, use_cache=result_cache.is_enabled()),
+                            os.path.basename(video_path)))
+    return unique_videos(sources)
+
+def unique_videos(sources):
+    """
+    Una fuente por video: report_day4_ y report_day5_ (o el reporte y el almacén) son
+    análisis de la misma entrevista; entrenar con ambos duplica datos y, si uno queda
+    en evaluación y el otro en entrenamiento, la evaluación sale optimista. Se queda
+    la última (reportes del día más reciente, luego el almacén, luego --videos).
+    """
+    by_video = {}
+    for source in sources:
+        previous = by_video.pop(source[2], None)
+        if previous is not None:
+            print(f"   [TRAIN] {previous[0]} es el mismo video que {source[0]}: se usa el segundo.")
+        by_video[source[2]] = source
+    return list(by_video.values())
+
+def main(argv=None):
+    args = parse_args(argv)
     print("=== ENTRENAMIENTO DEL MODELO LSTM ===")
-    base_dir = "data"
-    # Usaremos los mismos videos del dia 3 para entrenar (Transfer Learning rápido)
-    raw_video_dir = os.path.join(base_dir, "raw_videos", "dia3") 
-    
-    if not os.path.exists(raw_video_dir):
-        print(f"Error: No existe la carpeta {raw_video_dir}")
-        return
-
-    training_dfs = []
-    
-    files = [f for f in os.listdir(raw_video_dir) if f.endswith('.mp4')]
-    if not files:
-        print("No hay videos .mp4 para entrenar.")
-        return
-
-    for video_name in files:
-        print(f"--> Procesando video para entrenamiento: {video_name}")
-        video_path = os.path.join(raw_video_dir, video_name)
-        
-        # 1. Extraer frames (usa la misma carpeta temporal)
-        _, frames_folder = media_processor.extract_media(video_path, base_dir, video_name)
-        
-        # 2. Obtener vectores numéricos
-        df = vision_module.analyze_faces_full_vector(frames_folder)
-        training_dfs.append(df)
-        
-    # 3. Entrenar
-    print("--> Iniciando entrenamiento de red neuronal...")
-    lstm_model.train_and_save(training_dfs)
-    print("=== ENTRENAMIENTO COMPLETADO ===")
+
+    sources = collect_sources(args)
+    if not sources:
+        print("No hay datos para entrenar.")
+        return 1
+    print(f"--> {len(sources)} videos con vectores de emoción")
+
+    checkpoint_dir = args.checkpoint_dir or os.path.join(
+        "data", "checkpoints", f"lstm_{datetime.now():%Y%m%d_%H%M%S}")
+    summary = lstm_model.train_streaming(
+        [loader for _, loader, _ in sources], model_path=args.model_path, output_path=args.output,
+        fine_tune=args.fine_tune, holdout=args.holdout, checkpoint_dir=checkpoint_dir, seed=args.seed,
+        epochs=args.epochs, batch_size=args.batch_size, shuffle_buffer=args.shuffle_buffer,
+        learning_rate=args.learning_rate, groups=[video for _, _, video in sources]
+    )
+    if summary is None:
+        return 1
+
+    summary["sources"] = [name for name, _, _ in sources]
+    summary_path = os.path.join(checkpoint_dir, "training_summary.json")
+    with open(summary_path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2, ensure_ascii=False)
+
+    if summary["eval_after"]:
+        before = f"{summary['eval_before']['accuracy']:.3f} -> " if summary["eval_before"] else ""
+        print(f"Evaluación ({summary['eval_videos']} videos reservados): accuracy {before}"
+              f"{summary['eval_after']['accuracy']:.3f} (repetir el último frame: {summary['persistence_accuracy']})")
+    print(f"=== ENTRENAMIENTO COMPLETADO === (checkpoints y resumen en {checkpoint_dir})")
+    return 0
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    raise SystemExit(main())